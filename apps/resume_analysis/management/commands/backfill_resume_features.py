@@ -0,0 +1,64 @@
+import time
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from apps.resume_analysis.models import ResumeContent
+from apps.resume_analysis.services.llm_processor import LLMProcessor
+
+class Command(BaseCommand):
+    help = 'Extract the features of stored resumes, packing short resumes into shared LLM requests'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help='Re-extract resumes that already have features')
+        parser.add_argument('--batch-size', type=int, default=50, help='Resumes loaded and extracted per batch')
+        parser.add_argument('--limit', type=int, help='Stop after this many resumes')
+
+    def handle(self, *args, **options):
+        contents = (
+            ResumeContent.objects.filter(resume__duplicate_of__isnull=True)
+            .exclude(raw_text='')
+            # Failed extractions store a placeholder text next to the error
+            .exclude(structured_data__has_key='error')
+            .order_by('pk')
+        )
+        if not options['all']:
+            contents = contents.filter(Q(extracted_features__isnull=True) | Q(extracted_features={}))
+        if options['limit']:
+            contents = contents[:options['limit']]
+
+        processor = LLMProcessor()
+        batch_size = max(1, options['batch_size'])
+        started = time.perf_counter()
+        extracted = failed = 0
+
+        batch = []
+        for content in contents.iterator(chunk_size=batch_size):
+            batch.append(content)
+            if len(batch) == batch_size:
+                done, errors = self._extract_batch(processor, batch)
+                extracted, failed = extracted + done, failed + errors
+                batch = []
+        if batch:
+            done, errors = self._extract_batch(processor, batch)
+            extracted, failed = extracted + done, failed + errors
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Extracted features of {extracted} resume(s), {failed} failed, "
+            f"in {time.perf_counter() - started:.1f}s"
+        ))
+
+    def _extract_batch(self, processor, batch):
+        """Extract and store the features of a batch of resumes; returns (extracted, failed)."""
+        results = processor.extract_resume_features_bulk([content.processing_text for content in batch])
+        extracted = failed = 0
+        for content, features in zip(batch, results):
+            if "error" in features:
+                content.processing_error = f"{features['error']}: {features.get('details', '')}"
+                content.save(update_fields=['processing_error'])
+                self.stdout.write(self.style.WARNING(f"Resume {content.pk}: {content.processing_error}"))
+                failed += 1
+            else:
+                content.extracted_features = features
+                content.processing_error = None
+                content.save(update_fields=['extracted_features', 'processing_error', 'last_processed'])
+                extracted += 1
+        return extracted, failed
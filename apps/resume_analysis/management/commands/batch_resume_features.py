@@ -0,0 +1,77 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
+from apps.resume_analysis.models import ResumeContent
+from apps.resume_analysis.services.llm_batch import BatchJobError
+from apps.resume_analysis.services.llm_processor import LLMProcessor
+
+class Command(BaseCommand):
+    help = 'Extract resume features through the LLM batch API: submit a job, wait for it and store the results'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help='Re-extract resumes that already have features')
+        parser.add_argument('--limit', type=int, help='Submit at most this many resumes')
+        parser.add_argument('--job', help='Collect the results of an already submitted job instead of submitting')
+        parser.add_argument('--no-wait', action='store_true', help='Submit the job and exit without waiting')
+        parser.add_argument('--poll-interval', type=float, help='Seconds between job status checks')
+
+    def handle(self, *args, **options):
+        processor = LLMProcessor()
+
+        try:
+            if options['job']:
+                job_id = options['job']
+            else:
+                contents = (
+                    ResumeContent.objects.filter(resume__duplicate_of__isnull=True)
+                    .exclude(raw_text='')
+                    # Failed extractions store a placeholder text next to the error
+                    .exclude(structured_data__has_key='error')
+                    .order_by('pk')
+                )
+                if not options['all']:
+                    contents = contents.filter(Q(extracted_features__isnull=True) | Q(extracted_features={}))
+                if options['limit']:
+                    contents = contents[:options['limit']]
+
+                job, local_features = processor.submit_batch(
+                    (str(content.pk), content.processing_text) for content in contents.iterator()
+                )
+                self._store(local_features)
+                if job is None:
+                    self.stdout.write("No resume needs the LLM")
+                    return
+                job_id = job['id']
+                self.stdout.write(self.style.SUCCESS(f"Submitted batch job {job_id}"))
+                if options['no_wait']:
+                    return
+
+            job = processor.batch_client.wait(job_id, poll_interval=options['poll_interval'])
+            if job['status'] != 'SUCCESS':
+                raise CommandError(f"Batch job {job_id} ended with status {job['status']}")
+
+            results = processor.batch_client.results(job)
+            document_ids = {line['custom_id'].rsplit(':', 2)[0] for line in results}
+            texts = {
+                str(content.pk): content.processing_text
+                for content in ResumeContent.objects.filter(pk__in=document_ids)
+            }
+            self._store(processor.collect_batch(results, texts))
+        except BatchJobError as e:
+            raise CommandError(str(e))
+
+    def _store(self, features_by_id):
+        """Save the features (or errors) of each resume, keyed by ResumeContent primary key."""
+        stored = failed = 0
+        for content in ResumeContent.objects.filter(pk__in=list(features_by_id)):
+            features = features_by_id[str(content.pk)]
+            if "error" in features:
+                content.processing_error = f"{features['error']}: {features.get('details', '')}"
+                content.save(update_fields=['processing_error'])
+                failed += 1
+            else:
+                content.extracted_features = features
+                content.processing_error = None
+                content.save(update_fields=['extracted_features', 'processing_error', 'last_processed'])
+                stored += 1
+        if features_by_id:
+            self.stdout.write(f"Stored features of {stored} resume(s), {failed} failed")
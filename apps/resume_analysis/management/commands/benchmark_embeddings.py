@@ -0,0 +1,61 @@
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from apps.resume_analysis.models import ResumeContent
+from apps.resume_analysis.services.embedding_model import cosine_agreement, load_embedding_model
+
+SAMPLE_QUERIES = [
+    "python developer",
+    "data scientist with machine learning experience",
+    "senior java backend engineer spring boot microservices",
+    "frontend developer react typescript",
+    "devops engineer kubernetes aws terraform",
+    "project manager agile scrum certified",
+]
+
+
+def _measure(model, texts, batch_size):
+    """Encode texts once to warm up, then time a second pass; returns (vectors, seconds)."""
+    model.encode(texts[:batch_size], batch_size=batch_size)
+    started = time.perf_counter()
+    vectors = model.encode(texts, batch_size=batch_size)
+    return vectors, time.perf_counter() - started
+
+
+class Command(BaseCommand):
+    help = 'Compare throughput and cosine agreement of the ONNX int8 embedding backend against PyTorch fp32'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=200, help='Stored resumes to encode')
+        parser.add_argument('--batch-size', type=int, default=None, help='settings.EMBEDDING_BATCH_SIZE by default')
+        parser.add_argument('--threads', type=int, default=None, help='ONNX Runtime threads; settings by default')
+        parser.add_argument('--min-cosine', type=float, default=0.99, help='Fail below this mean cosine agreement')
+
+    def handle(self, *args, **options):
+        texts = [
+            content.processing_text
+            for content in ResumeContent.objects.exclude(raw_text='').order_by('-pk')[:options['limit']]
+        ]
+        texts += SAMPLE_QUERIES * max(1, len(texts) // len(SAMPLE_QUERIES))
+        batch_size = options['batch_size'] or settings.EMBEDDING_BATCH_SIZE
+        threads = options['threads'] if options['threads'] is not None else settings.EMBEDDING_ONNX_THREADS
+
+        torch_model = load_embedding_model('torch', name=settings.EMBEDDING_MODEL)
+        onnx_model = load_embedding_model(
+            'onnx', onnx_dir=settings.EMBEDDING_ONNX_MODEL_DIR, onnx_file=settings.EMBEDDING_ONNX_FILE, threads=threads
+        )
+
+        reference, torch_seconds = _measure(torch_model, texts, batch_size)
+        candidate, onnx_seconds = _measure(onnx_model, texts, batch_size)
+        cosines = cosine_agreement(reference, candidate)
+
+        self.stdout.write(f"{len(texts)} texts, batch size {batch_size}")
+        for label, seconds in (('torch fp32', torch_seconds), ('onnx int8', onnx_seconds)):
+            self.stdout.write(f"  {label:<11} {seconds:7.2f}s  {len(texts) / seconds:8.1f} texts/s")
+        self.stdout.write(
+            f"  speed-up {torch_seconds / onnx_seconds:.2f}x, cosine agreement "
+            f"mean {cosines.mean():.4f} min {cosines.min():.4f}"
+        )
+        if cosines.mean() < options['min_cosine']:
+            raise CommandError(f"Mean cosine agreement {cosines.mean():.4f} is below {options['min_cosine']}")
+        self.stdout.write(self.style.SUCCESS("ONNX backend agrees with PyTorch"))
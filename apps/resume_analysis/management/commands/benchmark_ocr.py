@@ -0,0 +1,98 @@
+import multiprocessing
+import os
+import re
+import time
+from collections import Counter
+from django.core.management.base import BaseCommand, CommandError
+
+
+def _run_ocr(pdf_path, fixed):
+    """Run OCR on every page of a PDF in a fresh process and measure it.
+
+    Runs in a spawned process so the peak RSS of each rendering policy is
+    measured on its own.
+
+    Args:
+        pdf_path (str): The PDF to process.
+        fixed (bool): True for the former fixed 300-DPI RGB rendering.
+
+    Returns:
+        dict: The OCR text, wall time and memory figures.
+    """
+    import resource
+    import django
+    django.setup()
+
+    import fitz
+    from apps.resume_analysis.services.ocr_processor import OCRProcessor, RenderPolicy, get_ocr_reader
+
+    policy = RenderPolicy.fixed(300, grayscale=False) if fixed else RenderPolicy()
+    processor = OCRProcessor(render_policy=policy)
+    get_ocr_reader()
+    baseline_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    doc = fitz.open(pdf_path)
+    try:
+        started = time.perf_counter()
+        texts = [processor._ocr_page(page) for page in doc]
+        seconds = time.perf_counter() - started
+        dpis = [policy.dpi_for(page) for page in doc]
+    finally:
+        doc.close()
+
+    return {
+        'text': "\n\n".join(texts),
+        'seconds': seconds,
+        'baseline_mb': baseline_kb / 1024,
+        'peak_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        'dpis': dpis,
+    }
+
+
+def _token_recall(reference, candidate):
+    """Share of the reference word tokens that the candidate text also contains."""
+    ref_tokens = Counter(re.findall(r'\w+', reference.lower()))
+    cand_tokens = Counter(re.findall(r'\w+', candidate.lower()))
+    total = sum(ref_tokens.values())
+    if not total:
+        return 1.0
+    return sum((ref_tokens & cand_tokens).values()) / total
+
+
+class Command(BaseCommand):
+    help = 'Compare OCR time, peak RSS and text recall of adaptive grayscale rendering against fixed 300-DPI RGB'
+
+    def add_arguments(self, parser):
+        parser.add_argument('pdfs', nargs='+', help='Scanned PDF files to OCR')
+        parser.add_argument(
+            '--reference-dir',
+            help='Directory with <name>.txt ground truth per PDF; defaults to the 300-DPI RGB output'
+        )
+
+    def handle(self, *args, **options):
+        context = multiprocessing.get_context('spawn')
+
+        for pdf_path in options['pdfs']:
+            if not os.path.exists(pdf_path):
+                raise CommandError(f'File not found: {pdf_path}')
+
+            with context.Pool(1) as pool:
+                fixed = pool.apply(_run_ocr, (pdf_path, True))
+            with context.Pool(1) as pool:
+                adaptive = pool.apply(_run_ocr, (pdf_path, False))
+
+            reference = fixed['text']
+            if options['reference_dir']:
+                name = os.path.splitext(os.path.basename(pdf_path))[0]
+                with open(os.path.join(options['reference_dir'], f'{name}.txt'), encoding='utf-8') as f:
+                    reference = f.read()
+
+            self.stdout.write(self.style.SUCCESS(os.path.basename(pdf_path)))
+            for label, result in (('fixed 300 DPI RGB', fixed), ('adaptive grayscale', adaptive)):
+                self.stdout.write(
+                    f"  {label:<20} time {result['seconds']:7.2f}s  "
+                    f"peak RSS {result['peak_mb']:8.1f} MB "
+                    f"(+{result['peak_mb'] - result['baseline_mb']:.1f} MB over loaded model)  "
+                    f"recall {_token_recall(reference, result['text']):.3f}  "
+                    f"DPI {result['dpis']}"
+                )
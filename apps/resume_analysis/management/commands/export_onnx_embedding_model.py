@@ -0,0 +1,37 @@
+import os
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+QUANTIZATION_CONFIGS = ('avx2', 'avx512', 'avx512_vnni', 'arm64')
+
+
+class Command(BaseCommand):
+    help = 'Export the sentence embedding model to ONNX with int8 dynamic quantisation for the onnx backend'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--model', default=None, help='Model name or path; settings.EMBEDDING_MODEL by default')
+        parser.add_argument('--output', default=None, help='Output directory; settings.EMBEDDING_ONNX_MODEL_DIR by default')
+        parser.add_argument(
+            '--config', choices=QUANTIZATION_CONFIGS, default='avx2',
+            help='Quantisation kernels to target; pick the newest instruction set every worker CPU supports'
+        )
+
+    def handle(self, *args, **options):
+        from sentence_transformers import SentenceTransformer, export_dynamic_quantized_onnx_model
+
+        model_name = options['model'] or settings.EMBEDDING_MODEL
+        output = options['output'] or settings.EMBEDDING_ONNX_MODEL_DIR
+
+        self.stdout.write(f"Exporting {model_name} to ONNX in {output}")
+        model = SentenceTransformer(model_name, backend='onnx', device='cpu')
+        model.save(output)  # fp32 graph in onnx/model.onnx, with the tokenizer and pooling config
+
+        export_dynamic_quantized_onnx_model(model, options['config'], output)
+        file_name = f"onnx/model_qint8_{options['config']}.onnx"
+        size_mb = os.path.getsize(os.path.join(output, file_name)) / 1024 / 1024
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote {file_name} ({size_mb:.0f} MB). Set EMBEDDING_BACKEND=onnx, "
+            f"EMBEDDING_ONNX_MODEL_DIR={output} and EMBEDDING_ONNX_FILE={file_name}, "
+            f"and check parity with benchmark_embeddings before switching."
+        ))
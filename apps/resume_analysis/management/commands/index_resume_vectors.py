@@ -0,0 +1,59 @@
+import time
+from django.core.management.base import BaseCommand
+from apps.resume_analysis.models import Resume, ResumeContent
+from apps.resume_analysis.services.pinecone_service import PineconeService
+
+class Command(BaseCommand):
+    help = 'Create the Pinecone vectors of stored resumes, encoding and upserting many resumes at a time'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help='Re-index resumes that already have vectors')
+        parser.add_argument('--batch-size', type=int, default=64, help='Resumes encoded and upserted per batch')
+        parser.add_argument('--limit', type=int, help='Stop after this many resumes')
+
+    def handle(self, *args, **options):
+        resumes = (
+            Resume.objects.select_related('resumecontent')
+            .filter(resumecontent__isnull=False, duplicate_of__isnull=True)
+            .exclude(resumecontent__raw_text='')
+            # Failed extractions store a placeholder text next to the error
+            .exclude(resumecontent__structured_data__has_key='error')
+            .order_by('pk')
+        )
+        if not options['all']:
+            resumes = resumes.filter(resumecontent__vector_id__isnull=True)
+        if options['limit']:
+            resumes = resumes[:options['limit']]
+
+        service = PineconeService()
+        batch_size = max(1, options['batch_size'])
+        started = time.perf_counter()
+        indexed = vectors = 0
+
+        batch = []
+        for resume in resumes.iterator(chunk_size=batch_size):
+            batch.append(resume)
+            if len(batch) == batch_size:
+                vectors += self._index_batch(service, batch)
+                indexed += len(batch)
+                batch = []
+        if batch:
+            vectors += self._index_batch(service, batch)
+            indexed += len(batch)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Indexed {indexed} resume(s) as {vectors} vector(s) in {time.perf_counter() - started:.1f}s"
+        ))
+
+    def _index_batch(self, service, batch):
+        """Encode and upsert the vectors of a batch of resumes and record their vector ids."""
+        written = service.create_vectors_for_resumes(batch)
+        ResumeContent.objects.bulk_update(
+            [self._with_vector_id(resume) for resume in batch], ['vector_id']
+        )
+        return written
+
+    def _with_vector_id(self, resume):
+        content = resume.resumecontent
+        content.vector_id = f"{resume.file_id}-full_text"
+        return content
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+from apps.resume_analysis.services.extraction_cache import ExtractionCache
+from apps.resume_analysis.services.json_repair import LLMOutputStats
+from apps.resume_analysis.services.llm_cache import LLMResponseCache
+
+class Command(BaseCommand):
+    help = (
+        'Show the hit rates of the LLM response and extraction caches and how often '
+        'malformed answers avoided a retry'
+    )
+
+    def handle(self, *args, **options):
+        stats = LLMResponseCache().stats()
+        self.stdout.write(
+            f"LLM response cache: {stats['hits']} hits, {stats['misses']} misses, "
+            f"hit rate {stats['hit_rate']:.1%}"
+        )
+        output = LLMOutputStats().stats()
+        self.stdout.write(
+            f"Malformed answers: {output['repaired']} repaired, {output['continued']} continued, "
+            f"{output['unrepairable']} retried ({output['retries_avoided']} retries avoided)"
+        )
+        extraction = ExtractionCache().stats()
+        self.stdout.write(
+            f"Extraction cache: {extraction['hits']} hits, {extraction['misses']} misses, "
+            f"hit rate {extraction['hit_rate']:.1%}, {extraction['writes']} writes, "
+            f"{extraction['evictions']} evictions"
+        )
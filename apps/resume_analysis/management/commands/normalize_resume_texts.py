@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+from apps.resume_analysis.models import ResumeContent
+from apps.resume_analysis.services.text_normalizer import TextNormalizer
+
+class Command(BaseCommand):
+    help = 'Store the compact normalised text of resumes and report the tokens it saves'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help='Normalise resumes that already have a compact text')
+
+    def handle(self, *args, **options):
+        contents = ResumeContent.objects.exclude(raw_text='')
+        if not options['all']:
+            contents = contents.filter(compact_text='')
+
+        normalizer = TextNormalizer()
+        count = raw_tokens = compact_tokens = 0
+        for content in contents.iterator():
+            normalized = normalizer.normalize(content.raw_text)
+            content.compact_text = normalized['text']
+            content.structured_data = {**(content.structured_data or {}), 'normalization': normalized['stats']}
+            content.save(update_fields=['compact_text', 'structured_data'])
+            count += 1
+            raw_tokens += normalized['stats']['raw_tokens']
+            compact_tokens += normalized['stats']['compact_tokens']
+
+        saved = raw_tokens - compact_tokens
+        self.stdout.write(self.style.SUCCESS(
+            f"Normalised {count} resume(s): {raw_tokens} -> {compact_tokens} tokens "
+            f"({saved} saved, {saved / raw_tokens if raw_tokens else 0:.1%})"
+        ))
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from apps.resume_analysis.utils.fake_batch_server import FakeBatchServer
+
+class Command(BaseCommand):
+    help = 'Run a local stand-in for the Mistral batch API (set LLM_BATCH_API_URL to the printed URL)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=8765)
+        parser.add_argument('--processing-seconds', type=float, default=5, help='How long jobs report RUNNING')
+
+    def handle(self, *args, **options):
+        server = FakeBatchServer(
+            (options['host'], options['port']),
+            processing_seconds=options['processing_seconds']
+        )
+        self.stdout.write(self.style.SUCCESS(f"Fake batch API listening on {server.base_url}"))
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
@@ -0,0 +1,64 @@
+# Generated by Django 5.1.6 on 2026-10-18 09:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("resume_analysis", "0003_resumecontent_upload_date_resumecontent_uploaded_by"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="resume",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("processing", "Processing"),
+                    ("processed", "Processed"),
+                    ("partial", "Partial"),
+                    ("failed", "Failed"),
+                ],
+                default="processing",
+                max_length=20,
+            ),
+        ),
+        migrations.AddField(
+            model_name="resume",
+            name="file_path",
+            field=models.CharField(blank=True, max_length=500),
+        ),
+        migrations.AddField(
+            model_name="resume",
+            name="processing_stage",
+            field=models.CharField(
+                choices=[
+                    ("queued", "Queued"),
+                    ("extracting_text", "Extracting text"),
+                    ("extracting_features", "Extracting features"),
+                    ("embedding", "Creating vectors"),
+                    ("graph", "Writing graph"),
+                    ("completed", "Completed"),
+                    ("failed", "Failed"),
+                ],
+                default="queued",
+                max_length=30,
+            ),
+        ),
+        migrations.AddField(
+            model_name="resume",
+            name="task_id",
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AddField(
+            model_name="resume",
+            name="stage_updated_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="resumecontent",
+            name="vector_id",
+            field=models.CharField(blank=True, max_length=255, null=True),
+        ),
+    ]
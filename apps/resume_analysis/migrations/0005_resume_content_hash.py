@@ -0,0 +1,36 @@
+# Generated by Django 5.1.6 on 2026-10-18 09:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("resume_analysis", "0004_resume_pipeline_stage"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="resume",
+            name="content_hash",
+            field=models.CharField(blank=True, max_length=64),
+        ),
+        migrations.AddField(
+            model_name="resume",
+            name="duplicate_of",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="duplicates",
+                to="resume_analysis.resume",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="resume",
+            index=models.Index(
+                fields=["user", "content_hash"], name="resume_user_hash_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.6 on 2026-10-18 10:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("resume_analysis", "0005_resume_content_hash"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="resumecontent",
+            name="compact_text",
+            field=models.TextField(blank=True, default=""),
+        ),
+    ]
@@ -2,6 +2,7 @@ import datetime
 import uuid
 from django.contrib.auth.models import User
 from django.db import models
+from django.utils import timezone
 from .services.llm_processor import LLMProcessor
 
 class Resume(models.Model):
@@ -14,10 +15,27 @@ class Resume(models.Model):
         original_filename (CharField): The original filename of the uploaded resume.
         upload_date (DateTimeField): The date and time when the resume was uploaded.
         status (CharField): The processing status of the resume.
+        file_path (CharField): The storage path of the uploaded file.
+        processing_stage (CharField): The ingestion pipeline stage the resume is in.
+        task_id (CharField): The Celery id of the ingestion job for the resume.
+        stage_updated_at (DateTimeField): The date and time of the last stage change.
+        content_hash (CharField): The SHA-256 fingerprint of the uploaded file.
+        duplicate_of (ForeignKey): The already processed resume this upload reuses, if any.
     """
     STATUS_CHOICES = [
         ("processing", "Processing"),
         ("processed", "Processed"),
+        ("partial", "Partial"),
+        ("failed", "Failed"),
+    ]
+
+    STAGE_CHOICES = [
+        ("queued", "Queued"),
+        ("extracting_text", "Extracting text"),
+        ("extracting_features", "Extracting features"),
+        ("embedding", "Creating vectors"),
+        ("graph", "Writing graph"),
+        ("completed", "Completed"),
         ("failed", "Failed"),
     ]
 
@@ -28,16 +46,67 @@ class Resume(models.Model):
     status = models.CharField(
         max_length=20, choices=STATUS_CHOICES, default="processing"
     )
+    file_path = models.CharField(max_length=500, blank=True)
+    processing_stage = models.CharField(
+        max_length=30, choices=STAGE_CHOICES, default="queued"
+    )
+    task_id = models.CharField(max_length=255, blank=True)
+    stage_updated_at = models.DateTimeField(null=True, blank=True)
+    content_hash = models.CharField(max_length=64, blank=True)
+    duplicate_of = models.ForeignKey(
+        "self", null=True, blank=True, on_delete=models.SET_NULL, related_name="duplicates"
+    )
 
     class Meta:
         db_table = "resume_analysis_resume"
         verbose_name = "Resume"
         verbose_name_plural = "Resumes"
+        indexes = [
+            models.Index(fields=["user", "content_hash"], name="resume_user_hash_idx"),
+        ]
 
     def __str__(self):
         """Return a string representation of the resume."""
         return f"{self.original_filename} ({self.status})"
 
+    def find_processed_duplicate(self):
+        """
+        Find an already processed resume of the same user with the same file contents.
+
+        Returns:
+            Resume or None: The original resume whose content can be reused.
+        """
+        if not self.content_hash:
+            return None
+        return (
+            Resume.objects.filter(
+                user=self.user,
+                content_hash=self.content_hash,
+                duplicate_of__isnull=True,
+                status__in=["processed", "partial"],
+                resumecontent__isnull=False,
+            )
+            .exclude(file_id=self.file_id)
+            .order_by("upload_date")
+            .first()
+        )
+
+    def set_stage(self, stage, status=None):
+        """
+        Record the pipeline stage of the resume.
+
+        Args:
+            stage (str): One of the STAGE_CHOICES keys.
+            status (str, optional): A new processing status to store alongside the stage.
+        """
+        self.processing_stage = stage
+        self.stage_updated_at = timezone.now()
+        update_fields = ["processing_stage", "stage_updated_at"]
+        if status:
+            self.status = status
+            update_fields.append("status")
+        self.save(update_fields=update_fields)
+
 
 class ResumeContent(models.Model):
     """
@@ -52,6 +121,8 @@ class ResumeContent(models.Model):
         processing_error (TextField): Any error encountered during processing.
         upload_date (DateTimeField): The date and time when the content was uploaded.
         uploaded_by (CharField): The name of the user who uploaded the content.
+        vector_id (CharField): The id of the full text vector stored in Pinecone.
+        compact_text (TextField): The normalised text used by the LLM, the embeddings and search.
     """
     resume = models.OneToOneField(Resume, on_delete=models.CASCADE, primary_key=True)
     raw_text = models.TextField()
@@ -61,15 +132,22 @@ class ResumeContent(models.Model):
     processing_error = models.TextField(null=True, blank=True)
     upload_date = models.DateTimeField(default=datetime.datetime.utcnow)
     uploaded_by = models.CharField(max_length=150, blank=True)
+    vector_id = models.CharField(max_length=255, null=True, blank=True)
+    compact_text = models.TextField(blank=True, default="")
 
     class Meta:
         db_table = "resume_analysis_resumecontent"
         verbose_name = "Resume Content"
         verbose_name_plural = "Resume Contents"
 
+    @property
+    def processing_text(self):
+        """str: The compact text, or the raw text for content not normalised yet."""
+        return self.compact_text or self.raw_text
+
     def extract_features(self):
         """
-        Extract features from the resume using an LLM processor with retries.
+        Extract features from the resume using an LLM processor with per-chunk retries.
 
         Raises:
             Exception: If an error occurs during feature extraction.
@@ -79,7 +157,7 @@ class ResumeContent(models.Model):
         """
         try:
             processor = LLMProcessor()
-            features = processor.extract_resume_features(self.raw_text, max_retries=3)
+            features = processor.extract_resume_features(self.processing_text)
 
             if "error" in features:
                 self.processing_error = (
@@ -89,7 +167,11 @@ class ResumeContent(models.Model):
                 raise Exception(self.processing_error)
 
             self.extracted_features = features
-            self.processing_error = None
+            incomplete = features.get("extraction_incomplete")
+            self.processing_error = (
+                f"Features incomplete: {incomplete['failed_chunks']} of {incomplete['total_chunks']} "
+                f"chunk(s) failed ({'; '.join(incomplete['errors'])})"
+            ) if incomplete else None
             self.save()
             return features
 
@@ -0,0 +1,161 @@
+import logging
+import os
+import time
+import numpy as np
+from django.conf import settings
+
+from .model_registry import model_registry
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_EMBEDDING_MODEL = 'sentence-transformers/all-mpnet-base-v2'
+
+
+def embedding_model_name():
+    """Return the name or local path of the sentence embedding model in settings."""
+    return getattr(settings, 'EMBEDDING_MODEL', DEFAULT_EMBEDDING_MODEL)
+
+
+def embedding_backend():
+    """Return the inference backend of the embedding model in settings: 'torch' or 'onnx'."""
+    return getattr(settings, 'EMBEDDING_BACKEND', 'torch')
+
+
+def embedding_model_version():
+    """Identify the vectors the configured model produces, for cache keys.
+
+    Quantised ONNX vectors differ slightly from the PyTorch ones, so the
+    backend is part of the version.
+    """
+    if embedding_backend() == 'onnx':
+        return f"onnx:{getattr(settings, 'EMBEDDING_ONNX_MODEL_DIR', '')}/{getattr(settings, 'EMBEDDING_ONNX_FILE', '')}"
+    return f"torch:{embedding_model_name()}"
+
+
+def _registry_key():
+    return f"embedding:{embedding_model_version()}"
+
+
+def physical_cpu_count():
+    """Return the number of physical cores (hyper-threads do not speed up int8 matrix products)."""
+    try:
+        import psutil
+        return psutil.cpu_count(logical=False) or os.cpu_count() or 1
+    except ImportError:
+        return os.cpu_count() or 1
+
+
+def shared_onnx_threads():
+    """Return the intra-op threads of one process when they are not set.
+
+    Every Celery worker process runs its own inference session, so the
+    physical cores are divided by CELERY_WORKER_CONCURRENCY (one process
+    per logical CPU by default) instead of each session taking all of them.
+    """
+    concurrency = getattr(settings, 'CELERY_WORKER_CONCURRENCY', None) or os.cpu_count() or 1
+    return max(1, physical_cpu_count() // concurrency)
+
+
+def onnx_session_options(threads=None):
+    """Build ONNX Runtime session options for CPU inference.
+
+    Args:
+        threads (int, optional): Threads used inside an operator; the process
+            share of the physical cores when 0 or None (see shared_onnx_threads).
+
+    Returns:
+        onnxruntime.SessionOptions: The options passed to the inference session.
+    """
+    import onnxruntime
+
+    options = onnxruntime.SessionOptions()
+    options.intra_op_num_threads = threads or shared_onnx_threads()
+    options.inter_op_num_threads = 1  # the encoder graph is sequential
+    options.execution_mode = onnxruntime.ExecutionMode.ORT_SEQUENTIAL
+    options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+    return options
+
+
+def load_embedding_model(backend='torch', name=None, onnx_dir=None, onnx_file=None, threads=None):
+    """Load a sentence embedding model on the given backend.
+
+    Args:
+        backend (str): 'torch' runs the model in PyTorch; 'onnx' runs a model
+            exported by the export_onnx_embedding_model command in ONNX Runtime.
+        name (str, optional): The model name or path for the PyTorch backend.
+        onnx_dir (str, optional): The directory of the exported model.
+        onnx_file (str, optional): The ONNX file to run, relative to onnx_dir.
+        threads (int, optional): ONNX Runtime intra-op threads; the process share of the physical cores by default.
+
+    Returns:
+        SentenceTransformer: The loaded model.
+    """
+    from sentence_transformers import SentenceTransformer
+
+    if backend == 'onnx':
+        return SentenceTransformer(
+            onnx_dir,
+            backend='onnx',
+            device='cpu',
+            model_kwargs={
+                'file_name': onnx_file,
+                'provider': 'CPUExecutionProvider',
+                'session_options': onnx_session_options(threads),
+            }
+        )
+    if backend != 'torch':
+        raise ValueError(f"Unknown embedding backend: {backend}")
+    return SentenceTransformer(name or DEFAULT_EMBEDDING_MODEL)
+
+
+def get_embedding_model():
+    """Return the process-wide sentence embedding model, loading it on first use.
+
+    Returns:
+        SentenceTransformer: The shared model, on the backend chosen by settings.EMBEDDING_BACKEND.
+    """
+    return model_registry.get(_registry_key(), lambda: load_embedding_model(
+        backend=embedding_backend(),
+        name=embedding_model_name(),
+        onnx_dir=getattr(settings, 'EMBEDDING_ONNX_MODEL_DIR', None),
+        onnx_file=getattr(settings, 'EMBEDDING_ONNX_FILE', None),
+        threads=getattr(settings, 'EMBEDDING_ONNX_THREADS', 1),
+    ))
+
+
+def cosine_agreement(reference, candidate):
+    """Return the cosine similarity of each pair of rows of two embedding matrices.
+
+    Args:
+        reference (numpy.ndarray): The reference vectors, one per row.
+        candidate (numpy.ndarray): The vectors to compare, in the same order.
+
+    Returns:
+        numpy.ndarray: One cosine per row.
+    """
+    reference = np.asarray(reference, dtype=np.float32)
+    candidate = np.asarray(candidate, dtype=np.float32)
+    norms = np.linalg.norm(reference, axis=1) * np.linalg.norm(candidate, axis=1)
+    return np.einsum('ij,ij->i', reference, candidate) / np.maximum(norms, 1e-12)
+
+
+def encode(texts, **kwargs):
+    """Encode one text or a list of texts with the shared embedding model.
+
+    The latency of the call is recorded in the model registry.
+
+    Args:
+        texts (str or list): The text(s) to encode.
+        **kwargs: Passed on to SentenceTransformer.encode.
+
+    Returns:
+        numpy.ndarray: One vector for a single text, a matrix for a list.
+    """
+    model = get_embedding_model()
+    started = time.perf_counter()
+    vectors = model.encode(texts, **kwargs)
+    elapsed = time.perf_counter() - started
+    items = 1 if isinstance(texts, str) else len(texts)
+    model_registry.record_call(_registry_key(), elapsed, items=items)
+    logger.debug(f"Encoded {items} text(s) in {elapsed * 1000:.1f}ms")
+    return vectors
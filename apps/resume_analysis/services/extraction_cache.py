@@ -0,0 +1,174 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import zlib
+from django.conf import settings
+from django.core.cache import caches
+
+logger = logging.getLogger(__name__)
+
+# Writes after which the cache directory is rescanned even if the size estimate
+# is within bounds, to account for entries written by other processes
+RESCAN_EVERY_WRITES = 100
+
+# Eviction frees the cache down to this share of max_bytes, so the next
+# writes do not push it straight back over the bound and into another scan
+EVICT_TO_SHARE = 0.9
+
+
+class ExtractionCache:
+    """Disk-backed, compressed cache of extracted resume text.
+
+    Entries are keyed by the SHA-256 of the file plus the extractor and OCR
+    model versions, so a new extractor or OCR model never serves stale text.
+    Each entry is a zlib-compressed JSON file; reading an entry refreshes its
+    modification time and the least recently used entries are evicted once
+    the cache grows beyond max_bytes, down to EVICT_TO_SHARE of it. The directory is only scanned when the
+    size estimate kept by this process goes over max_bytes, or every
+    RESCAN_EVERY_WRITES writes, not on every write. Hit, miss, write and
+    eviction counters live in the LLM cache (Redis by default) so they cover
+    the web process and every worker.
+
+    Attributes:
+        directory (str): Where the entries are stored.
+        max_bytes (int): The size bound of the cache on disk.
+        counters: The Django cache holding the shared counters.
+    """
+
+    COUNTERS = ('hits', 'misses', 'writes', 'evictions')
+
+    _estimates_lock = threading.Lock()
+    _size_estimates = {}  # directory -> (estimated bytes on disk, writes since the last scan)
+
+    def __init__(self, directory=None, max_bytes=None, alias=None):
+        """Initialize the cache from settings unless values are given."""
+        self.directory = str(directory or getattr(
+            settings, 'EXTRACTION_CACHE_DIR', os.path.join(settings.BASE_DIR, 'cache', 'extraction')
+        ))
+        self.max_bytes = max_bytes if max_bytes is not None else getattr(
+            settings, 'EXTRACTION_CACHE_MAX_BYTES', 512 * 1024 * 1024
+        )
+        self.counters = caches[alias or getattr(settings, 'LLM_CACHE_ALIAS', 'llm')]
+
+    def _count(self, name, amount=1):
+        key = f"extraction_cache:{name}"
+        try:
+            self.counters.add(key, 0, timeout=None)
+            self.counters.incr(key, amount)
+        except Exception:
+            pass
+
+    def stats(self):
+        """Return the hit, miss, write and eviction counters of every process.
+
+        Returns:
+            dict: The counters and the hit rate.
+        """
+        try:
+            stats = {name: self.counters.get(f"extraction_cache:{name}") or 0 for name in self.COUNTERS}
+        except Exception:
+            stats = dict.fromkeys(self.COUNTERS, 0)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / lookups, 3) if lookups else 0.0
+        return stats
+
+    def make_key(self, file_hash, *versions):
+        """Build the cache key of a file for the given extractor and model versions."""
+        return hashlib.sha256(':'.join([file_hash, *versions]).encode('utf-8')).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], f"{key}.json.z")
+
+    def get(self, key):
+        """Return the cached extraction for a key, or None on a miss.
+
+        Args:
+            key (str): A key built by make_key.
+
+        Returns:
+            dict or None: The cached extraction result.
+        """
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                value = json.loads(zlib.decompress(f.read()).decode('utf-8'))
+            os.utime(path)
+        except FileNotFoundError:
+            self._count('misses')
+            return None
+        except Exception as e:
+            logger.warning(f"Discarding unreadable extraction cache entry {key}: {str(e)}")
+            self._remove(path)
+            self._count('misses')
+            return None
+
+        self._count('hits')
+        return value
+
+    def set(self, key, value):
+        """Store an extraction result and evict old entries if the cache is too large.
+
+        Args:
+            key (str): A key built by make_key.
+            value (dict): A JSON-serialisable extraction result.
+        """
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            payload = zlib.compress(json.dumps(value).encode('utf-8'), 6)
+            fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(payload)
+            os.replace(temp_path, path)
+            self._count('writes')
+            if self._needs_scan(len(payload)):
+                self._evict()
+        except Exception as e:
+            logger.warning(f"Could not write extraction cache entry {key}: {str(e)}")
+
+    def _remove(self, path):
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+
+    def _needs_scan(self, written):
+        """Add a write to the size estimate of the directory and say whether to rescan it."""
+        with self._estimates_lock:
+            estimate, writes = self._size_estimates.get(self.directory, (None, 0))
+            if estimate is None:
+                return True
+            estimate, writes = estimate + written, writes + 1
+            self._size_estimates[self.directory] = (estimate, writes)
+        return estimate > self.max_bytes or writes >= RESCAN_EVERY_WRITES
+
+    def _evict(self):
+        """Delete the least recently used entries until the cache is back under its low-water mark."""
+        entries = []
+        total = 0
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if not name.endswith('.json.z'):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+
+        if total > self.max_bytes:
+            low_water = self.max_bytes * EVICT_TO_SHARE
+            for _, size, path in sorted(entries):
+                self._remove(path)
+                self._count('evictions')
+                total -= size
+                if total <= low_water:
+                    break
+
+        with self._estimates_lock:
+            self._size_estimates[self.directory] = (total, 0)
@@ -0,0 +1,58 @@
+from django.conf import settings
+
+
+class ExtractionPlanner:
+    """Decides once, from a cheap probe of the PDF text layer, how a document is extracted.
+
+    The plan is one of:
+        'text_layer': every page has usable text, no OCR at all.
+        'partial_ocr': only the pages without a usable text layer are OCR'd.
+        'full_ocr': the text layer is unusable as a whole and every page is OCR'd.
+
+    Attributes:
+        min_page_length (int): Characters a page needs to keep its text layer.
+        min_document_length (int): Characters the kept text layer needs in total,
+            below which the whole document is OCR'd.
+        mode (str): 'per_page' or 'document' (no partial OCR).
+    """
+
+    def __init__(self, min_page_length=None, min_document_length=None, mode=None):
+        """Initialize the planner from settings unless values are given."""
+        self.min_page_length = min_page_length if min_page_length is not None else getattr(
+            settings, 'MIN_PAGE_TEXT_LENGTH', 20
+        )
+        self.min_document_length = min_document_length if min_document_length is not None else getattr(
+            settings, 'MIN_EXTRACTED_TEXT_LENGTH', 100
+        )
+        self.mode = mode or getattr(settings, 'PDF_EXTRACTION_MODE', 'per_page')
+
+    def plan(self, page_texts):
+        """Choose the extraction strategy for a document.
+
+        Args:
+            page_texts (list): The stripped text layer of each page.
+
+        Returns:
+            dict: The 'strategy' and the zero-based 'ocr_pages' to OCR.
+        """
+        all_pages = list(range(len(page_texts)))
+
+        if self.mode == 'document':
+            if sum(len(page_text) for page_text in page_texts) < self.min_document_length:
+                return {'strategy': 'full_ocr', 'ocr_pages': all_pages}
+            return {'strategy': 'text_layer', 'ocr_pages': []}
+
+        weak_pages = [
+            index for index, page_text in enumerate(page_texts)
+            if len(page_text) < self.min_page_length
+        ]
+        kept_length = sum(
+            len(page_text) for index, page_text in enumerate(page_texts)
+            if index not in weak_pages
+        )
+
+        if kept_length < self.min_document_length:
+            return {'strategy': 'full_ocr', 'ocr_pages': all_pages}
+        if weak_pages:
+            return {'strategy': 'partial_ocr', 'ocr_pages': weak_pages}
+        return {'strategy': 'text_layer', 'ocr_pages': []}
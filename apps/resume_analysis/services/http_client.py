@@ -0,0 +1,51 @@
+import logging
+import os
+import threading
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+def get_http_session(name='mistral'):
+    """Return the process-wide HTTP session used to call an API.
+
+    The session keeps its connections alive and pooled, so callers (views,
+    Celery tasks, management commands) only pay for the request itself, not
+    for a new TLS handshake. Sessions are per process: a forked worker gets
+    its own instead of sharing the sockets of its parent. Retries are left
+    to the callers (see LLMProcessor), so the adapter never retries.
+
+    Args:
+        name (str): The API the session is for.
+
+    Returns:
+        requests.Session: The shared session.
+    """
+    key = (name, os.getpid())
+    session = _sessions.get(key)
+    if session is not None:
+        return session
+
+    with _sessions_lock:
+        session = _sessions.get(key)
+        if session is None:
+            pool_size = getattr(settings, 'MISTRAL_HTTP_POOL_SIZE', 10)
+            adapter = HTTPAdapter(max_retries=0, pool_connections=2, pool_maxsize=pool_size)
+            session = requests.Session()
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            _sessions[key] = session
+            logger.info(f"Created {name} HTTP session with a pool of {pool_size} connection(s)")
+    return session
+
+
+def close_http_sessions():
+    """Close the sessions of this process and their pooled connections."""
+    with _sessions_lock:
+        for key in [key for key in _sessions if key[1] == os.getpid()]:
+            _sessions.pop(key).close()
@@ -0,0 +1,177 @@
+import json
+import logging
+import re
+from django.conf import settings
+from django.core.cache import caches
+
+logger = logging.getLogger(__name__)
+
+# Cut points tried, from the end, before giving up on a truncated answer
+MAX_REPAIR_CUTS = 200
+
+CODE_FENCE_RE = re.compile(r'^\s*```(?:json)?\s*|\s*```\s*$', re.IGNORECASE)
+
+
+def _scan(text):
+    """Scan JSON text, tracking open containers and positions where it can be cut.
+
+    Returns:
+        tuple: The closers of the containers still open, whether the text ends
+            inside a string, and (position, closers) pairs at which every value
+            before the position is complete.
+    """
+    stack, cuts = [], []
+    in_string = escape = False
+    for position, char in enumerate(text):
+        if in_string:
+            if escape:
+                escape = False
+            elif char == '\\':
+                escape = True
+            elif char == '"':
+                in_string = False
+            continue
+        if char == '"':
+            in_string = True
+        elif char in '{[':
+            stack.append('}' if char == '{' else ']')
+            cuts.append((position + 1, ''.join(reversed(stack))))
+        elif char in '}]':
+            if stack:
+                stack.pop()
+            cuts.append((position + 1, ''.join(reversed(stack))))
+        elif char == ',':
+            cuts.append((position, ''.join(reversed(stack))))
+    return ''.join(reversed(stack)), in_string, cuts
+
+
+def _complete(text, closers, in_string):
+    """Close an open string and the open containers at the end of a text."""
+    if in_string:
+        if text.endswith('\\') and not text.endswith('\\\\'):
+            text = text[:-1]
+        text += '"'
+    text = text.rstrip()
+    if text.endswith(','):
+        text = text[:-1]
+    elif text.endswith(':'):
+        text += ' null'
+    return text + closers
+
+
+def repair_json(text):
+    """Parse JSON produced by an LLM, repairing truncated or fenced output.
+
+    A truncated answer is completed by closing the open string, arrays and
+    objects; if that is not valid JSON, the text is cut back to the last
+    point where every value was complete and closed there.
+
+    Args:
+        text (str): The model output.
+
+    Returns:
+        tuple: The parsed value (None if it could not be repaired) and True if
+            the text needed a repair.
+    """
+    try:
+        return json.loads(text), False
+    except (TypeError, ValueError):
+        pass
+
+    text = CODE_FENCE_RE.sub('', text or '')
+    start = min((i for i in (text.find('{'), text.find('[')) if i >= 0), default=-1)
+    if start < 0:
+        return None, True
+    text = text[start:]
+
+    closers, in_string, cuts = _scan(text)
+    candidates = [_complete(text, closers, in_string)]
+    candidates.extend(
+        _complete(text[:position], cut_closers, False)
+        for position, cut_closers in reversed(cuts[-MAX_REPAIR_CUTS:])
+    )
+    for candidate in candidates:
+        try:
+            return json.loads(candidate), True
+        except ValueError:
+            continue
+    return None, True
+
+
+def validate_features(features, schema):
+    """Keep the parts of an answer that match the feature schema.
+
+    Fields with the wrong type are dropped, and entries of list fields whose
+    schema items are objects must be objects themselves.
+
+    Args:
+        features (dict): The parsed answer.
+        schema (dict): The expected structure (see llm_processor.FEATURE_SCHEMA).
+
+    Returns:
+        tuple: The cleaned features (None if the answer is not an object) and
+            the list of problems found.
+    """
+    if not isinstance(features, dict):
+        return None, ["answer is not a JSON object"]
+
+    cleaned, problems = {}, []
+    for key, value in features.items():
+        if key not in schema:
+            cleaned[key] = value
+            continue
+        expected = schema[key]
+        if not isinstance(value, type(expected)):
+            problems.append(f"{key} is not a {type(expected).__name__}")
+            continue
+        if isinstance(expected, list) and expected and isinstance(expected[0], dict):
+            entries = [entry for entry in value if isinstance(entry, dict)]
+            if len(entries) != len(value):
+                problems.append(f"{key} has entries that are not objects")
+            value = entries
+        elif isinstance(expected, dict):
+            value = {
+                field: field_value for field, field_value in value.items()
+                if field not in expected or isinstance(field_value, type(expected[field]))
+            }
+            if len(value) != len(features[key]):
+                problems.append(f"{key} has fields of the wrong type")
+        cleaned[key] = value
+    return cleaned, problems
+
+
+class LLMOutputStats:
+    """Counts how malformed LLM answers were handled, shared by every process.
+
+    'repaired' answers were fixed locally, 'continued' ones were completed
+    with a continuation request, and both avoided a full retry of the chunk;
+    'unrepairable' ones had to be sent again.
+    """
+
+    EVENTS = ('repaired', 'continued', 'unrepairable')
+
+    def __init__(self, alias=None):
+        """Initialize the counters on the LLM cache."""
+        self.cache = caches[alias or getattr(settings, 'LLM_CACHE_ALIAS', 'llm')]
+
+    def record(self, event):
+        """Count one answer handled in the given way."""
+        key = f"llm_output:{event}"
+        try:
+            self.cache.add(key, 0, timeout=None)
+            self.cache.incr(key)
+        except Exception:
+            pass
+
+    def stats(self):
+        """Return the counter of each event and the number of retries avoided.
+
+        Returns:
+            dict: The counters plus 'retries_avoided'.
+        """
+        try:
+            stats = {event: self.cache.get(f"llm_output:{event}") or 0 for event in self.EVENTS}
+        except Exception:
+            stats = dict.fromkeys(self.EVENTS, 0)
+        stats['retries_avoided'] = stats['repaired'] + stats['continued']
+        return stats
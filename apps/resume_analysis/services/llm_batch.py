@@ -0,0 +1,123 @@
+import json
+import logging
+import time
+import requests
+from django.conf import settings
+
+from .http_client import get_http_session
+
+logger = logging.getLogger(__name__)
+
+FINISHED_STATUSES = {'SUCCESS', 'FAILED', 'TIMEOUT_EXCEEDED', 'CANCELLED'}
+
+
+class BatchJobError(Exception):
+    """Raised when a batch job cannot be submitted, polled or downloaded."""
+
+
+class MistralBatchClient:
+    """Client of the Mistral batch API: JSONL requests in, JSONL results out.
+
+    Requests are uploaded as a file, run by a batch job, and the results are
+    downloaded from the output file of the finished job. The base URL comes
+    from settings.LLM_BATCH_API_URL, which can point to the local stand-in
+    server (run_fake_batch_server) to run the whole flow offline.
+
+    Attributes:
+        base_url (str): The API root, e.g. https://api.mistral.ai/v1.
+        session (requests.Session): The HTTP session used for every call.
+    """
+
+    def __init__(self, api_key=None, base_url=None, session=None):
+        """Initialize the client from settings unless values are given."""
+        self.api_key = api_key or settings.MISTRAL_API_KEY
+        self.base_url = (base_url or getattr(settings, 'LLM_BATCH_API_URL', 'https://api.mistral.ai/v1')).rstrip('/')
+        self.session = session or get_http_session('mistral')
+        self.timeout_hours = getattr(settings, 'LLM_BATCH_TIMEOUT_HOURS', 24)
+
+    def _request(self, method, path, **kwargs):
+        """Send a request to the API and return the response, raising BatchJobError on failure."""
+        headers = {"Authorization": f"Bearer {self.api_key}", **kwargs.pop('headers', {})}
+        try:
+            response = self.session.request(method, f"{self.base_url}{path}", headers=headers, timeout=120, **kwargs)
+        except requests.RequestException as e:
+            raise BatchJobError(f"Batch API request {method} {path} failed: {str(e)}")
+        if response.status_code >= 400:
+            raise BatchJobError(f"Batch API error {response.status_code} on {method} {path}: {response.text}")
+        return response
+
+    def submit(self, requests_jsonl, model, metadata=None):
+        """Upload a JSONL request file and start a batch job on it.
+
+        Args:
+            requests_jsonl (list): The request lines, dicts with 'custom_id' and 'body'.
+            model (str): The model that runs the requests.
+            metadata (dict, optional): Labels stored with the job.
+
+        Returns:
+            dict: The created job.
+        """
+        payload = "\n".join(json.dumps(line) for line in requests_jsonl).encode('utf-8')
+        uploaded = self._request(
+            'POST', '/files',
+            files={'file': ('resume_features.jsonl', payload, 'application/jsonl')},
+            data={'purpose': 'batch'}
+        ).json()
+
+        job = self._request('POST', '/batch/jobs', json={
+            "input_files": [uploaded['id']],
+            "model": model,
+            "endpoint": "/v1/chat/completions",
+            "metadata": metadata or {},
+            "timeout_hours": self.timeout_hours,
+        }).json()
+        logger.info(f"Submitted batch job {job['id']} with {len(requests_jsonl)} request(s)")
+        return job
+
+    def get_job(self, job_id):
+        """Return the current state of a batch job."""
+        return self._request('GET', f'/batch/jobs/{job_id}').json()
+
+    def wait(self, job_id, poll_interval=None, timeout=None):
+        """Poll a batch job until it has finished.
+
+        Args:
+            job_id (str): The job to wait for.
+            poll_interval (float, optional): Seconds between polls, settings.LLM_BATCH_POLL_SECONDS by default.
+            timeout (float, optional): Seconds to wait at most; no limit by default.
+
+        Returns:
+            dict: The finished job.
+
+        Raises:
+            BatchJobError: If the job has not finished within timeout seconds.
+        """
+        poll_interval = poll_interval if poll_interval is not None else getattr(settings, 'LLM_BATCH_POLL_SECONDS', 30)
+        deadline = time.monotonic() + timeout if timeout else None
+        while True:
+            job = self.get_job(job_id)
+            if job['status'] in FINISHED_STATUSES:
+                return job
+            if deadline and time.monotonic() > deadline:
+                raise BatchJobError(f"Batch job {job_id} still {job['status']} after {timeout}s")
+            time.sleep(poll_interval)
+
+    def results(self, job):
+        """Download the result lines of a finished job.
+
+        Failed requests listed in the error file are returned like the
+        successful ones, with their 'error' set.
+
+        Args:
+            job (dict): The finished job.
+
+        Returns:
+            list: The result lines, dicts with 'custom_id', 'response' and 'error'.
+        """
+        lines = []
+        for file_id in (job.get('output_file'), job.get('error_file')):
+            if not file_id:
+                continue
+            content = self._request('GET', f'/files/{file_id}/content').text
+            lines.extend(json.loads(line) for line in content.splitlines() if line.strip())
+        return lines
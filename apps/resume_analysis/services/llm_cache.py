@@ -0,0 +1,88 @@
+import hashlib
+import logging
+from django.conf import settings
+from django.core.cache import caches
+
+logger = logging.getLogger(__name__)
+
+
+class LLMResponseCache:
+    """Content-addressed cache of parsed LLM responses.
+
+    Responses are stored in a Django cache (Redis by default, see the 'llm'
+    entry of settings.CACHES) under a key built from the model, the prompt
+    version and the SHA-256 of the exact prompt content, so identical resume
+    text never pays for a second call. Entries expire after
+    settings.LLM_CACHE_TTL seconds and Redis evicts the least recently used
+    ones under memory pressure. Hit and miss counters live in the same cache
+    so the hit rate covers every process.
+
+    Attributes:
+        cache: The Django cache backend.
+        ttl (int): Seconds an entry is kept.
+    """
+
+    HITS_KEY = 'llm_cache:hits'
+    MISSES_KEY = 'llm_cache:misses'
+
+    def __init__(self, alias=None, ttl=None):
+        """Initialize the cache from settings unless values are given."""
+        self.cache = caches[alias or getattr(settings, 'LLM_CACHE_ALIAS', 'llm')]
+        self.ttl = ttl if ttl is not None else getattr(settings, 'LLM_CACHE_TTL', 30 * 24 * 3600)
+
+    def make_key(self, model, prompt_version, content):
+        """Build the cache key of a prompt.
+
+        Args:
+            model (str): The LLM model name.
+            prompt_version (str): The version of the system prompt.
+            content (str): The user message sent with the prompt.
+
+        Returns:
+            str: The cache key.
+        """
+        digest = hashlib.sha256(content.encode('utf-8')).hexdigest()
+        return f"llm:{model}:{prompt_version}:{digest}"
+
+    def _count(self, key):
+        try:
+            self.cache.add(key, 0, timeout=None)
+            self.cache.incr(key)
+        except Exception:
+            pass
+
+    def get(self, key):
+        """Return the cached response for a key, or None on a miss or cache failure."""
+        try:
+            value = self.cache.get(key)
+        except Exception as e:
+            logger.warning(f"LLM cache unavailable, calling the API: {str(e)}")
+            return None
+
+        self._count(self.HITS_KEY if value is not None else self.MISSES_KEY)
+        return value
+
+    def set(self, key, value):
+        """Store a parsed response; cache failures are logged and ignored."""
+        try:
+            self.cache.set(key, value, timeout=self.ttl)
+        except Exception as e:
+            logger.warning(f"Could not store LLM response in cache: {str(e)}")
+
+    def stats(self):
+        """Return the hit and miss counters and the hit rate.
+
+        Returns:
+            dict: 'hits', 'misses' and 'hit_rate'.
+        """
+        try:
+            hits = self.cache.get(self.HITS_KEY) or 0
+            misses = self.cache.get(self.MISSES_KEY) or 0
+        except Exception:
+            hits = misses = 0
+        lookups = hits + misses
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': round(hits / lookups, 3) if lookups else 0.0,
+        }
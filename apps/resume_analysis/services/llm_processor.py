@@ -1,20 +1,109 @@
-import requests
-import json
-from django.conf import settings
-import logging
-import time
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
+import copy
 import json
 import logging
 import time
+from concurrent.futures import ThreadPoolExecutor
 import requests
 from django.conf import settings
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
+from .llm_batch import MistralBatchClient
+from .http_client import get_http_session
+from .json_repair import LLMOutputStats, repair_json, validate_features
+from .llm_cache import LLMResponseCache
+from .local_extractor import LocalFeatureExtractor
+from .resume_chunker import ResumeChunker
+from .rate_limiter import CircuitBreaker, MistralRateLimiter, RateLimitTimeout, parse_retry_after
 
 logger = logging.getLogger(__name__)
 
+# Bump whenever the system prompt changes, so cached responses of the old prompt are not reused
+PROMPT_VERSION = "2"
+
+PROMPT_HEADER = """You are an expert resume analyzer. Extract information from the resume chunk and return it ONLY as a valid JSON object.
+If this is not the first chunk, only extract new information not seen before.
+
+Return the JSON in this exact structure:
+"""
+
+FEATURE_SCHEMA = {
+    "contact_info": {
+        "name": "",
+        "email": "",
+        "phone": "",
+        "location": ""
+    },
+    "work_experience": [
+        {
+            "company": "",
+            "title": "",
+            "dates": "",
+            "responsibilities": []
+        }
+    ],
+    "education": [
+        {
+            "institution": "",
+            "degree": "",
+            "dates": "",
+            "gpa": ""
+        }
+    ],
+    "skills": {
+        "technical": [],
+        "soft": []
+    },
+    "projects": [
+        {
+            "name": "",
+            "description": "",
+            "technologies": []
+        }
+    ],
+    "certifications": [],
+    "languages": []
+}
+
+
+def build_system_prompt(resolved_fields=()):
+    """Build the system prompt asking for the fields not extracted yet.
+
+    Args:
+        resolved_fields (iterable): Dotted field names (like "contact_info.email")
+            already extracted locally, left out of the requested structure.
+
+    Returns:
+        str: The system prompt.
+    """
+    schema = copy.deepcopy(FEATURE_SCHEMA)
+    for field in resolved_fields:
+        parent, _, child = field.partition('.')
+        if child:
+            schema.get(parent, {}).pop(child, None)
+            if not schema.get(parent, True):
+                schema.pop(parent)
+        else:
+            schema.pop(parent, None)
+    return PROMPT_HEADER + json.dumps(schema, indent=4)
+
+
+def empty_features():
+    """Return the extracted_features structure with every field empty."""
+    features = {key: [] for key in FEATURE_SCHEMA}
+    features['contact_info'] = {field: "" for field in FEATURE_SCHEMA['contact_info']}
+    features['skills'] = {'technical': [], 'soft': []}
+    return features
+
+
+SYSTEM_PROMPT = build_system_prompt()
+
+BULK_SYSTEM_PROMPT = """You are an expert resume analyzer. You will receive several resumes, each one between a "<<<RESUME n>>>" line and an "<<<END n>>>" line.
+Extract the information of every resume separately and return it ONLY as a valid JSON object.
+
+Return the JSON in this exact structure, with one entry per resume keyed by its number n as a string:
+{"resumes": {"1": RESUME, "2": RESUME}}
+
+where every RESUME has this exact structure:
+""" + json.dumps(FEATURE_SCHEMA, indent=4)
+
 class LLMProcessor:
     """Processes resumes using the Mistral AI API to extract important features."""
 
@@ -24,169 +113,469 @@ class LLMProcessor:
         self.model = "mistral-large-latest"
         self.api_url = "https://api.mistral.ai/v1/chat/completions"
         
-        # Configure retry strategy
-        self.session = requests.Session()
-        retries = Retry(
-            total=3,  # number of retries
-            backoff_factor=1,  # wait 1, 2, 4 seconds between retries
-            status_forcelist=[408, 429, 500, 502, 503, 504],
-            allowed_methods=["POST"]
-        )
-        self.session.mount('https://', HTTPAdapter(max_retries=retries))
-
-    def extract_resume_features(self, text, max_retries=3):
+        self.response_cache = LLMResponseCache() if getattr(settings, 'LLM_CACHE_ENABLED', True) else None
+        self.max_concurrent_chunks = max(1, getattr(settings, 'LLM_MAX_CONCURRENT_CHUNKS', 4))
+
+        # Retries are handled per chunk in extract_resume_features, not by the adapter
+        self.max_attempts = getattr(settings, 'LLM_MAX_ATTEMPTS', 3)
+        self.retry_backoff = getattr(settings, 'LLM_RETRY_BACKOFF_SECONDS', 1)
+        self.expected_output_tokens = getattr(settings, 'LLM_EXPECTED_OUTPUT_TOKENS', 1000)
+
+        # Packing of short resumes into shared requests in extract_resume_features_bulk
+        self.bulk_max_tokens = getattr(settings, 'LLM_BULK_MAX_TOKENS', 24000)
+        self.bulk_max_documents = getattr(settings, 'LLM_BULK_MAX_DOCUMENTS', 8)
+        self.bulk_max_output_tokens = getattr(settings, 'LLM_BULK_MAX_OUTPUT_TOKENS', 16000)
+        self.chunker = ResumeChunker()
+        self.local_extractor = LocalFeatureExtractor() if getattr(settings, 'LLM_LOCAL_EXTRACTION_ENABLED', True) else None
+        self.rate_limiter = MistralRateLimiter()
+        self.circuit_breaker = CircuitBreaker()
+        self.session = get_http_session('mistral')
+        self.batch_client = MistralBatchClient(self.api_key, session=self.session)
+
+        # Truncated answers get continuation requests before being repaired
+        self.max_continuations = getattr(settings, 'LLM_MAX_CONTINUATIONS', 1)
+        self.output_stats = LLMOutputStats()
+
+    def extract_resume_features(self, text, max_retries=None):
         """Extract important features from resume text using Mistral AI.
 
+        Fields that LocalFeatureExtractor finds with confidence (contact
+        details, known skills and languages) are left out of the prompt and
+        taken from the local extraction; when nothing is left to extract the
+        API is not called at all. The text is split along its sections into
+        chunks of at most settings.LLM_CHUNK_MAX_TOKENS tokens (see ResumeChunker).
+
+        Retry state is kept per chunk: each round only re-sends the chunks
+        that failed with a retryable error, and the results of chunks that
+        already succeeded are kept. This loop is the only retry budget (the
+        HTTP adapter does not retry on its own).
+
         Args:
             text (str): The resume text to be processed.
-            max_retries (int): The maximum number of retry attempts for processing.
+            max_retries (int, optional): The maximum number of attempts per chunk,
+                settings.LLM_MAX_ATTEMPTS by default.
 
         Returns:
             dict: A dictionary containing extracted features or error information.
         """
-        
-        # Split text into chunks if it's too long
-        max_chunk_length = 8000  # Adjust based on model's context window
-        chunks = [text[i:i + max_chunk_length] for i in range(0, len(text), max_chunk_length)]
-        
-        for attempt in range(max_retries):
-            try:
-                # If we have multiple chunks, process them separately and combine
-                all_features = {}
-                for chunk_idx, chunk in enumerate(chunks):
-                    chunk_features = self._process_chunk(chunk, chunk_idx, len(chunks))
-                    
-                    if "error" in chunk_features:
-                        logger.warning(f"Error processing chunk {chunk_idx + 1}: {chunk_features['error']}")
-                        continue
-                    
-                    # Merge features
-                    all_features = self._merge_features(all_features, chunk_features)
-
-                # If we got any valid features, return them
-                if all_features:
-                    return all_features
-                
-                # If we got here, no chunks were processed successfully
-                if attempt < max_retries - 1:
-                    wait_time = (attempt + 1) * 5  # Progressive delay: 5s, 10s, 15s
-                    logger.info(f"Retrying in {wait_time} seconds...")
-                    time.sleep(wait_time)
-                    continue
-                
-                return {
-                    "error": "Failed to process resume after multiple attempts",
-                    "details": "All chunks failed processing",
-                    "status": "failed"
+        max_attempts = max(1, max_retries or self.max_attempts)
+
+        local = self.local_extractor.extract(text) if self.local_extractor else None
+        if local and local['complete']:
+            logger.info("All resume fields extracted locally, skipping the LLM")
+            return self._apply_local_features(empty_features(), local)
+        system_prompt = build_system_prompt(local['resolved']) if local else SYSTEM_PROMPT
+
+        # Split text into section-aligned chunks within the token budget
+        chunks = self.chunker.chunk(text)
+
+        results = [None] * len(chunks)
+        pending = list(range(len(chunks)))
+
+        for attempt in range(max_attempts):
+            for chunk_idx, chunk_features in zip(pending, self._process_chunks(chunks, pending, system_prompt)):
+                results[chunk_idx] = chunk_features
+
+            pending = [
+                chunk_idx for chunk_idx in pending
+                if "error" in results[chunk_idx] and self._is_retryable(results[chunk_idx])
+            ]
+            if not pending or attempt == max_attempts - 1:
+                break
+
+            wait_time = self.retry_backoff * (2 ** attempt)
+            logger.info(
+                f"Retrying chunk(s) {[chunk_idx + 1 for chunk_idx in pending]} "
+                f"in {wait_time} seconds (attempt {attempt + 2} of {max_attempts})"
+            )
+            time.sleep(wait_time)
+
+        return self._combine_chunk_results(results, local)
+
+    def _combine_chunk_results(self, results, local=None):
+        """Merge the successful chunk results of a resume in chunk order.
+
+        When only some chunks failed, the merged features carry an
+        'extraction_incomplete' entry with the failed chunk count and errors,
+        so the resume can be marked partial instead of processed.
+
+        Args:
+            results (list): The features or error information of each chunk.
+            local (dict, optional): The result of LocalFeatureExtractor.extract.
+
+        Returns:
+            dict: The merged features, or error information if every chunk failed.
+        """
+        all_features = {}
+        errors = []
+        for chunk_idx, chunk_features in enumerate(results):
+            if "error" in chunk_features:
+                logger.warning(f"Error processing chunk {chunk_idx + 1}: {chunk_features['error']}")
+                errors.append(f"chunk {chunk_idx + 1}: {chunk_features['error']}")
+                continue
+            all_features = self._merge_features(all_features, chunk_features)
+
+        if all_features:
+            if local:
+                all_features = self._apply_local_features(all_features, local)
+            if errors:
+                logger.warning(f"Resume features incomplete: {len(errors)} of {len(results)} chunk(s) failed")
+                all_features["extraction_incomplete"] = {
+                    "failed_chunks": len(errors),
+                    "total_chunks": len(results),
+                    "errors": errors,
                 }
+            return all_features
 
-            except Exception as e:
-                if attempt < max_retries - 1:
-                    wait_time = (attempt + 1) * 5
-                    logger.info(f"Retrying in {wait_time} seconds due to error: {str(e)}")
-                    time.sleep(wait_time)
-                    continue
-                else:
-                    return {
-                        "error": "Processing Error",
-                        "details": str(e),
-                        "status": "failed"
-                    }
-
-    def _process_chunk(self, text_chunk, chunk_idx, total_chunks):
+        return {
+            "error": "Failed to process resume after multiple attempts",
+            "details": "; ".join(
+                f"chunk {chunk_idx + 1}: {result['error']}" for chunk_idx, result in enumerate(results)
+            ) or "All chunks failed processing",
+            "status": "failed"
+        }
+
+    def build_batch_requests(self, documents):
+        """Build the batch API request lines of several resumes, one line per chunk.
+
+        Each line carries the custom id "<document id>:<chunk index>:<chunk count>"
+        so results can be fanned back to their resume.
+
+        Args:
+            documents (iterable): (document_id, text) pairs.
+
+        Returns:
+            tuple: The request lines, and the features of the documents fully
+                extracted locally (which need no request) keyed by document id.
+        """
+        lines, local_features = [], {}
+        for document_id, text in documents:
+            local = self.local_extractor.extract(text) if self.local_extractor else None
+            if local and local['complete']:
+                local_features[document_id] = self._apply_local_features(empty_features(), local)
+                continue
+            system_prompt = build_system_prompt(local['resolved']) if local else SYSTEM_PROMPT
+            chunks = self.chunker.chunk(text)
+            for chunk_idx, chunk in enumerate(chunks):
+                lines.append({
+                    "custom_id": f"{document_id}:{chunk_idx}:{len(chunks)}",
+                    "body": self._chat_body(system_prompt, self._chunk_prompt(chunk, chunk_idx, len(chunks)))
+                })
+        return lines, local_features
+
+    def submit_batch(self, documents):
+        """Submit the feature extraction of several resumes as one batch job.
+
+        Args:
+            documents (iterable): (document_id, text) pairs.
+
+        Returns:
+            tuple: The created job (None if no request was needed) and the
+                features of the documents extracted locally, keyed by document id.
+        """
+        lines, local_features = self.build_batch_requests(documents)
+        job = None
+        if lines:
+            job = self.batch_client.submit(lines, self.model, metadata={"prompt_version": PROMPT_VERSION})
+        return job, local_features
+
+    def collect_batch(self, result_lines, texts):
+        """Turn the results of a finished batch job into features per resume.
+
+        Args:
+            result_lines (list): The result lines of the job, see MistralBatchClient.results.
+            texts (dict): The resume texts keyed by document id, to re-apply
+                the locally extracted fields.
+
+        Returns:
+            dict: The features or error information of each resume in the job,
+                keyed by document id.
+        """
+        chunk_results = {}
+        for line in result_lines:
+            document_id, chunk_idx, total_chunks = line['custom_id'].rsplit(':', 2)
+            results = chunk_results.setdefault(document_id, [None] * int(total_chunks))
+            results[int(chunk_idx)] = self._parse_batch_line(line)
+
+        features = {}
+        for document_id, results in chunk_results.items():
+            results = [
+                result or {"error": "Missing Result", "details": "Chunk missing from the batch output", "status": "failed"}
+                for result in results
+            ]
+            text = texts.get(document_id)
+            local = self.local_extractor.extract(text) if self.local_extractor and text else None
+            features[document_id] = self._combine_chunk_results(results, local)
+        return features
+
+    def _parse_batch_line(self, line):
+        """Parse the features out of one batch result line.
+
+        Args:
+            line (dict): A result line with 'custom_id', 'response' and 'error'.
+
+        Returns:
+            dict: The features, or error information.
+        """
+        if line.get('error'):
+            return {"error": "Batch Error", "details": str(line['error']), "status": "failed"}
+
+        response = line.get('response') or {}
+        if response.get('status_code') != 200:
+            return {
+                "error": f"API Error {response.get('status_code')}",
+                "details": json.dumps(response.get('body')),
+                "status": "failed",
+                "status_code": response.get('status_code')
+            }
+
+        try:
+            content = response['body']['choices'][0]['message']['content']
+        except Exception as e:
+            return {"error": "Processing Error", "details": str(e), "status": "failed"}
+
+        features, repaired = repair_json(content)
+        if repaired:
+            self.output_stats.record('repaired' if features is not None else 'unrepairable')
+        features, _ = validate_features(features, FEATURE_SCHEMA)
+        if features is None:
+            return {"error": "Invalid JSON", "details": str(content)[:200], "status": "failed"}
+        return features
+
+    def extract_resume_features_bulk(self, texts):
+        """Extract the features of many resumes, packing short ones into shared requests.
+
+        Resumes that fit in a single chunk are packed, up to bulk_max_documents
+        and bulk_max_tokens per request, into one prompt with a delimiter
+        around each document, so the system prompt is paid once per pack. The
+        answer is split back per document and validated against the feature
+        schema; resumes that are too long, end up alone in a pack, or whose
+        answer is missing or invalid go through extract_resume_features.
+
+        Args:
+            texts (list): The resume texts.
+
+        Returns:
+            list: The features or error information of each resume, in the order of texts.
+        """
+        results = [None] * len(texts)
+        local_results = [
+            self.local_extractor.extract(text) if self.local_extractor and text else None for text in texts
+        ]
+
+        packable = []
+        for index, (text, local) in enumerate(zip(texts, local_results)):
+            if local and local['complete']:
+                results[index] = self._apply_local_features(empty_features(), local)
+            elif text and self.chunker.count_tokens(text) <= self.chunker.max_tokens:
+                packable.append(index)
+
+        groups = [group for group in self._pack_documents(texts, packable) if len(group) > 1]
+        if groups:
+            with ThreadPoolExecutor(max_workers=min(self.max_concurrent_chunks, len(groups))) as executor:
+                answers = executor.map(lambda group: self._process_document_group(texts, group), groups)
+                for group, group_answers in zip(groups, answers):
+                    for index, features in zip(group, group_answers):
+                        if features is None:
+                            continue
+                        local = local_results[index]
+                        results[index] = self._apply_local_features(features, local) if local else features
+
+        unpacked = [index for index, result in enumerate(results) if result is None]
+        if unpacked:
+            logger.info(f"Extracting {len(unpacked)} of {len(texts)} resume(s) one request at a time")
+        for index in unpacked:
+            results[index] = self.extract_resume_features(texts[index])
+        return results
+
+    def _pack_documents(self, texts, indexes):
+        """Group documents in order so each group fits one bulk request.
+
+        Args:
+            texts (list): The resume texts.
+            indexes (list): The indexes of the texts to pack.
+
+        Returns:
+            list: Lists of text indexes.
+        """
+        groups, current, current_tokens = [], [], 0
+        for index in indexes:
+            tokens = self.chunker.count_tokens(texts[index])
+            if current and (
+                current_tokens + tokens > self.bulk_max_tokens or len(current) >= self.bulk_max_documents
+            ):
+                groups.append(current)
+                current, current_tokens = [], 0
+            current.append(index)
+            current_tokens += tokens
+        if current:
+            groups.append(current)
+        return groups
+
+    def _process_document_group(self, texts, group):
+        """Extract the features of several resumes with one request.
+
+        Args:
+            texts (list): The resume texts.
+            group (list): The indexes of the texts sent together.
+
+        Returns:
+            list: The features of each resume of the group, or None for a resume
+                whose answer is missing or invalid.
+        """
+        user_content = "\n\n".join(
+            f"<<<RESUME {number}>>>\n{texts[index]}\n<<<END {number}>>>"
+            for number, index in enumerate(group, 1)
+        )
+        response = self._call_api(
+            BULK_SYSTEM_PROMPT,
+            user_content,
+            max_tokens=self.bulk_max_output_tokens,
+            expected_output_tokens=self.expected_output_tokens * len(group)
+        )
+
+        resumes = response.get("resumes") if "error" not in response else None
+        if not isinstance(resumes, dict):
+            logger.warning(
+                f"Bulk request for {len(group)} resumes failed, falling back to single requests: "
+                f"{response.get('error', 'no resumes in the answer')}"
+            )
+            return [None] * len(group)
+
+        answers = []
+        for number in range(1, len(group) + 1):
+            features = resumes.get(str(number))
+            answers.append(features if self._is_valid_features(features) else None)
+        return answers
+
+    def _is_valid_features(self, features):
+        """Return True if an answer has every field of the feature schema with the right type."""
+        if not isinstance(features, dict):
+            return False
+        return all(
+            isinstance(features.get(key), type(default)) for key, default in FEATURE_SCHEMA.items()
+        )
+
+    def _is_retryable(self, result):
+        """Return True if a failed chunk may succeed when sent again.
+
+        Client errors other than 408 and 429 (bad request, authentication)
+        fail the same way every time and are not retried.
+        """
+        if result.get("retryable") is False:
+            return False
+        status_code = result.get("status_code")
+        if status_code is None:
+            return True
+        return status_code in (408, 429) or status_code >= 500
+
+    def _process_chunks(self, chunks, chunk_indexes, system_prompt=SYSTEM_PROMPT):
+        """Send chunks of a resume to the API concurrently.
+
+        At most max_concurrent_chunks requests (settings.LLM_MAX_CONCURRENT_CHUNKS)
+        are in flight for one resume.
+
+        Args:
+            chunks (list): All text chunks of the resume.
+            chunk_indexes (list): The indexes of the chunks to send.
+            system_prompt (str): The system prompt sent with every chunk.
+
+        Returns:
+            list: The result of each requested chunk, in the order of chunk_indexes.
+        """
+        if len(chunk_indexes) == 1:
+            return [self._process_chunk(chunks[chunk_indexes[0]], chunk_indexes[0], len(chunks), system_prompt)]
+
+        with ThreadPoolExecutor(max_workers=min(self.max_concurrent_chunks, len(chunk_indexes))) as executor:
+            return list(executor.map(
+                lambda chunk_idx: self._process_chunk(chunks[chunk_idx], chunk_idx, len(chunks), system_prompt),
+                chunk_indexes
+            ))
+
+    def _process_chunk(self, text_chunk, chunk_idx, total_chunks, system_prompt=SYSTEM_PROMPT):
         """Process a single chunk of text.
 
         Args:
             text_chunk (str): The chunk of text to be processed.
             chunk_idx (int): The index of the current chunk.
             total_chunks (int): The total number of chunks.
+            system_prompt (str): The system prompt listing the fields to extract.
 
         Returns:
             dict: A dictionary containing extracted features or error information.
         """
-        
-        system_prompt = """You are an expert resume analyzer. Extract information from the resume chunk and return it ONLY as a valid JSON object.
-        If this is not the first chunk, only extract new information not seen before.
-        
-        Return the JSON in this exact structure:
-        {
-            "contact_info": {
-                "name": "",
-                "email": "",
-                "phone": "",
-                "location": ""
-            },
-            "work_experience": [
-                {
-                    "company": "",
-                    "title": "",
-                    "dates": "",
-                    "responsibilities": []
-                }
-            ],
-            "education": [
-                {
-                    "institution": "",
-                    "degree": "",
-                    "dates": "",
-                    "gpa": ""
-                }
-            ],
-            "skills": {
-                "technical": [],
-                "soft": []
-            },
-            "projects": [
-                {
-                    "name": "",
-                    "description": "",
-                    "technologies": []
-                }
+        return self._call_api(system_prompt, self._chunk_prompt(text_chunk, chunk_idx, total_chunks))
+
+    def _chunk_prompt(self, text_chunk, chunk_idx, total_chunks):
+        """Build the user message of a resume chunk."""
+        return f"Process this resume chunk ({chunk_idx + 1} of {total_chunks}):\n\n{text_chunk}"
+
+    def _chat_body(self, system_prompt, user_content, max_tokens=4000):
+        """Build the chat completion parameters of a prompt, without the model.
+
+        Args:
+            system_prompt (str): The system prompt.
+            user_content (str): The user message.
+            max_tokens (int): The completion token limit.
+
+        Returns:
+            dict: The request body.
+        """
+        return {
+            "messages": [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_content}
             ],
-            "certifications": [],
-            "languages": []
-        }"""
+            "temperature": 0.1,
+            "max_tokens": max_tokens,
+            "response_format": {"type": "json_object"}
+        }
 
-        try:
-            headers = {
-                "Content-Type": "application/json",
-                "Authorization": f"Bearer {self.api_key}"
-            }
+    def _call_api(self, system_prompt, user_content, max_tokens=4000, expected_output_tokens=None):
+        """Send one prompt to the API and parse the JSON answer.
 
-            data = {
-                "model": self.model,
-                "messages": [
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": f"Process this resume chunk ({chunk_idx + 1} of {total_chunks}):\n\n{text_chunk}"}
-                ],
-                "temperature": 0.1,
-                "max_tokens": 4000,
-                "response_format": {"type": "json_object"}
-            }
+        Parsed responses are served from and stored in the LLM response cache,
+        keyed by model, PROMPT_VERSION and the hash of the system and user prompts.
+        Calls wait for the shared Mistral quota and fail fast while the circuit
+        breaker is open. Malformed answers are repaired when possible instead
+        of being retried (see _parse_answer); repaired answers are not cached,
+        so the next run of the prompt gets another chance at a clean one.
 
-            response = self.session.post(
-                self.api_url,
-                headers=headers,
-                json=data,
-                timeout=60  # Increased timeout
+        Args:
+            system_prompt (str): The system prompt.
+            user_content (str): The user message.
+            max_tokens (int): The completion token limit.
+            expected_output_tokens (int, optional): The completion tokens reserved
+                from the rate limit, expected_output_tokens of the processor by default.
+
+        Returns:
+            dict: The parsed JSON answer or error information.
+        """
+        cache_key = None
+        if self.response_cache:
+            cache_key = self.response_cache.make_key(self.model, PROMPT_VERSION, system_prompt + user_content)
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        try:
+            estimated_tokens = self.chunker.count_tokens(system_prompt + user_content) + (
+                expected_output_tokens or self.expected_output_tokens
             )
+            data = {"model": self.model, **self._chat_body(system_prompt, user_content, max_tokens)}
+            body, error = self._post_chat(data, estimated_tokens)
+            if error:
+                return error
 
-            if response.status_code != 200:
-                return {
-                    "error": f"API Error {response.status_code}",
-                    "details": response.text,
-                    "status": "failed"
-                }
+            choice = body['choices'][0]
+            features, degraded = self._parse_answer(choice['message']['content'], choice.get('finish_reason'), data)
+            if "error" in features:
+                return features
 
-            content = response.json()['choices'][0]['message']['content']
-            return json.loads(content)
+            if cache_key and not degraded:
+                self.response_cache.set(cache_key, features)
+            return features
 
-        except requests.Timeout:
-            return {
-                "error": "API Timeout",
-                "details": "Request timed out",
-                "status": "failed"
-            }
         except Exception as e:
             return {
                 "error": "Processing Error",
@@ -194,239 +583,232 @@ class LLMProcessor:
                 "status": "failed"
             }
 
-    def _merge_features(self, existing_features, new_features):
-        """Merge features from multiple chunks.
+    def _post_chat(self, data, estimated_tokens):
+        """Send one chat completion request, guarded like every call to the API.
+
+        The request fails fast while the circuit breaker is open, waits for
+        the shared Mistral quota, pauses the limiter on a 429, and records
+        server errors with the breaker and the real token usage with the limiter.
 
         Args:
-            existing_features (dict): The existing features to merge into.
-            new_features (dict): The new features to merge.
+            data (dict): The request body.
+            estimated_tokens (int): The tokens reserved from the rate limit.
 
         Returns:
-            dict: A dictionary containing merged features.
+            tuple: The response body (None on failure) and error information
+                (None on success).
         """
-        if not existing_features:
-            return new_features
-            
-        merged = existing_features.copy()
-        
-        # Merge lists
-        for key in ['work_experience', 'education', 'projects', 'certifications', 'languages']:
-            if key in new_features:
-                merged[key] = merged.get(key, []) + new_features[key]
-        
-        # Merge skills
-        if 'skills' in new_features:
-            if 'skills' not in merged:
-                merged['skills'] = {'technical': [], 'soft': []}
-            merged['skills']['technical'] = list(set(
-                merged['skills'].get('technical', []) +
-                new_features['skills'].get('technical', [])
-            ))
-            merged['skills']['soft'] = list(set(
-                merged['skills'].get('soft', []) +
-                new_features['skills'].get('soft', [])
-            ))
-        
-        # Update contact info if any new fields are present
-        if 'contact_info' in new_features:
-            if 'contact_info' not in merged:
-                merged['contact_info'] = {}
-            for field, value in new_features['contact_info'].items():
-                if value and not merged['contact_info'].get(field):
-                    merged['contact_info'][field] = value
-        
-        return merged
-
-class LLMProcessor:
-    def __init__(self):
-        self.api_key = settings.MISTRAL_API_KEY
-        self.model = "mistral-large-latest"
-        self.api_url = "https://api.mistral.ai/v1/chat/completions"
-        
-        # Configure retry strategy
-        self.session = requests.Session()
-        retries = Retry(
-            total=3,  # number of retries
-            backoff_factor=1,  # wait 1, 2, 4 seconds between retries
-            status_forcelist=[408, 429, 500, 502, 503, 504],
-            allowed_methods=["POST"]
-        )
-        self.session.mount('https://', HTTPAdapter(max_retries=retries))
-
-    def extract_resume_features(self, text, max_retries=3):
-        """Extract important features from resume text using Mistral AI"""
-        
-        # Split text into chunks if it's too long
-        max_chunk_length = 8000  # Adjust based on model's context window
-        chunks = [text[i:i + max_chunk_length] for i in range(0, len(text), max_chunk_length)]
-        
-        for attempt in range(max_retries):
-            try:
-                # If we have multiple chunks, process them separately and combine
-                all_features = {}
-                for chunk_idx, chunk in enumerate(chunks):
-                    chunk_features = self._process_chunk(chunk, chunk_idx, len(chunks))
-                    
-                    if "error" in chunk_features:
-                        logger.warning(f"Error processing chunk {chunk_idx + 1}: {chunk_features['error']}")
-                        continue
-                    
-                    # Merge features
-                    all_features = self._merge_features(all_features, chunk_features)
-
-                # If we got any valid features, return them
-                if all_features:
-                    return all_features
-                
-                # If we got here, no chunks were processed successfully
-                if attempt < max_retries - 1:
-                    wait_time = (attempt + 1) * 5  # Progressive delay: 5s, 10s, 15s
-                    logger.info(f"Retrying in {wait_time} seconds...")
-                    time.sleep(wait_time)
-                    continue
-                
-                return {
-                    "error": "Failed to process resume after multiple attempts",
-                    "details": "All chunks failed processing",
-                    "status": "failed"
-                }
-
-            except Exception as e:
-                if attempt < max_retries - 1:
-                    wait_time = (attempt + 1) * 5
-                    logger.info(f"Retrying in {wait_time} seconds due to error: {str(e)}")
-                    time.sleep(wait_time)
-                    continue
-                else:
-                    return {
-                        "error": "Processing Error",
-                        "details": str(e),
-                        "status": "failed"
-                    }
-
-    def _process_chunk(self, text_chunk, chunk_idx, total_chunks):
-        """Process a single chunk of text"""
-        
-        system_prompt = """You are an expert resume analyzer. Extract information from the resume chunk and return it ONLY as a valid JSON object.
-        If this is not the first chunk, only extract new information not seen before.
-        
-        Return the JSON in this exact structure:
-        {
-            "contact_info": {
-                "name": "",
-                "email": "",
-                "phone": "",
-                "location": ""
-            },
-            "work_experience": [
-                {
-                    "company": "",
-                    "title": "",
-                    "dates": "",
-                    "responsibilities": []
-                }
-            ],
-            "education": [
-                {
-                    "institution": "",
-                    "degree": "",
-                    "dates": "",
-                    "gpa": ""
-                }
-            ],
-            "skills": {
-                "technical": [],
-                "soft": []
-            },
-            "projects": [
-                {
-                    "name": "",
-                    "description": "",
-                    "technologies": []
-                }
-            ],
-            "certifications": [],
-            "languages": []
-        }"""
-
-        try:
-            headers = {
-                "Content-Type": "application/json",
-                "Authorization": f"Bearer {self.api_key}"
-            }
-
-            data = {
-                "model": self.model,
-                "messages": [
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": f"Process this resume chunk ({chunk_idx + 1} of {total_chunks}):\n\n{text_chunk}"}
-                ],
-                "temperature": 0.1,
-                "max_tokens": 4000,
-                "response_format": {"type": "json_object"}
+        if not self.circuit_breaker.allow_request():
+            return None, {
+                "error": "Circuit Open",
+                "details": "Mistral API is failing, calls are suspended",
+                "status": "failed",
+                "retryable": False
             }
 
+        headers = {
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {self.api_key}"
+        }
+        try:
+            self.rate_limiter.acquire(estimated_tokens)
             response = self.session.post(
                 self.api_url,
                 headers=headers,
                 json=data,
                 timeout=60  # Increased timeout
             )
-
-            if response.status_code != 200:
-                return {
-                    "error": f"API Error {response.status_code}",
-                    "details": response.text,
-                    "status": "failed"
-                }
-
-            content = response.json()['choices'][0]['message']['content']
-            return json.loads(content)
-
+        except RateLimitTimeout as e:
+            return None, {
+                "error": "Rate Limited",
+                "details": str(e),
+                "status": "failed"
+            }
         except requests.Timeout:
-            return {
+            self.circuit_breaker.record_failure()
+            return None, {
                 "error": "API Timeout",
                 "details": "Request timed out",
                 "status": "failed"
             }
-        except Exception as e:
-            return {
-                "error": "Processing Error",
+        except requests.ConnectionError as e:
+            self.circuit_breaker.record_failure()
+            return None, {
+                "error": "Connection Error",
                 "details": str(e),
                 "status": "failed"
             }
 
+        if response.status_code == 429:
+            self.rate_limiter.pause(
+                parse_retry_after(response.headers.get("Retry-After")) or self.retry_backoff
+            )
+        elif response.status_code >= 500 or response.status_code == 408:
+            self.circuit_breaker.record_failure()
+
+        if response.status_code != 200:
+            return None, {
+                "error": f"API Error {response.status_code}",
+                "details": response.text,
+                "status": "failed",
+                "status_code": response.status_code
+            }
+
+        self.circuit_breaker.record_success()
+        body = response.json()
+        total_tokens = (body.get('usage') or {}).get('total_tokens')
+        if total_tokens:
+            self.rate_limiter.record_usage(total_tokens - estimated_tokens)
+        return body, None
+
+    def _apply_local_features(self, features, local):
+        """Fill the fields resolved by the local extractor into the features.
+
+        Args:
+            features (dict): The features extracted by the LLM.
+            local (dict): The result of LocalFeatureExtractor.extract.
+
+        Returns:
+            dict: The features with the locally extracted fields set.
+        """
+        features = dict(features)
+        for field in local['resolved']:
+            parent, _, child = field.partition('.')
+            if child:
+                features[parent] = dict(features.get(parent) or {})
+                features[parent][child] = local['features'][parent][child]
+            else:
+                features[parent] = local['features'][parent]
+        return features
+
+    def _parse_answer(self, content, finish_reason, data):
+        """Parse the JSON answer of the model, repairing it instead of retrying.
+
+        An answer cut off by the token limit is first completed with up to
+        max_continuations continuation requests, which send the partial
+        answer back as an assistant prefix so only the missing part is
+        generated. What still does not parse is repaired by closing the open
+        strings, arrays and objects. The result is checked against the
+        feature schema and fields of the wrong type are dropped.
+
+        Args:
+            content (str): The message content of the answer.
+            finish_reason (str): Why the model stopped, 'length' when truncated.
+            data (dict): The request that produced the answer.
+
+        Returns:
+            tuple: The parsed features, or error information if the answer
+                cannot be repaired (the chunk is then retried), and True if
+                the features were repaired or had invalid parts dropped.
+        """
+        degraded = False
+        try:
+            features = json.loads(content)
+        except (TypeError, ValueError):
+            features = None
+            if finish_reason == 'length' and self.max_continuations:
+                content = self._continue_answer(data, content)
+                try:
+                    features = json.loads(content)
+                    self.output_stats.record('continued')
+                except (TypeError, ValueError):
+                    features = None
+            if features is None:
+                features, _ = repair_json(content)
+                degraded = True
+                if features is not None:
+                    logger.info("Repaired malformed LLM answer instead of retrying the chunk")
+                    self.output_stats.record('repaired')
+
+        features, problems = validate_features(features, FEATURE_SCHEMA)
+        if features is None:
+            self.output_stats.record('unrepairable')
+            return {
+                "error": "Invalid JSON",
+                "details": f"Could not parse the model answer: {str(content)[:200]}",
+                "status": "failed"
+            }, True
+        if problems:
+            logger.warning(f"Dropped invalid parts of the LLM answer: {'; '.join(problems)}")
+        return features, degraded or bool(problems)
+
+    def _continue_answer(self, data, content):
+        """Ask the model to continue a truncated answer where it stopped.
+
+        Continuations go through _post_chat like the first request, so they
+        respect the rate limit and the circuit breaker.
+
+        Args:
+            data (dict): The request that produced the answer.
+            content (str): The truncated answer.
+
+        Returns:
+            str: The answer with its continuation, or the truncated answer if
+                the continuation request failed.
+        """
+        for _ in range(self.max_continuations):
+            request = dict(data, messages=data['messages'] + [
+                {"role": "assistant", "content": content, "prefix": True}
+            ])
+            # The prefix already forces a JSON continuation
+            request.pop('response_format', None)
+            estimated_tokens = self.chunker.count_tokens(
+                ''.join(message['content'] for message in request['messages'])
+            ) + self.expected_output_tokens
+            try:
+                body, error = self._post_chat(request, estimated_tokens)
+                if error:
+                    logger.warning(f"Continuation request failed: {error['error']}")
+                    break
+                choice = body['choices'][0]
+            except Exception as e:
+                logger.warning(f"Continuation request failed: {str(e)}")
+                break
+
+            continuation = choice['message']['content'] or ''
+            # The answer to a prefixed request repeats the prefix
+            content = continuation if continuation.startswith(content) else content + continuation
+            if choice.get('finish_reason') != 'length':
+                break
+        return content
+
     def _merge_features(self, existing_features, new_features):
-        """Merge features from multiple chunks"""
+        """Merge features from multiple chunks.
+
+        Args:
+            existing_features (dict): The existing features to merge into.
+            new_features (dict): The new features to merge.
+
+        Returns:
+            dict: A dictionary containing merged features.
+        """
         if not existing_features:
             return new_features
             
         merged = existing_features.copy()
         
-        # Merge lists
+        # Merge lists (chunk order is preserved so the result is deterministic)
         for key in ['work_experience', 'education', 'projects', 'certifications', 'languages']:
             if key in new_features:
                 merged[key] = merged.get(key, []) + new_features[key]
         
         # Merge skills
         if 'skills' in new_features:
-            if 'skills' not in merged:
-                merged['skills'] = {'technical': [], 'soft': []}
-            merged['skills']['technical'] = list(set(
+            merged['skills'] = dict(merged.get('skills') or {'technical': [], 'soft': []})
+            merged['skills']['technical'] = list(dict.fromkeys(
                 merged['skills'].get('technical', []) +
                 new_features['skills'].get('technical', [])
             ))
-            merged['skills']['soft'] = list(set(
+            merged['skills']['soft'] = list(dict.fromkeys(
                 merged['skills'].get('soft', []) +
                 new_features['skills'].get('soft', [])
             ))
         
         # Update contact info if any new fields are present
         if 'contact_info' in new_features:
-            if 'contact_info' not in merged:
-                merged['contact_info'] = {}
+            merged['contact_info'] = dict(merged.get('contact_info') or {})
             for field, value in new_features['contact_info'].items():
                 if value and not merged['contact_info'].get(field):
                     merged['contact_info'][field] = value
         
-        return merged
\ No newline at end of file
+        return merged
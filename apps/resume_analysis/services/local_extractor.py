@@ -0,0 +1,226 @@
+import logging
+import os
+import re
+import spacy
+from spacy.matcher import PhraseMatcher
+from django.conf import settings
+
+from .model_registry import model_registry
+from .resume_chunker import split_sections
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SKILLS_GAZETTEER = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'skills.txt')
+
+SPOKEN_LANGUAGES = {
+    'arabic', 'bengali', 'chinese', 'czech', 'danish', 'dutch', 'english', 'finnish', 'french',
+    'german', 'greek', 'hebrew', 'hindi', 'hungarian', 'indonesian', 'italian', 'japanese',
+    'korean', 'malay', 'mandarin', 'cantonese', 'norwegian', 'persian', 'polish', 'portuguese',
+    'romanian', 'russian', 'spanish', 'swahili', 'swedish', 'tamil', 'thai', 'turkish',
+    'ukrainian', 'urdu', 'vietnamese',
+}
+
+# Words of a language level, allowed next to the language names
+PROFICIENCY_WORDS = {
+    'native', 'mother', 'tongue', 'bilingual', 'fluent', 'fluency', 'full', 'professional', 'working',
+    'proficiency', 'proficient', 'advanced', 'intermediate', 'conversational', 'basic', 'elementary',
+    'limited', 'beginner', 'notions', 'a1', 'a2', 'b1', 'b2', 'c1', 'c2', 'level',
+}
+
+SKILL_SECTIONS = {'skills', 'technical skills', 'core competencies', 'competencies'}
+LANGUAGE_SECTIONS = {'languages'}
+
+EMAIL_RE = re.compile(r'[\w.+-]+@[\w-]+(?:\.[\w-]+)*\.[A-Za-z]{2,}')
+PHONE_RE = re.compile(r'(?<![\w+])\+?\d[\d\s().-]{6,}\d(?!\w)')
+DATE_RANGE_RE = re.compile(r'^\d{4}\s*[-–]\s*\d{4}$')
+NAME_RE = re.compile(r"^[A-Z][A-Za-z'’-]*\.?(?:\s+[A-Z][A-Za-z'’-]*\.?){1,3}$")
+# Lines of a header that holds nothing but contact details
+MAX_HEADER_LINES = 6
+
+LIST_SPLIT_RE = re.compile(r'[,;|•·▪●\n\t]|\s+[-–]\s+')
+
+
+def _load_skill_matcher(path):
+    """Build the PhraseMatcher of the skills gazetteer.
+
+    Short entries (like "C", "R" or "Go") only match with their exact casing,
+    the others match case-insensitively.
+
+    Returns:
+        tuple: The blank spaCy pipeline, the case-insensitive matcher, the
+            exact-case matcher, and the canonical skill names keyed by match id.
+    """
+    nlp = spacy.blank('en')
+    lower_matcher = PhraseMatcher(nlp.vocab, attr='LOWER')
+    exact_matcher = PhraseMatcher(nlp.vocab, attr='ORTH')
+    canonical = {}
+
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            skill = line.strip()
+            if not skill or skill.startswith('#'):
+                continue
+            key = f"SKILL_{len(canonical)}"
+            matcher = exact_matcher if len(skill) <= 2 else lower_matcher
+            matcher.add(key, [nlp.make_doc(skill)])
+            canonical[nlp.vocab.strings[key]] = skill
+
+    return nlp, lower_matcher, exact_matcher, canonical
+
+
+class LocalFeatureExtractor:
+    """Extracts the easy resume fields locally, before the LLM is called.
+
+    E-mail, phone and name come from regexes over the resume header. The
+    items of a skills section are matched against the skills gazetteer with
+    a spaCy PhraseMatcher, and the items of a languages section against a
+    list of spoken languages. A field is only reported as resolved when the
+    extractor is confident about it, so the LLM can be asked for the rest.
+
+    Attributes:
+        min_skill_coverage (float): Share of the skills section items that must
+            be known skills for the section to be taken as is.
+    """
+
+    def __init__(self, gazetteer_path=None, min_skill_coverage=None):
+        """Initialize the extractor from settings unless values are given."""
+        self.gazetteer_path = gazetteer_path or getattr(settings, 'SKILLS_GAZETTEER_PATH', DEFAULT_SKILLS_GAZETTEER)
+        self.min_skill_coverage = min_skill_coverage if min_skill_coverage is not None else getattr(
+            settings, 'LOCAL_SKILLS_MIN_COVERAGE', 0.9
+        )
+
+    @property
+    def skill_matcher(self):
+        """tuple: The shared gazetteer matcher, built on first use."""
+        return model_registry.get(
+            f"skills-matcher:{self.gazetteer_path}",
+            lambda: _load_skill_matcher(self.gazetteer_path)
+        )
+
+    def _section_body(self, heading, section):
+        """Return the text of a section without its heading line."""
+        return section.split('\n', 1)[1] if heading and '\n' in section else ('' if heading else section)
+
+    def _list_items(self, body):
+        """Split a list-like section into its items, dropping "Category:" prefixes."""
+        items = []
+        for line in body.split('\n'):
+            if ':' in line:
+                line = line.split(':', 1)[1]
+            for item in LIST_SPLIT_RE.split(line):
+                item = item.strip(" \t*-–•.()")
+                if item and len(item) <= 40:
+                    items.append(item)
+        return items
+
+    def match_skill(self, item):
+        """Return the canonical gazetteer name of an item, or None if it is not a known skill.
+
+        Args:
+            item (str): A single skills list entry.
+        """
+        nlp, lower_matcher, exact_matcher, canonical = self.skill_matcher
+        doc = nlp.make_doc(item)
+        for match_id, start, end in list(lower_matcher(doc)) + list(exact_matcher(doc)):
+            if start == 0 and end == len(doc):
+                return canonical[match_id]
+        return None
+
+    def _extract_contact(self, header):
+        """Extract name, e-mail and phone from the resume header."""
+        contact = {}
+        email = EMAIL_RE.search(header)
+        if email:
+            contact['email'] = email.group(0)
+
+        for match in PHONE_RE.finditer(header):
+            candidate = match.group(0).strip()
+            digits = re.sub(r'\D', '', candidate)
+            if 8 <= len(digits) <= 15 and not DATE_RANGE_RE.match(candidate):
+                contact['phone'] = candidate
+                break
+
+        for line in header.split('\n'):
+            line = line.strip()
+            if not line:
+                continue
+            if NAME_RE.match(line) and line.lower() not in ('curriculum vitae', 'resume'):
+                contact['name'] = line
+            break
+        return contact
+
+    def _extract_skills(self, body):
+        """Return the skills of a skills section if nearly all of them are known, else None."""
+        items = self._list_items(body)
+        if not items:
+            return None
+        matched = [self.match_skill(item) for item in items]
+        known = sum(1 for skill in matched if skill)
+        if known / len(items) < self.min_skill_coverage:
+            return None
+        return list(dict.fromkeys(skill or item for skill, item in zip(matched, items)))
+
+    def _extract_languages(self, body):
+        """Return the languages of a languages section if every entry is a known language or level, else None."""
+        items = self._list_items(body.replace('(', ',').replace(')', ''))
+        languages = []
+        for item in items:
+            words = item.lower().split()
+            if words[0] in SPOKEN_LANGUAGES:
+                languages.append(words[0].capitalize())
+            elif not set(words) <= PROFICIENCY_WORDS:
+                return None
+        return list(dict.fromkeys(languages)) or None
+
+    def extract(self, text):
+        """Extract the fields that can be found without the LLM.
+
+        Args:
+            text (str): The resume text.
+
+        Returns:
+            dict: 'features' in the extracted_features schema, 'resolved' with
+                the dotted names of the confidently extracted fields, and
+                'complete' when the LLM has nothing left to extract.
+        """
+        sections = split_sections(text)
+        header = sections[0][1][:2000] if sections and not sections[0][0] else text[:2000]
+
+        features = {}
+        resolved = []
+
+        contact = self._extract_contact(header)
+        if contact:
+            features['contact_info'] = contact
+            resolved.extend(f"contact_info.{field}" for field in contact)
+
+        other_sections = []
+        for heading, section in sections:
+            if not heading:
+                continue
+            name = heading.strip(' \t#*-•>|.):0123456789').lower()
+            body = self._section_body(heading, section)
+            if name in SKILL_SECTIONS and 'skills.technical' not in resolved:
+                skills = self._extract_skills(body)
+                if skills is not None:
+                    features['skills'] = {'technical': skills, 'soft': []}
+                    resolved.append('skills.technical')
+                    continue
+            elif name in LANGUAGE_SECTIONS and 'languages' not in resolved:
+                languages = self._extract_languages(body)
+                if languages is not None:
+                    features['languages'] = languages
+                    resolved.append('languages')
+                    continue
+            other_sections.append(name)
+
+        # A short header followed only by known skills and languages needs no LLM call
+        header_lines = [line for line in header.split('\n') if line.strip()]
+        complete = (
+            len(sections) > 1
+            and not sections[0][0]
+            and len(header_lines) <= MAX_HEADER_LINES
+            and not other_sections
+            and all(f"contact_info.{field}" in resolved for field in ('name', 'email', 'phone'))
+        )
+        return {'features': features, 'resolved': resolved, 'complete': complete}
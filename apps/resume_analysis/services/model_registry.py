@@ -0,0 +1,144 @@
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+def _current_rss_bytes():
+    """Return the resident set size of the current process in bytes, or None if unknown."""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        pass
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+class ModelRegistry:
+    """Process-wide registry of heavy ML models.
+
+    Each model is loaded once per process on first use (or when warmed up at
+    worker start) and then shared by every service that asks for it. Load
+    time and the memory growth of the process during the load are recorded
+    for each model, and callers can record the latency of each inference
+    call (see record_call).
+    """
+
+    def __init__(self):
+        """Initialize an empty registry."""
+        self._models = {}
+        self._stats = {}
+        self._calls = {}
+        self._lock = threading.Lock()
+        self._calls_lock = threading.Lock()  # not held while a model loads
+
+    def get(self, name, loader):
+        """Return the model registered under a name, loading it on first use.
+
+        Args:
+            name (str): The registry key of the model.
+            loader (callable): A function without arguments that builds the model.
+
+        Returns:
+            object: The shared model instance.
+        """
+        model = self._models.get(name)
+        if model is not None:
+            return model
+
+        with self._lock:
+            model = self._models.get(name)
+            if model is None:
+                rss_before = _current_rss_bytes()
+                started = time.perf_counter()
+                model = loader()
+                load_seconds = time.perf_counter() - started
+                rss_after = _current_rss_bytes()
+
+                memory_bytes = None
+                if rss_before is not None and rss_after is not None:
+                    memory_bytes = max(rss_after - rss_before, 0)
+
+                self._stats[name] = {
+                    'load_seconds': round(load_seconds, 3),
+                    'memory_bytes': memory_bytes,
+                    'loaded_at': time.time(),
+                }
+                self._models[name] = model
+                logger.info(
+                    f"Loaded model '{name}' in {load_seconds:.2f}s"
+                    + (f" (+{memory_bytes / 1024 / 1024:.1f} MB RSS)" if memory_bytes is not None else "")
+                )
+        return model
+
+    def is_loaded(self, name):
+        """Return True if the model has already been loaded in this process."""
+        return name in self._models
+
+    def record_call(self, name, seconds, items=1):
+        """Record the latency of one inference call of a model.
+
+        Args:
+            name (str): The registry key of the model.
+            seconds (float): How long the call took.
+            items (int, optional): How many inputs the call processed.
+        """
+        with self._calls_lock:
+            calls = self._calls.setdefault(name, {'calls': 0, 'items': 0, 'total_seconds': 0.0, 'max_seconds': 0.0})
+            calls['calls'] += 1
+            calls['items'] += items
+            calls['total_seconds'] += seconds
+            calls['max_seconds'] = max(calls['max_seconds'], seconds)
+
+    def stats(self):
+        """Return load time, memory and call latency statistics of the loaded models.
+
+        Returns:
+            dict: Statistics keyed by model name.
+        """
+        stats = {name: dict(values) for name, values in self._stats.items()}
+        with self._calls_lock:
+            for name, calls in self._calls.items():
+                stats.setdefault(name, {}).update({
+                    'calls': calls['calls'],
+                    'items': calls['items'],
+                    'avg_call_ms': round(calls['total_seconds'] / calls['calls'] * 1000, 2),
+                    'max_call_ms': round(calls['max_seconds'] * 1000, 2),
+                })
+        return stats
+
+    def clear(self):
+        """Drop every loaded model, e.g. after a settings change in tests."""
+        with self._lock:
+            self._models.clear()
+            self._stats.clear()
+        with self._calls_lock:
+            self._calls.clear()
+
+
+model_registry = ModelRegistry()
+
+
+def warm_up_models():
+    """Load the models enabled in settings so the first request does not pay for it."""
+    from django.conf import settings
+
+    if getattr(settings, 'WARM_UP_OCR_READER', False):
+        from .ocr_processor import get_ocr_reader
+        try:
+            get_ocr_reader()
+        except Exception as e:
+            logger.error(f"OCR reader warm-up failed: {str(e)}")
+
+    if getattr(settings, 'WARM_UP_EMBEDDING_MODEL', False):
+        from .embedding_model import get_embedding_model
+        try:
+            get_embedding_model()
+        except Exception as e:
+            logger.error(f"Embedding model warm-up failed: {str(e)}")
@@ -0,0 +1,169 @@
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+_pools = {}  # (mode, max_workers) -> pool
+_pool_lock = threading.Lock()
+
+
+def _limit_torch_threads(torch_threads):
+    """Cap the intra-op threads torch uses in this process."""
+    try:
+        import torch
+        torch.set_num_threads(torch_threads)
+    except ImportError:
+        pass
+
+
+def _init_worker(torch_threads):
+    """Prepare an OCR pool process: cap its torch threads and load the reader once."""
+    _limit_torch_threads(torch_threads)
+
+    from .ocr_processor import get_ocr_reader
+    get_ocr_reader()
+
+
+def _read_page(image):
+    """OCR one rendered page, in a pool process or a pool thread.
+
+    Pages are rendered by the submitting thread (PyMuPDF is not thread-safe)
+    and only the page bitmap is handed over.
+
+    Args:
+        image (numpy.ndarray): The rendered page.
+
+    Returns:
+        str: The text recognised on the page.
+    """
+    from .ocr_processor import get_ocr_reader
+
+    return "\n".join(result[1] for result in get_ocr_reader().readtext(image)).strip()
+
+
+def _get_pool(max_workers, mode):
+    """Return the process-wide OCR pool of a mode ('process' or 'thread') and size, creating it on first use."""
+    key = (mode, max_workers)
+    with _pool_lock:
+        if key not in _pools:
+            if mode == 'thread':
+                # Threads share the reader of this process; torch releases the GIL during inference.
+                # Each page then runs on OCR_POOL_TORCH_THREADS threads instead of torch's default
+                # of one per core, which every prefork child would otherwise claim for itself.
+                _limit_torch_threads(getattr(settings, 'OCR_POOL_TORCH_THREADS', 1))
+                _pools[key] = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='ocr')
+            else:
+                context = multiprocessing.get_context(
+                    getattr(settings, 'OCR_POOL_START_METHOD', 'spawn')
+                )
+                _pools[key] = ProcessPoolExecutor(
+                    max_workers=max_workers,
+                    mp_context=context,
+                    initializer=_init_worker,
+                    initargs=(getattr(settings, 'OCR_POOL_TORCH_THREADS', 1),)
+                )
+            logger.info(f"Started OCR {mode} pool with {max_workers} workers")
+        return _pools[key]
+
+
+def _discard_pool(max_workers, mode, pool):
+    """Drop a broken pool so the next call starts a new one."""
+    with _pool_lock:
+        if _pools.get((mode, max_workers)) is pool:
+            del _pools[(mode, max_workers)]
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def shutdown_pool():
+    """Stop the OCR pools, e.g. when a worker shuts down."""
+    with _pool_lock:
+        for pool in _pools.values():
+            pool.shutdown(wait=True)
+        _pools.clear()
+
+
+class OCRExecutor:
+    """Spreads the pages of a scanned document over a pool of OCR workers.
+
+    Pages are rendered one by one in the calling thread and their bitmaps are
+    OCRed by the pool. At most max_in_flight pages are queued at once, so a
+    long scan cannot pile up rendered bitmaps in memory, and results are
+    returned in page order.
+
+    The pool is made of processes, each with its own reader, or of threads
+    sharing the reader of the current process. Daemonic processes such as
+    Celery prefork children cannot start child processes, so in 'auto' mode
+    they use threads. Either way a page is OCRed with OCR_POOL_TORCH_THREADS
+    torch threads; in thread mode the cap applies to the whole process.
+
+    Attributes:
+        max_workers (int): The number of OCR workers (settings.OCR_POOL_WORKERS).
+        max_in_flight (int): The maximum number of pages submitted but not yet finished.
+        mode (str): 'process' or 'thread'.
+    """
+
+    def __init__(self, max_workers=None, max_in_flight=None, mode=None):
+        """Initialize the executor from settings unless values are given."""
+        self.max_workers = max_workers if max_workers is not None else getattr(settings, 'OCR_POOL_WORKERS', 2)
+        self.max_in_flight = max_in_flight or getattr(
+            settings, 'OCR_MAX_PAGES_IN_FLIGHT', None
+        ) or 2 * max(self.max_workers, 1)
+        mode = mode or getattr(settings, 'OCR_POOL_MODE', 'auto')
+        if mode == 'auto':
+            mode = 'thread' if multiprocessing.current_process().daemon else 'process'
+        self.mode = mode
+
+    @property
+    def enabled(self):
+        """bool: True if pages are spread over a pool."""
+        return self.max_workers >= 2
+
+    def ocr_pages(self, doc, page_numbers, render):
+        """Run OCR on several pages of a PDF in parallel.
+
+        A pool process that dies (e.g. out of memory on a large bitmap)
+        breaks the whole process pool; it is then replaced and the document
+        is tried once more on the new pool.
+
+        Args:
+            doc (fitz.Document): The open PDF document.
+            page_numbers (list): Zero-based indexes of the pages to process.
+            render (callable): Returns the NumPy bitmap of a fitz.Page.
+
+        Returns:
+            dict: The recognised text keyed by page index, in page order.
+        """
+        pool = _get_pool(self.max_workers, self.mode)
+        try:
+            return self._run(pool, doc, page_numbers, render)
+        except BrokenProcessPool:
+            logger.warning("OCR pool process died, restarting the pool and retrying the document")
+            _discard_pool(self.max_workers, self.mode, pool)
+
+        pool = _get_pool(self.max_workers, self.mode)
+        try:
+            return self._run(pool, doc, page_numbers, render)
+        except BrokenProcessPool:
+            _discard_pool(self.max_workers, self.mode, pool)
+            raise
+
+    def _run(self, pool, doc, page_numbers, render):
+        """Submit the pages to a pool, at most max_in_flight at a time, and collect their text."""
+        pending = {}
+        results = {}
+
+        for page_number in page_numbers:
+            if len(pending) >= self.max_in_flight:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    results[pending.pop(future)] = future.result()
+            pending[pool.submit(_read_page, render(doc[page_number]))] = page_number
+
+        for future in wait(pending).done:
+            results[pending[future]] = future.result()
+
+        return {page_number: results[page_number] for page_number in page_numbers}
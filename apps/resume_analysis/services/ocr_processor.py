@@ -1,84 +1,276 @@
-import os
-import tempfile
 from contextlib import contextmanager
 import easyocr
-from PIL import Image
 import numpy as np
 
 import fitz  # PyMuPDF
+from django.conf import settings
+
+from .model_registry import model_registry
+from .ocr_executor import OCRExecutor
+
+
+def get_ocr_reader():
+    """Return the process-wide EasyOCR reader, loading the models on first use.
+
+    Returns:
+        easyocr.Reader: The shared reader for the languages in settings.OCR_LANGUAGES.
+    """
+    languages = list(getattr(settings, 'OCR_LANGUAGES', ['en']))
+    return model_registry.get(
+        f"easyocr:{','.join(languages)}",
+        lambda: easyocr.Reader(languages, gpu=getattr(settings, 'OCR_USE_GPU', True))
+    )
+
+
+def pixmap_to_array(pix):
+    """View the samples of a PyMuPDF pixmap as a NumPy image without copying or encoding.
+
+    Args:
+        pix (fitz.Pixmap): The rendered page.
+
+    Returns:
+        numpy.ndarray: A (height, width) or (height, width, channels) uint8 array.
+    """
+    samples = getattr(pix, 'samples_mv', None) or pix.samples
+    array = np.frombuffer(samples, dtype=np.uint8).reshape(pix.height, pix.width, pix.n)
+    return array[:, :, 0] if pix.n == 1 else array
+
+
+class RenderPolicy:
+    """Decides how a PDF page is rasterised for OCR.
+
+    The resolution is chosen per page: high enough that the estimated body
+    text is rendered with about target_glyph_px pixels per glyph, never
+    above the native resolution of an embedded scan, clamped to
+    [min_dpi, max_dpi] and finally capped so the page stays within
+    max_pixels. Pages are rendered straight to grayscale by default,
+    a third of the memory of an RGB bitmap.
+
+    Attributes:
+        min_dpi (int): The lowest resolution used for OCR.
+        max_dpi (int): The highest resolution used for OCR.
+        target_glyph_px (int): The desired rendered height of a body glyph in pixels.
+        max_pixels (int): The pixel budget of a rendered page, or None for no cap.
+        grayscale (bool): Whether pages are rendered as single-channel images.
+    """
+
+    def __init__(self, min_dpi=None, max_dpi=None, target_glyph_px=None, max_pixels=None, grayscale=None):
+        """Initialize the policy from settings unless values are given."""
+        self.min_dpi = min_dpi or getattr(settings, 'OCR_MIN_DPI', 150)
+        self.max_dpi = max_dpi or getattr(settings, 'OCR_MAX_DPI', 300)
+        self.target_glyph_px = target_glyph_px or getattr(settings, 'OCR_TARGET_GLYPH_PX', 28)
+        self.max_pixels = max_pixels if max_pixels is not None else getattr(settings, 'OCR_MAX_PAGE_PIXELS', 8000000)
+        self.grayscale = grayscale if grayscale is not None else getattr(settings, 'OCR_GRAYSCALE', True)
+
+    @classmethod
+    def fixed(cls, dpi=300, grayscale=False):
+        """Return a policy that always renders at one resolution (the former behaviour)."""
+        return cls(min_dpi=dpi, max_dpi=dpi, max_pixels=0, grayscale=grayscale)
+
+    def _estimate_font_size(self, page):
+        """Estimate the body font size of a page in points from its text spans, if any."""
+        sizes = []
+        try:
+            for block in page.get_text('dict').get('blocks', []):
+                for line in block.get('lines', []):
+                    sizes.extend(span['size'] for span in line.get('spans', []) if span.get('text', '').strip())
+        except Exception:
+            sizes = []
+        if not sizes:
+            return getattr(settings, 'OCR_DEFAULT_FONT_SIZE', 10)
+        sizes.sort()
+        return sizes[len(sizes) // 2]
+
+    def _native_dpi(self, page):
+        """Return the resolution of the largest image on the page, or None if it has none."""
+        best_area, best_dpi = 0, None
+        try:
+            for info in page.get_image_info():
+                rect = fitz.Rect(info['bbox'])
+                if rect.width <= 0 or rect.height <= 0:
+                    continue
+                area = rect.width * rect.height
+                if area > best_area:
+                    best_area = area
+                    best_dpi = info['width'] / (rect.width / 72)
+        except Exception:
+            return None
+        return best_dpi
+
+    def dpi_for(self, page):
+        """Choose the render resolution of a page.
+
+        Args:
+            page (fitz.Page): The page to render.
+
+        Returns:
+            int: The resolution in dots per inch.
+        """
+        dpi = self.target_glyph_px * 72 / self._estimate_font_size(page)
+        native_dpi = self._native_dpi(page)
+        if native_dpi:
+            dpi = min(dpi, native_dpi)
+        dpi = min(max(dpi, self.min_dpi), self.max_dpi)
+
+        if self.max_pixels:
+            width_in = page.rect.width / 72
+            height_in = page.rect.height / 72
+            if width_in > 0 and height_in > 0:
+                dpi = min(dpi, (self.max_pixels / (width_in * height_in)) ** 0.5)
+        return max(int(dpi), 1)
+
+    def render(self, page):
+        """Rasterise a page according to the policy.
+
+        Args:
+            page (fitz.Page): The page to render.
+
+        Returns:
+            fitz.Pixmap: The rendered page.
+        """
+        zoom = self.dpi_for(page) / 72
+        colorspace = fitz.csGRAY if self.grayscale else fitz.csRGB
+        return page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), colorspace=colorspace, alpha=False)
 
 
 class OCRProcessor:
-    """A class to process images and PDFs using Optical Character Recognition (OCR)."""
+    """A class to process images and PDFs using Optical Character Recognition (OCR).
+
+    The EasyOCR reader is shared by every OCRProcessor in the process and is
+    only loaded the first time OCR is actually needed. Pages and images are
+    handed to the reader as in-memory buffers, never as temporary files, and
+    multi-page scans are spread over the OCR pool when one is configured.
+    """
 
-    def __init__(self):
-        """Initialize the OCRProcessor with an EasyOCR reader for English language."""
-        self.reader = easyocr.Reader(['en'])
+    def __init__(self, render_policy=None):
+        """Initialize the OCRProcessor with the page rendering policy to use.
+
+        Args:
+            render_policy (RenderPolicy, optional): Defaults to the adaptive policy from settings.
+        """
+        self.render_policy = render_policy or RenderPolicy()
+
+    @property
+    def reader(self):
+        """easyocr.Reader: The shared EasyOCR reader."""
+        return get_ocr_reader()
+
+    @property
+    def model_version(self):
+        """str: Identifies the OCR model and rendering settings, for caching OCR output."""
+        policy = self.render_policy
+        return (
+            f"easyocr-{getattr(easyocr, '__version__', 'unknown')}"
+            f"-{'+'.join(getattr(settings, 'OCR_LANGUAGES', ['en']))}"
+            f"-dpi{policy.min_dpi}-{policy.max_dpi}-{policy.target_glyph_px}"
+            f"-px{policy.max_pixels}-{'gray' if policy.grayscale else 'rgb'}"
+        )
 
     @contextmanager
-    def _temp_image(self, image_data):
-        """Context manager for handling temporary image files.
+    def _open_pdf(self, pdf):
+        """Context manager yielding an open PyMuPDF document.
 
         Args:
-            image_data: The image data to be saved as a temporary file.
+            pdf: A path, the raw PDF bytes, or an already open fitz.Document.
+                Documents passed in are left open for the caller.
         """
-        temp_file = None
+        if isinstance(pdf, fitz.Document):
+            yield pdf
+            return
+
+        doc = None
         try:
-            temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.png')
-            image_data.save(temp_file.name)
-            temp_file.close()
-            yield temp_file.name
+            if isinstance(pdf, (bytes, bytearray, memoryview)):
+                doc = fitz.open(stream=pdf, filetype='pdf')
+            else:
+                doc = fitz.open(pdf)
+            yield doc
         finally:
-            if temp_file and os.path.exists(temp_file.name):
-                try:
-                    os.unlink(temp_file.name)
-                except Exception:
-                    pass
+            if doc:
+                doc.close()
 
-    def process_image(self, image_path):
+    def _read_text(self, image):
+        """Run the reader on an image and join the recognised lines.
+
+        Args:
+            image: A NumPy array, encoded image bytes, or a file path.
+
+        Returns:
+            str: The recognised text.
+        """
+        results = self.reader.readtext(image)
+        return "\n".join([result[1] for result in results])
+
+    def process_image(self, image):
         """Process a single image using EasyOCR.
 
         Args:
-            image_path (str): The path to the image file.
+            image: The encoded image bytes, a NumPy array, or the path to the image file.
 
         Returns:
             str: The extracted text from the image.
         """
         try:
-            results = self.reader.readtext(image_path)
-            text = "\n".join([result[1] for result in results])
-            return text.strip()
+            return self._read_text(image).strip()
         except Exception as e:
             raise Exception(f"Error processing image with OCR: {str(e)}")
 
-    def process_pdf_with_ocr(self, pdf_path):
-        """Process a PDF using OCR by converting pages to images.
+    def _ocr_page(self, page):
+        """Render a single PDF page and run OCR on its pixel buffer.
 
         Args:
-            pdf_path (str): The path to the PDF file.
+            page (fitz.Page): The page to process.
 
         Returns:
-            str: The extracted text from the PDF.
+            str: The text recognised on the page.
+        """
+        pix = self.render_policy.render(page)
+        return self._read_text(pixmap_to_array(pix))
+
+    def _render_page(self, page):
+        """Render a PDF page to a NumPy bitmap for the OCR pool (copied, so it outlives the pixmap)."""
+        return pixmap_to_array(self.render_policy.render(page)).copy()
+
+    def process_pdf_pages(self, pdf, page_numbers):
+        """Run OCR on selected pages of a PDF only.
+
+        Args:
+            pdf: A path, the raw PDF bytes, or an open fitz.Document.
+            page_numbers (list): Zero-based indexes of the pages to process.
+
+        Returns:
+            dict: The recognised text keyed by page index.
         """
-        doc = None
         try:
-            doc = fitz.open(pdf_path)
-            text = []
+            with self._open_pdf(pdf) as doc:
+                executor = OCRExecutor()
+                if executor.enabled and len(page_numbers) > 1:
+                    return executor.ocr_pages(doc, page_numbers, self._render_page)
+                return {
+                    page_number: self._ocr_page(doc[page_number]).strip()
+                    for page_number in page_numbers
+                }
+        except Exception as e:
+            raise Exception(f"Error processing PDF pages with OCR: {str(e)}")
 
-            for page in doc:
-                # Get the page as an image
-                pix = page.get_pixmap(matrix=fitz.Matrix(300/72, 300/72))
-                img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
+    def process_pdf_with_ocr(self, pdf):
+        """Process a PDF using OCR by rendering every page.
 
-                # Process the image with OCR
-                with self._temp_image(img) as temp_img_path:
-                    results = self.reader.readtext(temp_img_path)
-                    page_text = "\n".join([result[1] for result in results])
-                    text.append(page_text)
+        Args:
+            pdf: A path, the raw PDF bytes, or an open fitz.Document.
 
+        Returns:
+            str: The extracted text from the PDF.
+        """
+        try:
+            with self._open_pdf(pdf) as doc:
+                page_numbers = list(range(doc.page_count))
+                executor = OCRExecutor()
+                if executor.enabled and len(page_numbers) > 1:
+                    pages = executor.ocr_pages(doc, page_numbers, self._render_page)
+                    text = [pages[page_number] for page_number in page_numbers]
+                else:
+                    text = [self._ocr_page(page) for page in doc]
             return "\n\n".join(text).strip()
         except Exception as e:
             raise Exception(f"Error processing PDF with OCR: {str(e)}")
-        finally:
-            if doc:
-                doc.close()
\ No newline at end of file
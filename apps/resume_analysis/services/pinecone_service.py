@@ -1,9 +1,10 @@
 import logging
-import os
+from concurrent.futures import ThreadPoolExecutor
 from django.conf import settings
-from pinecone import Pinecone
-from sentence_transformers import SentenceTransformer
 from ..models import Resume
+from .embedding_model import encode
+from .query_embedding_cache import get_query_embedding_cache
+from .vector_store import get_vector_store
 
 logger = logging.getLogger(__name__)
 
@@ -11,7 +12,8 @@ class PineconeService:
     """Service for managing resume vectors in Pinecone.
 
     This class handles the creation, searching, and deletion of vectors
-    associated with resumes using the Pinecone vector database.
+    associated with resumes using the Pinecone vector database, or the
+    local vector store when settings.VECTOR_STORE_BACKEND is 'local'.
     """
 
     def __init__(self):
@@ -20,14 +22,10 @@ class PineconeService:
         self.environment = settings.PINECONE_ENVIRONMENT
         self.index_name = settings.PINECONE_INDEX
         logger.info(f"Initializing PineconeService with index: {self.index_name}")
-        
-        # Use the locally downloaded model
-        self.model = SentenceTransformer('sentence-transformers/all-mpnet-base-v2')
-        
-        # Initialize Pinecone and connect to existing index
-        self.pc = Pinecone(api_key=self.api_key)
-        self.index = self.pc.Index(self.index_name)
-        logger.info(f"Connected to existing Pinecone index: {self.index_name}")
+
+        # Embeddings come from the process-wide model (see embedding_model.encode)
+        # Connect to the existing Pinecone index, or open the local vector store
+        self.index = get_vector_store()
 
     def create_vectors_for_resume(self, resume_id: str) -> str:
         """Create vectors for all sections of a resume.
@@ -40,89 +38,104 @@ class PineconeService:
         """
         try:
             logger.info(f"Starting vector creation for resume: {resume_id}")
-            resume = Resume.objects.get(file_id=resume_id)
-            content = resume.resumecontent
-            features = content.extracted_features or {}  # Default to empty dict if None
-
-            # Create full text vector
-            logger.info(f"Creating full text vector for resume: {resume_id}")
-            skills = []
-            if features.get('skills'):
-                skills = (
-                    features['skills'].get('technical', []) +
-                    features['skills'].get('soft', [])
-                )
-
-            self._create_vector_for_section(
-                resume=resume,
-                section_type='full_text',
-                content=content.raw_text,
-                metadata={
-                    'resume_id': str(resume.file_id),
-                    'file_name': resume.original_filename,
-                    'section_type': 'full_text',
-                    'skills': skills
-                }
-            )
-
-            # Only create skills vector if we have skills data
-            if features.get('skills'):
-                logger.info(f"Creating skills vector for resume: {resume_id}")
-                skills_text = ' '.join([
-                    ' '.join(features['skills'].get('technical', [])),
-                    ' '.join(features['skills'].get('soft', []))
-                ]).strip()
-                
-                if skills_text:  # Only create skills vector if we have skills text
-                    self._create_vector_for_section(
-                        resume=resume,
-                        section_type='skills',
-                        content=skills_text,
-                        metadata={
-                            'resume_id': str(resume.file_id),
-                            'file_name': resume.original_filename,
-                            'section_type': 'skills',
-                            'skills': skills
-                        }
-                    )
-
+            resume = Resume.objects.select_related('resumecontent').get(file_id=resume_id)
+            self.create_vectors_for_resumes([resume])
             return f"{resume_id}-full_text"  # Return the main vector ID
 
         except Exception as e:
             logger.error(f"Error creating vectors for resume {resume_id}: {str(e)}")
             raise
 
-    def _create_vector_for_section(self, resume: Resume, section_type: str, content: str, metadata: dict = None) -> None:
-        """Create a vector for a specific section of a resume.
+    def create_vectors_for_resumes(self, resumes: list) -> int:
+        """Create the vectors of the sections of many resumes.
+
+        Every section of every resume is encoded in one batched call, and the
+        vectors are written in upsert batches of settings.PINECONE_UPSERT_BATCH_SIZE,
+        sent in parallel by up to settings.PINECONE_UPSERT_WORKERS threads.
+
+        Args:
+            resumes (list): Resume objects with their resumecontent.
+
+        Returns:
+            int: The number of vectors written.
+        """
+        records = []
+        for resume in resumes:
+            records.extend(self._section_records(resume))
+        if not records:
+            return 0
+
+        embeddings = encode(
+            [content for _, content, _ in records],
+            batch_size=getattr(settings, 'EMBEDDING_BATCH_SIZE', 32)
+        )
+        vectors = [
+            (vector_id, embedding.tolist(), metadata)
+            for (vector_id, _, metadata), embedding in zip(records, embeddings)
+        ]
+        self._upsert(vectors)
+        logger.info(f"Created {len(vectors)} vector(s) for {len(resumes)} resume(s)")
+        return len(vectors)
+
+    def _section_records(self, resume: Resume) -> list:
+        """Build the (vector id, content, metadata) records of the sections of a resume.
+
+        A full text record is always built; a skills record only when the
+        extracted features list skills.
 
         Args:
             resume (Resume): The resume object.
-            section_type (str): The type of section (e.g., 'full_text', 'skills').
-            content (str): The content to encode into a vector.
-            metadata (dict, optional): Additional metadata to associate with the vector.
+
+        Returns:
+            list: The records to encode and upsert.
         """
-        try:
-            logger.info(f"Creating vector for section {section_type} of resume {resume.file_id}")
-            embedding = self.model.encode(content).tolist()
-            
-            # Prepare metadata
-            base_metadata = {
-                'resume_id': str(resume.file_id),
-                'section_type': section_type,
-                'content': content[:1000]  # Limit content length in metadata
-            }
-            
-            # Update with additional metadata if provided
-            if metadata:
-                base_metadata.update(metadata)
-            
-            vector_id = f"{resume.file_id}-{section_type}"
-            logger.info(f"Upserting vector with ID: {vector_id}")
-            self.index.upsert([(vector_id, embedding, base_metadata)])
-            logger.info(f"Successfully created vector for section {section_type} of resume {resume.file_id}")
-        except Exception as e:
-            logger.error(f"Error in _create_vector_for_section: {str(e)}")
-            raise
+        content = resume.resumecontent
+        features = content.extracted_features or {}  # Default to empty dict if None
+        skills = []
+        if features.get('skills'):
+            skills = (
+                features['skills'].get('technical', []) +
+                features['skills'].get('soft', [])
+            )
+
+        sections = [('full_text', content.processing_text)]
+        skills_text = ' '.join(skills).strip()
+        if skills_text:  # Only create skills vector if we have skills text
+            sections.append(('skills', skills_text))
+
+        records = []
+        for section_type, section_content in sections:
+            records.append((
+                f"{resume.file_id}-{section_type}",
+                section_content,
+                {
+                    'resume_id': str(resume.file_id),
+                    'file_name': resume.original_filename,
+                    'section_type': section_type,
+                    'content': section_content[:1000],  # Limit content length in metadata
+                    'skills': skills
+                }
+            ))
+        return records
+
+    def _upsert(self, vectors: list) -> None:
+        """Write vectors to the index in sized batches sent in parallel.
+
+        Args:
+            vectors (list): (id, values, metadata) tuples.
+        """
+        batch_size = max(1, getattr(settings, 'PINECONE_UPSERT_BATCH_SIZE', 100))
+        batches = [vectors[i:i + batch_size] for i in range(0, len(vectors), batch_size)]
+        workers = min(len(batches), max(1, getattr(settings, 'PINECONE_UPSERT_WORKERS', 4)))
+
+        if workers == 1:
+            for batch in batches:
+                self.index.upsert(vectors=batch)
+            return
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for future in [executor.submit(self.index.upsert, vectors=batch) for batch in batches]:
+                future.result()
 
     def search_similar_resumes(self, query: str, section_type: str = 'full_text', limit: int = 10) -> list:
         """Search for similar resumes using Pinecone.
@@ -137,7 +150,7 @@ class PineconeService:
         """
         try:
             logger.info(f"Searching resumes with query: '{query}', section_type: {section_type}")
-            query_embedding = self.model.encode(query).tolist()
+            query_embedding = get_query_embedding_cache().get_or_encode(query, lambda text: encode(text).tolist())
             logger.info("Created query embedding, searching Pinecone...")
             
             # Add filter only if section_type is specified and not 'all'
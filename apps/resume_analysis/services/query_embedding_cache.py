@@ -0,0 +1,152 @@
+import hashlib
+import logging
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from django.conf import settings
+from django.core.cache import caches
+
+from .embedding_model import embedding_model_version
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_query(query):
+    """Return the canonical form of a search query: NFKC, lower case, single spaces."""
+    return ' '.join(unicodedata.normalize('NFKC', query or '').lower().split())
+
+
+class QueryEmbeddingCache:
+    """LRU cache of search query embeddings.
+
+    Embeddings are keyed by the embedding model version and the normalised query
+    text, so "Python  Developer" and "python developer" share an entry and a
+    model change never returns stale vectors. Entries live in an in-process
+    LRU of max_size entries; with shared set, misses are also looked up in
+    (and written to) a Django cache, Redis by default, so every web process
+    benefits from the queries another one has encoded.
+
+    Attributes:
+        max_size (int): Entries kept in the in-process LRU.
+        shared: The Django cache shared by every process, or None.
+        ttl (int): Seconds an entry is kept in the shared cache.
+    """
+
+    def __init__(self, max_size=None, shared=None, alias=None, ttl=None):
+        """Initialize the cache from settings unless values are given."""
+        self.max_size = max_size if max_size is not None else getattr(settings, 'QUERY_EMBEDDING_CACHE_SIZE', 1024)
+        if shared is None:
+            shared = getattr(settings, 'QUERY_EMBEDDING_CACHE_SHARED', False)
+        self.shared = caches[alias or getattr(settings, 'LLM_CACHE_ALIAS', 'llm')] if shared else None
+        self.ttl = ttl if ttl is not None else getattr(settings, 'QUERY_EMBEDDING_CACHE_TTL', 7 * 24 * 3600)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {'local_hits': 0, 'shared_hits': 0, 'misses': 0, 'encode_seconds': 0.0}
+
+    def make_key(self, query):
+        """Build the cache key of a query.
+
+        Args:
+            query (str): The search query as typed.
+
+        Returns:
+            str: The cache key.
+        """
+        digest = hashlib.sha256(normalize_query(query).encode('utf-8')).hexdigest()
+        return f"query_embedding:{embedding_model_version()}:{digest}"
+
+    def _count(self, counter, value=1):
+        with self._lock:
+            self._counters[counter] += value
+
+    def _remember(self, key, embedding):
+        with self._lock:
+            self._entries[key] = embedding
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def get_or_encode(self, query, encode):
+        """Return the embedding of a query, encoding it only on a cache miss.
+
+        Args:
+            query (str): The search query.
+            encode (callable): Returns the embedding of a text as a list of floats.
+
+        Returns:
+            list: The query embedding.
+        """
+        key = self.make_key(query)
+        with self._lock:
+            embedding = self._entries.get(key)
+            if embedding is not None:
+                self._entries.move_to_end(key)
+                self._counters['local_hits'] += 1
+                return embedding
+
+        if self.shared is not None:
+            try:
+                embedding = self.shared.get(key)
+            except Exception as e:
+                logger.warning(f"Shared query embedding cache unavailable: {str(e)}")
+            if embedding is not None:
+                self._count('shared_hits')
+                self._remember(key, embedding)
+                return embedding
+
+        started = time.perf_counter()
+        embedding = encode(normalize_query(query))
+        self._count('misses')
+        self._count('encode_seconds', time.perf_counter() - started)
+        self._remember(key, embedding)
+
+        if self.shared is not None:
+            try:
+                self.shared.set(key, embedding, timeout=self.ttl)
+            except Exception as e:
+                logger.warning(f"Could not store query embedding in shared cache: {str(e)}")
+        return embedding
+
+    def stats(self):
+        """Return the hit counters of this process and the encode time they saved.
+
+        Returns:
+            dict: 'local_hits', 'shared_hits', 'misses', 'hit_rate', 'size'
+                and 'saved_seconds' (hits times the average encode time of a miss).
+        """
+        with self._lock:
+            counters = dict(self._counters)
+            size = len(self._entries)
+        hits = counters['local_hits'] + counters['shared_hits']
+        lookups = hits + counters['misses']
+        average_encode = counters['encode_seconds'] / counters['misses'] if counters['misses'] else 0.0
+        return {
+            'local_hits': counters['local_hits'],
+            'shared_hits': counters['shared_hits'],
+            'misses': counters['misses'],
+            'hit_rate': round(hits / lookups, 3) if lookups else 0.0,
+            'size': size,
+            'saved_seconds': round(hits * average_encode, 3),
+        }
+
+    def clear(self):
+        """Drop the in-process entries and counters."""
+        with self._lock:
+            self._entries.clear()
+            self._counters = dict.fromkeys(self._counters, 0)
+            self._counters['encode_seconds'] = 0.0
+
+
+_query_cache = None
+_query_cache_lock = threading.Lock()
+
+
+def get_query_embedding_cache():
+    """Return the process-wide query embedding cache."""
+    global _query_cache
+    if _query_cache is None:
+        with _query_cache_lock:
+            if _query_cache is None:
+                _query_cache = QueryEmbeddingCache()
+    return _query_cache
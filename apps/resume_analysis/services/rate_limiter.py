@@ -0,0 +1,346 @@
+import logging
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+_redis_clients = {}
+_redis_lock = threading.Lock()
+_local_state = {}
+_local_lock = threading.Lock()
+
+# Seconds before an unreachable Redis is tried again
+REDIS_RETRY_SECONDS = 30
+
+# Refill and take in one atomic step; returns the seconds to wait (0 if taken)
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local requested = tonumber(ARGV[3])
+local time = redis.call('TIME')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+local data = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(data[1]) or capacity
+local ts = tonumber(data[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local wait = 0
+if tokens >= requested then
+    tokens = tokens - requested
+else
+    wait = (requested - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 60)
+return tostring(wait)
+"""
+
+
+class RateLimitTimeout(Exception):
+    """Raised when the shared budget does not free up within the allowed wait."""
+
+
+def get_redis_client(url):
+    """Return a shared Redis client for a URL, or None if Redis is not available.
+
+    An unreachable Redis is remembered for REDIS_RETRY_SECONDS and then tried
+    again, so the limits are shared again once it is back.
+
+    Args:
+        url (str): The Redis URL, or None to run without Redis.
+    """
+    if not url:
+        return None
+    client, retry_at = _redis_clients.get(url, (None, 0))
+    if client is not None or time.monotonic() < retry_at:
+        return client
+    with _redis_lock:
+        client, retry_at = _redis_clients.get(url, (None, 0))
+        if client is not None or time.monotonic() < retry_at:
+            return client
+        try:
+            import redis
+            client = redis.Redis.from_url(url, socket_timeout=1, socket_connect_timeout=1)
+            client.ping()
+        except Exception as e:
+            logger.warning(
+                f"Redis at {url} unavailable, using in-process rate limiting "
+                f"for {REDIS_RETRY_SECONDS}s: {str(e)}"
+            )
+            client = None
+        _redis_clients[url] = (client, time.monotonic() + REDIS_RETRY_SECONDS)
+    return client
+
+
+def _is_connection_error(error):
+    """Return True if a Redis call failed because the server could not be reached in time."""
+    try:
+        from redis.exceptions import ConnectionError as RedisConnectionError, TimeoutError as RedisTimeoutError
+    except ImportError:
+        return isinstance(error, OSError)
+    return isinstance(error, (RedisConnectionError, RedisTimeoutError, OSError))
+
+
+def _redis_failed(url, error):
+    """Stop using the Redis at a URL for REDIS_RETRY_SECONDS after a connection error.
+
+    Without this every later call would wait for its own socket timeout
+    before falling back. Other errors leave the client in place.
+
+    Args:
+        url (str): The Redis URL.
+        error (Exception): The error raised by the Redis call.
+    """
+    if not _is_connection_error(error):
+        return
+    with _redis_lock:
+        client, _ = _redis_clients.get(url, (None, 0))
+        if client is None:
+            return
+        _redis_clients[url] = (None, time.monotonic() + REDIS_RETRY_SECONDS)
+    logger.warning(
+        f"Redis at {url} unreachable, using in-process rate limiting "
+        f"for {REDIS_RETRY_SECONDS}s: {str(error)}"
+    )
+
+
+def _local(name, default):
+    """Return the in-process state stored under a name, creating it from default."""
+    with _local_lock:
+        return _local_state.setdefault(name, default)
+
+
+def parse_retry_after(value):
+    """Convert a Retry-After header (seconds or HTTP date) into seconds, or None."""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """A token bucket shared by every process through Redis.
+
+    Falls back to a bucket shared by the threads of the current process when
+    Redis is not reachable.
+
+    Attributes:
+        name (str): The bucket key.
+        rate (float): Tokens added per second.
+        capacity (float): The maximum burst.
+        redis_url (str): The URL of the Redis the bucket is shared through, or None.
+    """
+
+    def __init__(self, name, rate, capacity, redis_url=None):
+        """Initialize the bucket."""
+        self.name = name
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.redis_url = redis_url
+
+    @property
+    def redis(self):
+        """The Redis client, looked up on use so the bucket reconnects after an outage."""
+        return get_redis_client(self.redis_url)
+
+    def _take_local(self, amount):
+        state = _local(self.name, {'tokens': self.capacity, 'ts': time.monotonic(), 'lock': threading.Lock()})
+        with state['lock']:
+            now = time.monotonic()
+            state['tokens'] = min(self.capacity, state['tokens'] + (now - state['ts']) * self.rate)
+            state['ts'] = now
+            if state['tokens'] >= amount:
+                state['tokens'] -= amount
+                return 0.0
+            return (amount - state['tokens']) / self.rate
+
+    def take(self, amount=1):
+        """Try to take tokens from the bucket.
+
+        Args:
+            amount (float): The number of tokens, capped at the bucket capacity.
+
+        Returns:
+            float: 0 if the tokens were taken, otherwise the seconds until they will be available.
+        """
+        amount = min(float(amount), self.capacity)
+        if self.redis is not None:
+            try:
+                return float(self.redis.eval(TOKEN_BUCKET_SCRIPT, 1, self.name, self.rate, self.capacity, amount))
+            except Exception as e:
+                logger.warning(f"Redis rate limiting failed, using in-process bucket: {str(e)}")
+                _redis_failed(self.redis_url, e)
+        return self._take_local(amount)
+
+
+class MistralRateLimiter:
+    """Shares the Mistral requests-per-second and tokens-per-minute quota across workers.
+
+    Every call waits for a request slot and for its estimated tokens. A 429
+    answer pauses all processes for its Retry-After period.
+
+    Attributes:
+        max_wait (float): Seconds a call may wait for budget before giving up.
+    """
+
+    PAUSE_KEY = 'llm:ratelimit:paused_until'
+
+    def __init__(self):
+        """Initialize the limiter from settings."""
+        self.redis_url = getattr(settings, 'LLM_RATE_LIMIT_URL', None)
+        rps = getattr(settings, 'LLM_REQUESTS_PER_SECOND', 1)
+        tpm = getattr(settings, 'LLM_TOKENS_PER_MINUTE', 500000)
+        self.requests = TokenBucket('llm:ratelimit:requests', rps, max(rps, 1), self.redis_url)
+        self.tokens = TokenBucket('llm:ratelimit:tokens', tpm / 60, tpm, self.redis_url)
+        self.max_wait = getattr(settings, 'LLM_RATE_LIMIT_MAX_WAIT', 120)
+
+    @property
+    def redis(self):
+        """The Redis client, looked up on use so the limiter reconnects after an outage."""
+        return get_redis_client(self.redis_url)
+
+    def _paused_for(self):
+        """Return the seconds left in a Retry-After pause, 0 if there is none."""
+        paused_until = None
+        if self.redis is not None:
+            try:
+                paused_until = self.redis.get(self.PAUSE_KEY)
+            except Exception as e:
+                _redis_failed(self.redis_url, e)
+                paused_until = None
+        if paused_until is None:
+            paused_until = _local(self.PAUSE_KEY, {'until': 0})['until']
+        return max(float(paused_until) - time.time(), 0.0)
+
+    def pause(self, seconds):
+        """Stop every process from calling the API for a number of seconds.
+
+        Args:
+            seconds (float): The Retry-After period.
+        """
+        until = time.time() + seconds
+        _local(self.PAUSE_KEY, {'until': 0})['until'] = until
+        if self.redis is not None:
+            try:
+                self.redis.set(self.PAUSE_KEY, until, px=max(int(seconds * 1000), 1))
+            except Exception as e:
+                _redis_failed(self.redis_url, e)
+        logger.warning(f"Mistral rate limit hit, pausing API calls for {seconds:.1f}s")
+
+    def acquire(self, estimated_tokens):
+        """Block until a request slot and the estimated tokens are available.
+
+        Args:
+            estimated_tokens (int): Prompt plus expected completion tokens of the call.
+
+        Raises:
+            RateLimitTimeout: If the budget is not available within max_wait seconds.
+        """
+        deadline = time.monotonic() + self.max_wait
+        for bucket, amount in ((self.requests, 1), (self.tokens, estimated_tokens)):
+            while True:
+                wait = self._paused_for()
+                if wait <= 0:
+                    wait = bucket.take(amount)
+                    if wait <= 0:
+                        break
+                if time.monotonic() + wait > deadline:
+                    raise RateLimitTimeout(f"Mistral quota not available within {self.max_wait}s")
+                time.sleep(wait)
+
+    def record_usage(self, extra_tokens):
+        """Charge tokens used beyond the estimate, if the bucket has them, without waiting."""
+        if extra_tokens > 0:
+            self.tokens.take(extra_tokens)
+
+
+class CircuitBreaker:
+    """Fails calls fast while the API is degraded.
+
+    After failure_threshold failures within window seconds the circuit opens
+    and calls are refused for cooldown seconds. The first call after the
+    cooldown is a trial: another failure re-opens the circuit at once, a
+    success closes it. State is shared through Redis when available.
+    """
+
+    def __init__(self, name='llm:circuit'):
+        """Initialize the breaker from settings."""
+        self.name = name
+        self.redis_url = getattr(settings, 'LLM_RATE_LIMIT_URL', None)
+        self.failure_threshold = getattr(settings, 'LLM_CIRCUIT_FAILURE_THRESHOLD', 5)
+        self.window = getattr(settings, 'LLM_CIRCUIT_WINDOW_SECONDS', 60)
+        self.cooldown = getattr(settings, 'LLM_CIRCUIT_COOLDOWN_SECONDS', 30)
+
+    @property
+    def redis(self):
+        """The Redis client, looked up on use so the breaker reconnects after an outage."""
+        return get_redis_client(self.redis_url)
+
+    def _state(self):
+        return _local(self.name, {'failures': [], 'open_until': 0, 'tripped_until': 0})
+
+    def allow_request(self):
+        """Return False while the circuit is open."""
+        if self.redis is not None:
+            try:
+                return not self.redis.exists(f"{self.name}:open")
+            except Exception as e:
+                _redis_failed(self.redis_url, e)
+        return time.time() >= self._state()['open_until']
+
+    def record_success(self):
+        """Close the circuit after a successful call."""
+        if self.redis is not None:
+            try:
+                self.redis.delete(f"{self.name}:failures", f"{self.name}:tripped")
+                return
+            except Exception as e:
+                _redis_failed(self.redis_url, e)
+        state = self._state()
+        state['failures'] = []
+        state['tripped_until'] = 0
+
+    def _open(self):
+        logger.error(f"Mistral circuit opened for {self.cooldown}s after repeated failures")
+        if self.redis is not None:
+            try:
+                pipe = self.redis.pipeline()
+                pipe.set(f"{self.name}:open", 1, ex=self.cooldown)
+                pipe.set(f"{self.name}:tripped", 1, ex=self.cooldown + self.window)
+                pipe.delete(f"{self.name}:failures")
+                pipe.execute()
+                return
+            except Exception as e:
+                _redis_failed(self.redis_url, e)
+        state = self._state()
+        state['open_until'] = time.time() + self.cooldown
+        state['tripped_until'] = time.time() + self.cooldown + self.window
+        state['failures'] = []
+
+    def record_failure(self):
+        """Count a failed call and open the circuit when the threshold is reached."""
+        if self.redis is not None:
+            try:
+                key = f"{self.name}:failures"
+                pipe = self.redis.pipeline()
+                pipe.incr(key)
+                pipe.expire(key, self.window)
+                pipe.exists(f"{self.name}:tripped")
+                failures, _, tripped = pipe.execute()
+                if tripped or failures >= self.failure_threshold:
+                    self._open()
+                return
+            except Exception as e:
+                _redis_failed(self.redis_url, e)
+        state = self._state()
+        now = time.time()
+        state['failures'] = [ts for ts in state['failures'] if now - ts < self.window] + [now]
+        if now < state['tripped_until'] or len(state['failures']) >= self.failure_threshold:
+            self._open()
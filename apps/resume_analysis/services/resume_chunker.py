@@ -0,0 +1,199 @@
+import logging
+import math
+import os
+import re
+from django.conf import settings
+
+from .model_registry import model_registry
+
+logger = logging.getLogger(__name__)
+
+SECTION_KEYWORDS = (
+    'summary', 'professional summary', 'profile', 'about me', 'objective', 'career objective',
+    'experience', 'work experience', 'professional experience', 'employment', 'employment history',
+    'work history', 'internships', 'education', 'academic background', 'skills', 'technical skills',
+    'core competencies', 'competencies', 'projects', 'personal projects', 'certifications',
+    'certificates', 'courses', 'training', 'languages', 'awards', 'honors', 'achievements',
+    'publications', 'volunteering', 'volunteer experience', 'interests', 'hobbies', 'references',
+)
+
+SECTION_HEADING_RE = re.compile(
+    r'^[ \t#*\-•>|\d.)]*(' + '|'.join(re.escape(keyword) for keyword in SECTION_KEYWORDS) + r')\s*:?\s*$',
+    re.IGNORECASE | re.MULTILINE
+)
+
+# Separators tried in order when a section does not fit the budget on its own
+SPLIT_SEPARATORS = (r'\n\s*\n', r'\n', r'(?<=[.!?])\s+', r'\s+')
+
+# The tokenizer of mistral-large-latest, the model the features are extracted with
+DEFAULT_LLM_TOKENIZER = 'mistralai/Mistral-Large-Instruct-2411'
+
+# Tokenizers that failed to load in this process, not tried again
+_unavailable_tokenizers = set()
+
+
+def _estimate_token_count(text):
+    """Approximate the token count of a text without a tokenizer.
+
+    Words and punctuation marks are counted separately, long words count as
+    several tokens, and the result never drops below one token per four characters.
+    """
+    pieces = re.findall(r'\w+|[^\w\s]', text)
+    tokens = sum(math.ceil(len(piece) / 6) if len(piece) > 6 else 1 for piece in pieces)
+    return max(tokens, math.ceil(len(text) / 4))
+
+
+def get_token_counter():
+    """Return the function used to count LLM tokens.
+
+    Uses the Hugging Face tokenizer named by settings.LLM_TOKENIZER (a
+    tokenizer.json path or a hub id, the Mistral tokenizer by default) when
+    it can be loaded; the tokenizer is shared through the model registry.
+    Hub files are fetched with huggingface_hub, which reads HF_TOKEN for
+    gated repositories. An empty setting, or a tokenizer that cannot be
+    loaded, falls back to an estimate; a failed load is not retried.
+
+    Returns:
+        callable: Takes a text and returns its number of tokens.
+    """
+    name = getattr(settings, 'LLM_TOKENIZER', DEFAULT_LLM_TOKENIZER)
+    if not name or name in _unavailable_tokenizers:
+        return _estimate_token_count
+
+    def load():
+        from tokenizers import Tokenizer
+        if os.path.exists(name):
+            return Tokenizer.from_file(name)
+        from huggingface_hub import hf_hub_download
+        return Tokenizer.from_file(hf_hub_download(name, 'tokenizer.json'))
+
+    try:
+        tokenizer = model_registry.get(f"tokenizer:{name}", load)
+    except Exception as e:
+        logger.warning(f"Could not load tokenizer {name}, estimating token counts: {str(e)}")
+        _unavailable_tokenizers.add(name)
+        return _estimate_token_count
+    return lambda text: len(tokenizer.encode(text, add_special_tokens=False).ids)
+
+
+def split_sections(text):
+    """Split a resume into sections at their headings.
+
+    Args:
+        text (str): The resume text.
+
+    Returns:
+        list: (heading, text) tuples in document order; the text before the
+            first heading has an empty heading.
+    """
+    starts = [match.start() for match in SECTION_HEADING_RE.finditer(text)]
+    if not starts or starts[0] != 0:
+        starts.insert(0, 0)
+
+    sections = []
+    for start, end in zip(starts, starts[1:] + [len(text)]):
+        section = text[start:end]
+        if not section.strip():
+            continue
+        match = SECTION_HEADING_RE.match(section)
+        heading = section[:match.end()].strip() if match else ''
+        sections.append((heading, section))
+    return sections
+
+
+class ResumeChunker:
+    """Splits resume text into chunks for the LLM along section boundaries.
+
+    The text is cut at section headings (experience, education, skills,
+    projects, ...) and whole sections are packed into chunks of at most
+    max_tokens tokens. A section that does not fit on its own is split at
+    blank lines, then lines, sentences and words, and its heading is repeated
+    at the top of each continuation chunk. Chunks smaller than min_tokens are
+    merged into a neighbour, so a chunk may exceed max_tokens by up to min_tokens.
+
+    Attributes:
+        max_tokens (int): The token budget of a chunk.
+        min_tokens (int): The smallest chunk worth a request of its own.
+        count_tokens (callable): Returns the number of tokens of a text.
+    """
+
+    def __init__(self, max_tokens=None, min_tokens=None, count_tokens=None):
+        """Initialize the chunker from settings unless values are given."""
+        self.max_tokens = max_tokens or getattr(settings, 'LLM_CHUNK_MAX_TOKENS', 4000)
+        self.min_tokens = min_tokens if min_tokens is not None else getattr(settings, 'LLM_CHUNK_MIN_TOKENS', 500)
+        self.count_tokens = count_tokens or get_token_counter()
+
+    def _split_oversized(self, text, budget, separators=SPLIT_SEPARATORS):
+        """Split a text that exceeds the budget into pieces that fit it."""
+        if self.count_tokens(text) <= budget:
+            return [text]
+        if not separators:
+            # No separator left: cut by characters in proportion to the token count
+            step = max(1, int(len(text) * budget / self.count_tokens(text)))
+            return [text[i:i + step] for i in range(0, len(text), step)]
+
+        parts = re.split(f'({separators[0]})', text)
+        # Keep each separator with the piece before it so no text is lost
+        pieces = [''.join(parts[i:i + 2]) for i in range(0, len(parts), 2)]
+        if len(pieces) == 1:
+            return self._split_oversized(text, budget, separators[1:])
+
+        result = []
+        for piece in self._pack(pieces, budget):
+            result.extend(self._split_oversized(piece, budget, separators[1:]))
+        return result
+
+    def _pack(self, pieces, budget):
+        """Greedily join consecutive pieces into texts of at most budget tokens."""
+        packed, current = [], ''
+        for piece in pieces:
+            if current and self.count_tokens(current + piece) > budget:
+                packed.append(current)
+                current = ''
+            current += piece
+        if current:
+            packed.append(current)
+        return packed
+
+    def _merge_small(self, chunks):
+        """Merge chunks below min_tokens into their smaller neighbour."""
+        chunks = list(chunks)
+        while len(chunks) > 1:
+            sizes = [self.count_tokens(chunk) for chunk in chunks]
+            smallest = min(range(len(chunks)), key=sizes.__getitem__)
+            if sizes[smallest] >= self.min_tokens:
+                break
+            if smallest == 0:
+                neighbour = 1
+            elif smallest == len(chunks) - 1:
+                neighbour = smallest - 1
+            else:
+                neighbour = smallest - 1 if sizes[smallest - 1] <= sizes[smallest + 1] else smallest + 1
+            first, second = sorted((smallest, neighbour))
+            chunks[first:second + 1] = [chunks[first] + chunks[second]]
+        return chunks
+
+    def chunk(self, text):
+        """Split resume text into chunks for the LLM.
+
+        Args:
+            text (str): The resume text.
+
+        Returns:
+            list: The text chunks in document order.
+        """
+        if not text:
+            return []
+        if self.count_tokens(text) <= self.max_tokens:
+            return [text]
+
+        pieces = []
+        for heading, section in split_sections(text):
+            if self.count_tokens(section) <= self.max_tokens:
+                pieces.append(section)
+                continue
+            prefix = f"{heading} (continued)\n" if heading else ''
+            parts = self._split_oversized(section, self.max_tokens - self.count_tokens(prefix))
+            pieces.extend([parts[0]] + [prefix + part for part in parts[1:]])
+
+        return self._merge_small(self._pack(pieces, self.max_tokens))
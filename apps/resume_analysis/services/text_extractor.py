@@ -1,49 +1,47 @@
-import os
-import tempfile
-from contextlib import contextmanager
+import time
 
 import docx  # Third-party library for DOCX file handling
 import fitz  # PyMuPDF for PDF file handling
 
+from django.conf import settings
+
+from ..utils.file_hash import compute_file_hash
+from .extraction_cache import ExtractionCache
+from .extraction_planner import ExtractionPlanner
 from .ocr_processor import OCRProcessor  # Local import for OCR processing
+from .text_normalizer import PAGE_BREAK
+
+# Bump when a change to the extraction logic changes its output
+EXTRACTOR_VERSION = "4"
 
 class TextExtractor:
     """Class for extracting text from various file formats including PDF, DOCX, and images.
 
     Attributes:
         ocr_processor (OCRProcessor): An instance of the OCRProcessor for handling OCR tasks.
+        planner (ExtractionPlanner): Decides which PDF pages need OCR.
+        cache (ExtractionCache): Previously extracted text, or None if caching is disabled.
     """
     
+    SUPPORTED_EXTENSIONS = ['pdf', 'doc', 'docx', 'jpg', 'jpeg', 'png', 'tiff', 'bmp']
+
     def __init__(self):
-        """Initializes the TextExtractor with an OCRProcessor instance."""
+        """Initializes the TextExtractor with an OCRProcessor, an ExtractionPlanner and the extraction cache."""
         self.ocr_processor = OCRProcessor()
+        self.planner = ExtractionPlanner()
+        self.cache = ExtractionCache() if getattr(settings, 'EXTRACTION_CACHE_ENABLED', True) else None
 
-    @contextmanager
-    def _temp_file(self, file_obj, suffix):
-        """Context manager for handling temporary files.
+    def _read_bytes(self, file_obj):
+        """Read the whole upload into memory once.
 
         Args:
             file_obj (file-like object): The file object to read from.
-            suffix (str): The suffix for the temporary file.
-        
-        Yields:
-            str: The path to the temporary file.
+
+        Returns:
+            bytes: The file contents.
         """
-        temp_file = None
-        try:
-            # Create temporary file
-            file_obj.seek(0)
-            temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=suffix)
-            temp_file.write(file_obj.read())
-            temp_file.close()
-            yield temp_file.name
-        finally:
-            # Clean up
-            if temp_file and os.path.exists(temp_file.name):
-                try:
-                    os.unlink(temp_file.name)
-                except Exception:
-                    pass
+        file_obj.seek(0)
+        return file_obj.read()
 
     def extract(self, file_obj, filename):
         """Extract text from PDF, DOCX, or image files.
@@ -55,52 +53,131 @@ class TextExtractor:
         Returns:
             str: The extracted text.
         
+        Raises:
+            ValueError: If the file type is unsupported.
+        """
+        return self.extract_with_details(file_obj, filename)['text']
+
+    def extract_with_details(self, file_obj, filename, file_hash=None):
+        """Extract text and report which method was used for each page.
+
+        The extraction cache is checked before any document is opened; a hit
+        is marked with 'cached': True.
+
+        Args:
+            file_obj (file-like object): The file object to extract text from.
+            filename (str): The name of the file, used to determine the file type.
+            file_hash (str, optional): The SHA-256 of the file, computed if not given.
+
+        Returns:
+            dict: The extracted 'text', the 'strategy' used, and a 'pages' list with
+                the page number, method ('text_layer', 'ocr' or 'docx') and character
+                count of each page. PDFs also report 'timings'.
+
         Raises:
             ValueError: If the file type is unsupported.
         """
         file_extension = filename.lower().split('.')[-1]
-        
+
+        cache_key = None
+        if self.cache and file_extension in self.SUPPORTED_EXTENSIONS:
+            cache_key = self.cache.make_key(
+                file_hash or compute_file_hash(file_obj),
+                file_extension,
+                EXTRACTOR_VERSION,
+                self.ocr_processor.model_version,
+            )
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                cached['cached'] = True
+                return cached
+
+        result = self._extract_by_type(file_obj, file_extension)
+        if cache_key:
+            self.cache.set(cache_key, result)
+        return result
+
+    def _extract_by_type(self, file_obj, file_extension):
+        """Dispatch the extraction to the handler of a file type.
+
+        Args:
+            file_obj (file-like object): The file object to extract text from.
+            file_extension (str): The lower-case file extension.
+
+        Returns:
+            dict: The extraction result, see extract_with_details.
+
+        Raises:
+            ValueError: If the file type is unsupported.
+        """
         if file_extension == 'pdf':
             return self._extract_from_pdf(file_obj)
         elif file_extension in ['doc', 'docx']:
-            return self._extract_from_docx(file_obj)
+            text = self._extract_from_docx(file_obj)
+            return {'text': text, 'strategy': 'docx', 'pages': [{'page': 1, 'method': 'docx', 'chars': len(text)}]}
         elif file_extension in ['jpg', 'jpeg', 'png', 'tiff', 'bmp']:
-            return self._extract_from_image(file_obj)
+            text = self._extract_from_image(file_obj)
+            return {'text': text, 'strategy': 'full_ocr', 'pages': [{'page': 1, 'method': 'ocr', 'chars': len(text)}]}
         else:
             raise ValueError(f"Unsupported file type: {file_extension}")
 
     def _extract_from_pdf(self, file_obj):
-        """Extract text from PDF files with OCR fallback.
+        """Extract text from PDF files, running OCR at most once per page.
+
+        The text layer of every page is probed first, then the ExtractionPlanner
+        decides once between keeping the text layer, OCR'ing only the pages
+        without usable text, or OCR'ing the whole document.
 
         Args:
             file_obj (file-like object): The PDF file object to extract text from.
         
         Returns:
-            str: The extracted text.
+            dict: The extracted 'text', the planner 'strategy', the per-page
+                'pages' report and the 'timings' of the probe and OCR in milliseconds.
         
         Raises:
             Exception: If an error occurs during text extraction.
         """
-        with self._temp_file(file_obj, '.pdf') as temp_path:
-            try:
-                # Try normal PDF text extraction first
-                doc = None
-                try:
-                    doc = fitz.open(temp_path)
-                    text = ""
-                    for page in doc:
-                        text += page.get_text() + "\n"
-                finally:
-                    if doc:
-                        doc.close()
-
-                # If extracted text is too short or empty, fall back to OCR
-                if not text or len(text.strip()) < 100:
-                    text = self.ocr_processor.process_pdf_with_ocr(temp_path)
-
-                return text.strip()
-            except Exception as e:
-                raise Exception(f"Error extracting text from PDF: {str(e)}")
+        doc = None
+        try:
+            started = time.perf_counter()
+
+            # Open the upload from memory; PyMuPDF and OCR share the same document
+            doc = fitz.open(stream=self._read_bytes(file_obj), filetype='pdf')
+            page_texts = [page.get_text().strip() for page in doc]
+            probe_ms = (time.perf_counter() - started) * 1000
+
+            plan = self.planner.plan(page_texts)
+            ocr_started = time.perf_counter()
+            ocr_texts = self.ocr_processor.process_pdf_pages(doc, plan['ocr_pages']) if plan['ocr_pages'] else {}
+            ocr_ms = (time.perf_counter() - ocr_started) * 1000
+
+            pages = []
+            for index, page_text in enumerate(page_texts):
+                method = 'text_layer'
+                if index in ocr_texts:
+                    method = 'ocr'
+                    page_text = ocr_texts[index]
+                page_texts[index] = page_text
+                pages.append({'page': index + 1, 'method': method, 'chars': len(page_text)})
+
+            # Pages are separated by form feeds so TextNormalizer can spot headers and footers
+            text = PAGE_BREAK.join(page_text for page_text in page_texts if page_text)
+            return {
+                'text': text.strip(),
+                'strategy': plan['strategy'],
+                'pages': pages,
+                'timings': {
+                    'probe_ms': round(probe_ms, 1),
+                    'ocr_ms': round(ocr_ms, 1),
+                    'total_ms': round((time.perf_counter() - started) * 1000, 1),
+                },
+            }
+        except Exception as e:
+            raise Exception(f"Error extracting text from PDF: {str(e)}")
+        finally:
+            if doc:
+                doc.close()
 
     def _extract_from_docx(self, file_obj):
         """Extract text from DOCX files.
@@ -135,8 +212,7 @@ class TextExtractor:
         Raises:
             Exception: If an error occurs during text extraction.
         """
-        with self._temp_file(file_obj, '.png') as temp_path:
-            try:
-                return self.ocr_processor.process_image(temp_path)
-            except Exception as e:
-                raise Exception(f"Error extracting text from image: {str(e)}")
\ No newline at end of file
+        try:
+            return self.ocr_processor.process_image(self._read_bytes(file_obj))
+        except Exception as e:
+            raise Exception(f"Error extracting text from image: {str(e)}")
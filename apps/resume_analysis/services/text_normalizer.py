@@ -0,0 +1,119 @@
+import re
+import unicodedata
+from collections import Counter
+
+from .resume_chunker import get_token_counter
+
+# Separates the pages of extracted PDF text (see TextExtractor)
+PAGE_BREAK = '\f'
+
+# Lines at the top and bottom of each page checked for repeated headers and footers
+FURNITURE_LINES = 3
+
+INVISIBLE_CHARS_RE = re.compile('[\u00ad\u200b\u200c\u200d\u2060\ufeff]')
+BULLET_RE = re.compile('^[ \t]*[\u2022\u25cf\u25cb\u25e6\u25aa\u25ab\u25a0\u25a1\u25c6\u25c7\u25ba\u25b8\u25b9\u2023\u2043\u2219\u00b7\u27a2\u27a4\u2794\u2192\u2713\u2714\u2717\u2756*]+[ \t]*', re.MULTILINE)
+HYPHENATED_BREAK_RE = re.compile(r'(\w)-\n(?=[a-z])')
+SPACES_RE = re.compile('[ \t\u00a0\u2000-\u200a\u202f\u205f\u3000]+')
+BLANK_LINES_RE = re.compile(r'\n{3,}')
+PAGE_NUMBER_RE = re.compile(r'^(?:page\s*)?[-–(]?\s*\d{1,3}\s*(?:(?:/|of)\s*\d{1,3})?\s*[-–)]?$', re.IGNORECASE)
+BOILERPLATE_RE = re.compile(
+    r'^(?:curriculum vitae|resume|résumé|cv|references? (?:are )?available (?:up)?on request\.?'
+    r'|confidential|page intentionally left blank)$',
+    re.IGNORECASE
+)
+
+
+def _line_key(line):
+    """Key used to recognise the same header or footer on different pages (page numbers ignored)."""
+    return re.sub(r'\d+', '#', line.strip().lower())
+
+
+class TextNormalizer:
+    """Turns extracted resume text into a compact canonical text.
+
+    Headers and footers repeated on most pages (after their first
+    occurrence), page numbers and boilerplate
+    lines are removed, bullet glyphs become "- ", words hyphenated across
+    lines are joined, and whitespace is collapsed (single spaces, at most one
+    blank line between paragraphs). The compact text is what the LLM, the
+    embeddings and any lexical index work on; raw_text is kept as extracted.
+
+    Attributes:
+        count_tokens (callable): Returns the number of tokens of a text.
+    """
+
+    def __init__(self, count_tokens=None):
+        """Initialize the normaliser with the LLM token counter unless one is given."""
+        self.count_tokens = count_tokens or get_token_counter()
+
+    def _page_furniture(self, pages):
+        """Return the keys of the lines repeated at the top or bottom of most pages."""
+        if len(pages) < 2:
+            return set()
+        counts = Counter()
+        for lines in pages:
+            content = [line for line in lines if line.strip()]
+            edges = content[:FURNITURE_LINES] + content[-FURNITURE_LINES:]
+            counts.update({_line_key(line) for line in edges})
+        threshold = max(2, (len(pages) * 3 + 4) // 5)  # at least 60% of the pages
+        return {key for key, count in counts.items() if key and count >= threshold}
+
+    def _clean_page(self, lines, furniture, seen):
+        """Drop furniture, page numbers and boilerplate lines from the edges of a page.
+
+        The first occurrence of each furniture line is kept, since a header
+        repeated on every page often holds the name and contact details.
+        """
+        content_indexes = [index for index, line in enumerate(lines) if line.strip()]
+        edges = set(content_indexes[:FURNITURE_LINES] + content_indexes[-FURNITURE_LINES:])
+        kept = []
+        for index, line in enumerate(lines):
+            stripped = line.strip()
+            key = _line_key(line)
+            if index in edges and PAGE_NUMBER_RE.match(stripped):
+                continue
+            if index in edges and key in furniture:
+                if key in seen:
+                    continue
+                seen.add(key)
+            if BOILERPLATE_RE.match(stripped):
+                continue
+            kept.append(line)
+        return kept
+
+    def normalize(self, text):
+        """Normalise extracted resume text.
+
+        Args:
+            text (str): The extracted text, pages separated by form feeds.
+
+        Returns:
+            dict: The compact 'text' and the 'stats' with the token counts of
+                the raw and compact text and the tokens saved.
+        """
+        text = text or ''
+        compact = unicodedata.normalize('NFKC', text)
+        compact = INVISIBLE_CHARS_RE.sub('', compact).replace('\r\n', '\n').replace('\r', '\n')
+        compact = SPACES_RE.sub(' ', compact)
+
+        pages = [page.split('\n') for page in compact.split(PAGE_BREAK)]
+        furniture = self._page_furniture(pages)
+        seen = set()
+        compact = '\n\n'.join('\n'.join(self._clean_page(lines, furniture, seen)) for lines in pages)
+
+        compact = '\n'.join(line.strip() for line in compact.split('\n'))
+        compact = BULLET_RE.sub('- ', compact)
+        compact = HYPHENATED_BREAK_RE.sub(r'\1', compact)
+        compact = BLANK_LINES_RE.sub('\n\n', compact).strip()
+
+        raw_tokens = self.count_tokens(text)
+        compact_tokens = self.count_tokens(compact)
+        return {
+            'text': compact,
+            'stats': {
+                'raw_tokens': raw_tokens,
+                'compact_tokens': compact_tokens,
+                'saved_tokens': raw_tokens - compact_tokens,
+                'furniture_lines': len(furniture),
+            },
+        }
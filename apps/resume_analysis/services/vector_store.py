@@ -0,0 +1,504 @@
+import fcntl
+import glob
+import json
+import logging
+import os
+import threading
+from contextlib import contextmanager
+import numpy as np
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE = 'index.json'
+LOCK_FILE = 'index.lock'
+
+# Compact the local store when more than this share of its rows are deleted
+MAX_DELETED_SHARE = 0.25
+
+_COMPARISONS = {
+    '$gt': lambda value, target: value > target,
+    '$gte': lambda value, target: value >= target,
+    '$lt': lambda value, target: value < target,
+    '$lte': lambda value, target: value <= target,
+}
+
+
+def _as_list(value):
+    return value if isinstance(value, list) else [value]
+
+
+def _matches_condition(value, operator, target):
+    """Evaluate one filter operator on a metadata value (list values match on any element)."""
+    if operator == '$exists':
+        return (value is not None) == bool(target)
+    if value is None:
+        return operator in ('$ne', '$nin')
+    if operator == '$eq':
+        return target in _as_list(value)
+    if operator == '$ne':
+        return target not in _as_list(value)
+    if operator == '$in':
+        return any(item in target for item in _as_list(value))
+    if operator == '$nin':
+        return not any(item in target for item in _as_list(value))
+    if operator in _COMPARISONS:
+        try:
+            return _COMPARISONS[operator](value, target)
+        except TypeError:
+            return False
+    raise ValueError(f"Unsupported filter operator: {operator}")
+
+
+def matches_filter(metadata, filter):
+    """Return True if vector metadata satisfies a Pinecone metadata filter.
+
+    Supports field equality shorthand, $eq, $ne, $gt, $gte, $lt, $lte, $in,
+    $nin and $exists on fields, and $and / $or over sub-filters.
+
+    Args:
+        metadata (dict): The metadata of the vector.
+        filter (dict): The filter, e.g. {"section_type": "full_text"}.
+
+    Returns:
+        bool: True if the vector matches.
+    """
+    if not filter:
+        return True
+    metadata = metadata or {}
+    for key, condition in filter.items():
+        if key == '$and':
+            if not all(matches_filter(metadata, sub_filter) for sub_filter in condition):
+                return False
+        elif key == '$or':
+            if not any(matches_filter(metadata, sub_filter) for sub_filter in condition):
+                return False
+        elif isinstance(condition, dict):
+            if not all(_matches_condition(metadata.get(key), op, target) for op, target in condition.items()):
+                return False
+        elif not _matches_condition(metadata.get(key), '$eq', condition):
+            return False
+    return True
+
+
+class VectorMatch:
+    """A query result, readable as attributes (match.score) or keys (match['score']) like Pinecone's."""
+
+    def __init__(self, id, score, metadata=None, values=None):
+        self.id = id
+        self.score = score
+        self.metadata = metadata or {}
+        self.values = values or []
+
+    def __getitem__(self, key):
+        return getattr(self, key)
+
+    def __repr__(self):
+        return f"VectorMatch(id={self.id!r}, score={self.score:.4f})"
+
+
+class VectorStore:
+    """Interface of the vector index behind PineconeService.
+
+    Mirrors the subset of the Pinecone Index API the services use, so the
+    Pinecone index and the local store are interchangeable.
+    """
+
+    def upsert(self, vectors):
+        """Insert or replace vectors.
+
+        Args:
+            vectors (list): (id, values, metadata) tuples or dicts with those keys.
+
+        Returns:
+            dict: 'upserted_count'.
+        """
+        raise NotImplementedError
+
+    def query(self, vector, top_k=10, include_metadata=True, include_values=False, filter=None):
+        """Return the vectors most similar to a query vector.
+
+        Args:
+            vector (list): The query vector.
+            top_k (int): The number of matches to return.
+            include_metadata (bool): Return the metadata of each match.
+            include_values (bool): Return the values of each match.
+            filter (dict, optional): A metadata filter (see matches_filter).
+
+        Returns:
+            dict: 'matches', best first.
+        """
+        raise NotImplementedError
+
+    def delete(self, ids=None, delete_all=False, filter=None):
+        """Delete vectors by id, by metadata filter, or all of them."""
+        raise NotImplementedError
+
+
+class PineconeVectorStore(VectorStore):
+    """The hosted Pinecone index named by settings.PINECONE_INDEX."""
+
+    def __init__(self, api_key=None, index_name=None):
+        """Connect to the existing Pinecone index."""
+        from pinecone import Pinecone
+
+        self.index_name = index_name or settings.PINECONE_INDEX
+        self.pc = Pinecone(api_key=api_key or settings.PINECONE_API_KEY)
+        self.index = self.pc.Index(self.index_name)
+        logger.info(f"Connected to existing Pinecone index: {self.index_name}")
+
+    def upsert(self, vectors):
+        return self.index.upsert(vectors=vectors)
+
+    def query(self, vector, top_k=10, include_metadata=True, include_values=False, filter=None):
+        return self.index.query(
+            vector=vector, top_k=top_k, include_metadata=include_metadata,
+            include_values=include_values, filter=filter
+        )
+
+    def delete(self, ids=None, delete_all=False, filter=None):
+        if delete_all:
+            return self.index.delete(delete_all=True)
+        if filter:
+            return self.index.delete(filter=filter)
+        return self.index.delete(ids=ids)
+
+
+class LocalVectorStore(VectorStore):
+    """In-process cosine vector index persisted to memory-mapped files.
+
+    Vectors are stored normalised in a .npy file that readers open with
+    mmap, next to a JSON manifest holding the ids and metadata. Each write
+    takes a file lock, applies the change to the latest data on disk and
+    writes a new generation of files, so Celery workers and web processes
+    can share one directory; readers pick up a new generation on their next
+    query, loading it under a shared lock so a writer cannot delete its
+    files mid-load. Small stores are searched by brute force (one
+    matrix-vector product); from hnsw_threshold live vectors on, an HNSW
+    graph (hnswlib) answers queries when the library is installed.
+
+    Every upsert or delete call costs O(N) in the size of the store: the
+    whole .npy file, the JSON manifest with all metadata and the HNSW graph
+    are rewritten, and writes are serialised by the lock. Send vectors in
+    large batches (settings.PINECONE_UPSERT_BATCH_SIZE) rather than one
+    call per vector.
+
+    Attributes:
+        path (str): The directory of the store.
+        hnsw_threshold (int): Live vectors from which the HNSW graph is used.
+    """
+
+    def __init__(self, path=None, hnsw_threshold=None, hnsw_m=None, hnsw_ef_construction=None, hnsw_ef_search=None):
+        """Open (or create) the store in a directory, with settings as defaults."""
+        self.path = str(path or settings.LOCAL_VECTOR_STORE_DIR)
+        self.hnsw_threshold = hnsw_threshold if hnsw_threshold is not None else getattr(
+            settings, 'LOCAL_VECTOR_STORE_HNSW_THRESHOLD', 20000)
+        self.hnsw_m = hnsw_m or getattr(settings, 'LOCAL_VECTOR_STORE_HNSW_M', 16)
+        self.hnsw_ef_construction = hnsw_ef_construction or getattr(
+            settings, 'LOCAL_VECTOR_STORE_HNSW_EF_CONSTRUCTION', 200)
+        self.hnsw_ef_search = hnsw_ef_search or getattr(settings, 'LOCAL_VECTOR_STORE_HNSW_EF_SEARCH', 64)
+        os.makedirs(self.path, exist_ok=True)
+
+        self._lock = threading.RLock()
+        self._manifest_signature_seen = None
+        self._reset()
+        self._refresh()
+
+    def _reset(self):
+        self.generation = 0
+        self.dimension = None
+        self._ids = []  # row -> id, None for deleted rows
+        self._metadata = []
+        self._rows = {}  # id -> row
+        self._vectors = np.zeros((0, 0), dtype=np.float32)
+        self._hnsw = None
+
+    def _file(self, name):
+        return os.path.join(self.path, name)
+
+    @contextmanager
+    def _write_lock(self):
+        """Hold the thread lock and the cross-process file lock of the store."""
+        with self._lock, open(self._file(LOCK_FILE), 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                self._load()
+                yield
+            except Exception:
+                self._reset()  # drop the half-applied change and reload what is on disk
+                self._manifest_signature_seen = None
+                self._load()
+                raise
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _refresh(self):
+        """Load the latest generation from disk if another process has written one.
+
+        The files are read under a shared lock on the lock file: a writer
+        holds it exclusively while it replaces the manifest and deletes the
+        files of older generations.
+        """
+        signature = self._manifest_signature()
+        if signature is None or signature == self._manifest_signature_seen:
+            return
+
+        with self._lock, open(self._file(LOCK_FILE), 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_SH)
+            try:
+                self._load()
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _load(self):
+        """Read the generation on disk if it is new; called with the file lock held."""
+        signature = self._manifest_signature()
+        if signature is None or signature == self._manifest_signature_seen:
+            return
+
+        with open(self._file(MANIFEST_FILE), encoding='utf-8') as f:
+            manifest = json.load(f)
+        self.generation = manifest['generation']
+        self.dimension = manifest['dimension']
+        self._ids = manifest['ids']
+        self._metadata = manifest['metadata']
+        self._rows = {vector_id: row for row, vector_id in enumerate(self._ids) if vector_id is not None}
+        self._vectors = np.load(self._file(f"vectors-{self.generation}.npy"), mmap_mode='r')
+        self._hnsw = self._load_hnsw()
+        self._manifest_signature_seen = signature
+
+    def _manifest_signature(self):
+        """Identify the manifest on disk; every write replaces it with a new file."""
+        try:
+            stat = os.stat(self._file(MANIFEST_FILE))
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns
+
+    @property
+    def count(self):
+        """int: The number of live vectors."""
+        self._refresh()
+        return len(self._rows)
+
+    def _normalize(self, values):
+        vectors = np.asarray(values, dtype=np.float32)
+        if vectors.ndim == 1:
+            vectors = vectors[None, :]
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+
+    def upsert(self, vectors):
+        records = [
+            (v['id'], v['values'], v.get('metadata')) if isinstance(v, dict) else (v[0], v[1], v[2] if len(v) > 2 else None)
+            for v in vectors
+        ]
+        if not records:
+            return {'upserted_count': 0}
+
+        with self._write_lock():
+            values = self._normalize([values for _, values, _ in records])
+            if self.dimension is None:
+                self.dimension = values.shape[1]
+            elif values.shape[1] != self.dimension:
+                raise ValueError(f"Vector dimension {values.shape[1]} does not match the store dimension {self.dimension}")
+
+            matrix = np.array(self._vectors, dtype=np.float32).reshape(-1, self.dimension)
+            new_rows = []
+            changed = []
+            for (vector_id, _, metadata), vector in zip(records, values):
+                row = self._rows.get(vector_id)
+                if row is None:
+                    row = len(self._ids)
+                    new_rows.append(vector)
+                    self._ids.append(vector_id)
+                    self._metadata.append(metadata or {})
+                    self._rows[vector_id] = row
+                else:
+                    matrix[row] = vector
+                    self._metadata[row] = metadata or {}
+                changed.append(row)
+            if new_rows:
+                matrix = np.vstack([matrix, np.asarray(new_rows, dtype=np.float32)])
+
+            self._save(matrix, changed=changed)
+        return {'upserted_count': len(records)}
+
+    def delete(self, ids=None, delete_all=False, filter=None):
+        with self._write_lock():
+            if delete_all:
+                rows = list(self._rows.values())
+            elif filter:
+                rows = [row for row in self._rows.values() if matches_filter(self._metadata[row], filter)]
+            else:
+                rows = [self._rows[vector_id] for vector_id in ids or [] if vector_id in self._rows]
+            if not rows:
+                return {}
+            for row in rows:
+                del self._rows[self._ids[row]]
+                self._ids[row] = None
+                self._metadata[row] = None
+            self._save(np.asarray(self._vectors, dtype=np.float32), deleted=rows)
+        return {}
+
+    def _save(self, matrix, changed=(), deleted=()):
+        """Write a new generation of the store; called with the write lock held."""
+        if len(self._ids) and (len(self._ids) - len(self._rows)) / len(self._ids) > MAX_DELETED_SHARE:
+            live = [row for row, vector_id in enumerate(self._ids) if vector_id is not None]
+            matrix = matrix[live]
+            self._ids = [self._ids[row] for row in live]
+            self._metadata = [self._metadata[row] for row in live]
+            self._rows = {vector_id: row for row, vector_id in enumerate(self._ids)}
+            self._hnsw = None  # rows were renumbered
+            changed, deleted = range(len(self._ids)), ()
+
+        generation = self.generation + 1
+        vectors_file = self._file(f"vectors-{generation}.npy")
+        np.save(vectors_file, matrix)
+        self._update_hnsw(matrix, changed, deleted, generation)
+
+        manifest_tmp = self._file(f"{MANIFEST_FILE}.tmp")
+        with open(manifest_tmp, 'w', encoding='utf-8') as f:
+            json.dump({
+                'generation': generation,
+                'dimension': self.dimension,
+                'ids': self._ids,
+                'metadata': self._metadata,
+            }, f)
+        os.replace(manifest_tmp, self._file(MANIFEST_FILE))
+
+        self.generation = generation
+        self._vectors = np.load(vectors_file, mmap_mode='r')
+        self._manifest_signature_seen = self._manifest_signature()
+        for old_file in glob.glob(self._file('vectors-*.npy')) + glob.glob(self._file('hnsw-*.bin')):
+            if not old_file.endswith((f"-{generation}.npy", f"-{generation}.bin")):
+                os.remove(old_file)  # open memory maps of other processes stay valid
+
+    def _hnsw_enabled(self):
+        if len(self._rows) < self.hnsw_threshold:
+            return False
+        try:
+            import hnswlib  # noqa: F401
+            return True
+        except ImportError:
+            return False
+
+    def _new_hnsw(self, capacity):
+        import hnswlib
+
+        index = hnswlib.Index(space='ip', dim=self.dimension)  # inner product of normalised vectors
+        index.init_index(max_elements=capacity, M=self.hnsw_m, ef_construction=self.hnsw_ef_construction,
+                         allow_replace_deleted=False)
+        return index
+
+    def _load_hnsw(self):
+        hnsw_file = self._file(f"hnsw-{self.generation}.bin")
+        if not os.path.exists(hnsw_file) or not self._hnsw_enabled():
+            return None
+        import hnswlib
+
+        index = hnswlib.Index(space='ip', dim=self.dimension)
+        index.load_index(hnsw_file)
+        index.set_ef(self.hnsw_ef_search)
+        return index
+
+    def _update_hnsw(self, matrix, changed, deleted, generation):
+        """Bring the HNSW graph up to date with the written rows and save it for the generation."""
+        if not self._hnsw_enabled():
+            self._hnsw = None
+            return
+
+        live_rows = [row for row, vector_id in enumerate(self._ids) if vector_id is not None]
+        if self._hnsw is None:
+            self._hnsw = self._new_hnsw(max(len(self._ids) * 2, 1024))
+            changed = live_rows
+        elif len(self._ids) > self._hnsw.get_max_elements():
+            self._hnsw.resize_index(len(self._ids) * 2)
+
+        changed = [row for row in changed if self._ids[row] is not None]
+        if changed:
+            self._hnsw.add_items(matrix[changed], np.asarray(changed))
+        for row in deleted:
+            try:
+                self._hnsw.mark_deleted(row)
+            except RuntimeError:
+                pass  # already deleted or never added
+        self._hnsw.set_ef(self.hnsw_ef_search)
+        self._hnsw.save_index(self._file(f"hnsw-{generation}.bin"))
+
+    def query(self, vector, top_k=10, include_metadata=True, include_values=False, filter=None):
+        self._refresh()
+        with self._lock:
+            if not self._rows:
+                return {'matches': []}
+            query = self._normalize(vector)[0]
+            rows, scores = self._search_hnsw(query, top_k, filter) if self._hnsw is not None else (None, None)
+            if rows is None:
+                rows, scores = self._search_brute_force(query, top_k, filter)
+
+            matches = [
+                VectorMatch(
+                    id=self._ids[row],
+                    score=float(score),
+                    metadata=self._metadata[row] if include_metadata else None,
+                    values=self._vectors[row].tolist() if include_values else None,
+                )
+                for row, score in zip(rows, scores)
+            ]
+        return {'matches': matches}
+
+    def _search_brute_force(self, query, top_k, filter):
+        """Score every live vector matching the filter and return the best rows and scores."""
+        scores = np.asarray(self._vectors @ query, dtype=np.float32)
+        valid = np.zeros(len(self._ids), dtype=bool)
+        for row in self._rows.values():
+            valid[row] = not filter or matches_filter(self._metadata[row], filter)
+        scores = np.where(valid, scores, -np.inf)
+
+        top_k = min(top_k, int(valid.sum()))
+        if top_k <= 0:
+            return [], []
+        best = np.argpartition(-scores, top_k - 1)[:top_k]
+        best = best[np.argsort(-scores[best])]
+        return best.tolist(), scores[best].tolist()
+
+    def _search_hnsw(self, query, top_k, filter):
+        """Search the HNSW graph; returns (None, None) to fall back to brute force."""
+        condition = (lambda row: matches_filter(self._metadata[row], filter)) if filter else None
+        try:
+            self._hnsw.set_ef(max(self.hnsw_ef_search, top_k))
+            labels, distances = self._hnsw.knn_query(query, k=min(top_k, len(self._rows)), filter=condition)
+        except RuntimeError:
+            return None, None  # fewer matches than top_k reachable, e.g. under a selective filter
+        return labels[0].tolist(), (1.0 - distances[0]).tolist()
+
+    def describe_index_stats(self):
+        """Return the dimension and the number of live vectors, like Pinecone."""
+        self._refresh()
+        return {'dimension': self.dimension, 'total_vector_count': len(self._rows)}
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_vector_store():
+    """Return the vector store chosen by settings.VECTOR_STORE_BACKEND.
+
+    The local store is opened once per process and directory and shared,
+    like the embedding model; a Pinecone connection is made per caller.
+
+    Returns:
+        VectorStore: The Pinecone index ('pinecone') or the local store ('local').
+    """
+    backend = getattr(settings, 'VECTOR_STORE_BACKEND', 'pinecone')
+    if backend == 'pinecone':
+        return PineconeVectorStore()
+    if backend != 'local':
+        raise ValueError(f"Unknown vector store backend: {backend}")
+
+    key = (str(settings.LOCAL_VECTOR_STORE_DIR), os.getpid())
+    with _stores_lock:
+        if key not in _stores:
+            _stores[key] = LocalVectorStore(settings.LOCAL_VECTOR_STORE_DIR)
+        return _stores[key]
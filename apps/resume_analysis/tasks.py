@@ -1,49 +1,279 @@
+import datetime
 import logging
-from celery import shared_task
+from celery import chain, shared_task
+from celery.utils import uuid
+from django.conf import settings
+from django.core.files.storage import default_storage
 from .models import Resume, ResumeContent
-from .services.document_processor import DocumentProcessor
+from .services.neo4j_service import Neo4jService
+from .services.pinecone_service import PineconeService
 from .services.text_extractor import TextExtractor
+from .services.text_normalizer import TextNormalizer
 
 logger = logging.getLogger(__name__)
 
-@shared_task
-def process_resume(resume_id):
+
+def start_resume_pipeline(resume):
+    """
+    Queue the staged ingestion pipeline for a saved resume.
+
+    The stages run as a Celery chain: text extraction, LLM feature extraction,
+    vector creation and graph write. Each stage records its progress on the
+    Resume so the web tier never waits on the ML backends.
+
+    Args:
+        resume (Resume): A resume whose file has already been saved to storage.
+
+    Returns:
+        str: The Celery id of the queued job.
+    """
+    resume_id = str(resume.file_id)
+
+    # Record the job and the queued stage before dispatching, so a fast worker's
+    # first stage update can never be overwritten by this one.
+    resume.task_id = uuid()
+    resume.save(update_fields=["task_id"])
+    resume.set_stage("queued", status="processing")
+
+    job = chain(
+        extract_resume_text.s(resume_id),
+        extract_resume_features.s(),
+        create_resume_vectors.s(),
+        write_resume_graph.s(),
+    ).apply_async(task_id=resume.task_id)
+    return job.id
+
+
+def reuse_processed_resume(resume, original):
     """
-    Process a resume by its ID.
+    Complete a re-uploaded resume from the content of an identical original.
 
-    This function retrieves a resume from the database, updates its status to 'processing',
-    extracts text from the associated document, saves the extracted content, and updates
-    the resume status to 'processed'. In case of an error, it logs the error and updates
-    the resume status to 'failed'.
+    The raw text and extracted features are copied and the vectors and graph
+    node of the original are shared, so no OCR, LLM, embedding or graph call
+    is made for the duplicate.
 
     Args:
-        resume_id (int): The ID of the resume to process.
+        resume (Resume): The newly uploaded resume.
+        original (Resume): The processed resume with the same content hash.
     """
+    source = original.resumecontent
+    ResumeContent.objects.update_or_create(
+        resume=resume,
+        defaults={
+            "raw_text": source.raw_text,
+            "compact_text": source.compact_text,
+            "structured_data": source.structured_data,
+            "extracted_features": source.extracted_features,
+            "vector_id": source.vector_id,
+            "upload_date": datetime.datetime.utcnow(),
+            "uploaded_by": resume.user.username,
+        },
+    )
+    resume.duplicate_of = original
+    resume.task_id = original.task_id
+    resume.save(update_fields=["duplicate_of", "task_id"])
+    resume.set_stage("completed", status=original.status)
+    logger.info(f"Resume {resume.file_id} is a duplicate of {original.file_id}, reusing its content")
+
+
+def promote_duplicate(original):
+    """
+    Hand the vectors and graph node of a resume about to be deleted to one of its duplicates.
+
+    The oldest duplicate becomes the new original: the remaining duplicates are
+    re-pointed to it and its own vectors and graph node are queued, reusing the
+    extracted features.
+
+    Args:
+        original (Resume): The resume that is being deleted.
+
+    Returns:
+        Resume or None: The promoted resume, if the original had duplicates.
+    """
+    successor = original.duplicates.order_by("upload_date").first()
+    if successor is None:
+        return None
+
+    original.duplicates.exclude(file_id=successor.file_id).update(duplicate_of=successor)
+    successor.duplicate_of = None
+    successor.save(update_fields=["duplicate_of"])
+
+    resume_id = str(successor.file_id)
+    successor.task_id = uuid()
+    successor.save(update_fields=["task_id"])
+    chain(create_resume_vectors.s(resume_id), write_resume_graph.s()).apply_async(task_id=successor.task_id)
+    return successor
+
+
+def _mark_failed(resume, error):
+    """Mark a resume as failed and log the error of the stage that stopped it."""
+    logger.error(f"Pipeline failed for resume {resume.file_id}: {error}")
+    resume.set_stage("failed", status="failed")
+
+
+@shared_task
+def extract_resume_text(resume_id):
+    """
+    Extract the raw text of a resume and store it as ResumeContent.
+
+    Args:
+        resume_id (str): The file_id of the resume to process.
+
+    Returns:
+        str: The resume id, passed on to the next stage.
+    """
+    resume = Resume.objects.get(file_id=resume_id)
+    resume.set_stage("extracting_text")
+
     try:
-        resume = Resume.objects.get(id=resume_id)
-        resume.status = 'processing'
-        resume.save()
+        with default_storage.open(resume.file_path, "rb") as file_obj:
+            extraction = TextExtractor().extract_with_details(
+                file_obj, resume.original_filename, file_hash=resume.content_hash or None
+            )
+        extracted_text = extraction.pop("text")
+        ocr_pages = [page["page"] for page in extraction["pages"] if page["method"] == "ocr"]
+        logger.info(
+            f"Extracted {len(extracted_text)} characters from {len(extraction['pages'])} page(s) "
+            f"of resume {resume_id} ({extraction['strategy']}, OCR on pages {ocr_pages or 'none'}, "
+            f"timings {extraction.get('timings', {})}, cached {extraction.get('cached', False)})"
+        )
+
+        if not extracted_text or len(extracted_text.strip()) < settings.MIN_EXTRACTED_TEXT_LENGTH:
+            raise ValueError("Could not extract sufficient text from the document")
 
-        # Get document from MongoDB
-        doc_processor = DocumentProcessor()
-        raw_content = doc_processor.get_document(resume.file_id)
+        normalized = TextNormalizer().normalize(extracted_text)
+        logger.info(
+            f"Normalised text of resume {resume_id}: {normalized['stats']['raw_tokens']} -> "
+            f"{normalized['stats']['compact_tokens']} tokens"
+        )
 
-        # Extract text based on file type
-        text_extractor = TextExtractor()
-        extracted_text = text_extractor.extract(raw_content, resume.original_filename)
+        ResumeContent.objects.update_or_create(
+            resume=resume,
+            defaults={
+                "raw_text": extracted_text,
+                "compact_text": normalized["text"],
+                "structured_data": {"extraction": extraction, "normalization": normalized["stats"]},
+                "processing_error": None,
+                "upload_date": datetime.datetime.utcnow(),
+                "uploaded_by": resume.user.username,
+            },
+        )
+        return resume_id
 
-        # Save extracted content
-        ResumeContent.objects.create(
+    except Exception as e:
+        ResumeContent.objects.update_or_create(
             resume=resume,
-            raw_text=extracted_text,
-            structured_data={},  # Will be populated in analysis phase
+            defaults={
+                "raw_text": "Error processing document. Please ensure the file contains readable text.",
+                "compact_text": "",
+                "structured_data": {"error": str(e)},
+                "processing_error": str(e),
+                "upload_date": datetime.datetime.utcnow(),
+                "uploaded_by": resume.user.username,
+            },
         )
+        _mark_failed(resume, e)
+        raise
+
+
+@shared_task
+def extract_resume_features(resume_id):
+    """
+    Extract structured features from the resume text using the LLM.
+
+    Args:
+        resume_id (str): The file_id of the resume to process.
 
-        resume.status = 'processed'
-        resume.save()
+    Returns:
+        str: The resume id, passed on to the next stage.
+    """
+    resume = Resume.objects.get(file_id=resume_id)
+    resume.set_stage("extracting_features")
 
+    try:
+        logger.info(f"Processing resume {resume_id} for hybrid search")
+        resume.resumecontent.extract_features()
+        return resume_id
     except Exception as e:
-        logger.error(f"Error processing resume {resume_id}: {str(e)}")
-        resume.status = 'failed'
-        resume.save()
-        raise
\ No newline at end of file
+        _mark_failed(resume, e)
+        raise
+
+
+@shared_task
+def create_resume_vectors(resume_id):
+    """
+    Create the Pinecone vectors of a resume.
+
+    A vector failure does not stop the pipeline; the graph stage still runs
+    and the resume ends up partially processed.
+
+    Args:
+        resume_id (str): The file_id of the resume to process.
+
+    Returns:
+        str: The resume id, passed on to the next stage.
+    """
+    resume = Resume.objects.get(file_id=resume_id)
+    resume.set_stage("embedding")
+    content = resume.resumecontent
+
+    try:
+        content.vector_id = PineconeService().create_vectors_for_resume(resume_id=resume_id)
+        logger.info(f"Vectors created successfully for resume: {resume_id}")
+    except Exception as vector_error:
+        logger.error(f"Error creating vectors: {str(vector_error)}")
+        content.vector_id = None
+    content.save(update_fields=["vector_id"])
+    return resume_id
+
+
+@shared_task
+def write_resume_graph(resume_id):
+    """
+    Write the resume and its skills to Neo4j and finish the pipeline.
+
+    Args:
+        resume_id (str): The file_id of the resume to process.
+
+    Returns:
+        str: The resume id.
+    """
+    resume = Resume.objects.get(file_id=resume_id)
+    resume.set_stage("graph")
+    content = resume.resumecontent
+    extracted_data = content.extracted_features or {}
+
+    skills = []
+    for category in ("technical", "soft"):
+        for skill in (extracted_data.get("skills") or {}).get(category, []):
+            if skill and isinstance(skill, str):
+                skills.append({
+                    "name": skill.lower().strip(),
+                    "category": category,
+                    "confidence": 1.0
+                })
+
+    try:
+        resume_data = {
+            "id": resume_id,
+            "file_name": resume.original_filename,
+            "vector_id": content.vector_id,
+            "user_id": str(resume.user.id),
+            "metadata": {
+                "file_path": resume.file_path,
+                "processed_date": datetime.datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S"),
+                "status": resume.status,
+                "uploaded_by": resume.user.username
+            },
+            "skills": skills
+        }
+        Neo4jService().create_or_update_resume(resume_data)
+        logger.info(f"Resume added to graph database: {resume_id}")
+    except Exception as graph_error:
+        # Continue processing even if graph storage fails
+        logger.error(f"Error adding to graph database: {str(graph_error)}")
+
+    complete = not extracted_data.get("extraction_incomplete")
+    status = "processed" if complete and (content.vector_id or skills) else "partial"
+    resume.set_stage("completed", status=status)
+    return resume_id
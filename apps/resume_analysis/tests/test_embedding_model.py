@@ -0,0 +1,53 @@
+import importlib.util
+import os
+import unittest
+from unittest import mock
+import numpy as np
+from ..services import embedding_model
+from ..services.embedding_model import cosine_agreement, load_embedding_model, shared_onnx_threads
+
+ONNX_MODEL_DIR = os.getenv('EMBEDDING_ONNX_MODEL_DIR', '')
+ONNX_FILE = os.getenv('EMBEDDING_ONNX_FILE', 'onnx/model_qint8_avx2.onnx')
+HAS_ONNX_MODEL = (
+    importlib.util.find_spec('sentence_transformers') is not None
+    and importlib.util.find_spec('onnxruntime') is not None
+    and os.path.exists(os.path.join(ONNX_MODEL_DIR, ONNX_FILE))
+)
+
+class TestCosineAgreement(unittest.TestCase):
+    def test_rows_are_compared_pairwise(self):
+        reference = np.array([[1.0, 0.0], [0.0, 2.0]])
+        candidate = np.array([[2.0, 0.0], [1.0, 0.0]])
+        np.testing.assert_allclose(cosine_agreement(reference, candidate), [1.0, 0.0], atol=1e-6)
+
+    def test_zero_vectors_do_not_divide_by_zero(self):
+        self.assertEqual(cosine_agreement(np.zeros((1, 3)), np.ones((1, 3)))[0], 0.0)
+
+class TestSharedOnnxThreads(unittest.TestCase):
+    def test_physical_cores_are_divided_between_worker_processes(self):
+        with mock.patch.object(embedding_model, 'physical_cpu_count', return_value=8), \
+                mock.patch.object(embedding_model, 'settings', mock.Mock(CELERY_WORKER_CONCURRENCY=4)):
+            self.assertEqual(shared_onnx_threads(), 2)
+
+    def test_at_least_one_thread(self):
+        with mock.patch.object(embedding_model, 'physical_cpu_count', return_value=4), \
+                mock.patch.object(embedding_model, 'settings', mock.Mock(CELERY_WORKER_CONCURRENCY=16)):
+            self.assertEqual(shared_onnx_threads(), 1)
+
+
+@unittest.skipUnless(HAS_ONNX_MODEL, 'set EMBEDDING_ONNX_MODEL_DIR to a model written by export_onnx_embedding_model')
+class TestOnnxParity(unittest.TestCase):
+    TEXTS = [
+        "python developer",
+        "Senior data scientist with 6 years of experience in NLP, PyTorch and MLOps on AWS.",
+        "Experience\nSoftware Engineer, Acme Corp (2019-2023)\n- Built Django REST APIs\n- Led a team of four",
+    ]
+
+    def test_quantised_vectors_agree_with_pytorch(self):
+        reference = load_embedding_model('torch', name=os.getenv('EMBEDDING_MODEL')).encode(self.TEXTS)
+        candidate = load_embedding_model('onnx', onnx_dir=ONNX_MODEL_DIR, onnx_file=ONNX_FILE).encode(self.TEXTS)
+        self.assertEqual(candidate.shape, reference.shape)
+        self.assertGreater(cosine_agreement(reference, candidate).min(), 0.98)
+
+if __name__ == '__main__':
+    unittest.main()
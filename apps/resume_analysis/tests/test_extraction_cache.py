@@ -0,0 +1,63 @@
+import os
+import tempfile
+import time
+import unittest
+from ..services.extraction_cache import ExtractionCache
+
+class TestExtractionCache(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.cache = ExtractionCache(directory=self.directory, max_bytes=10 * 1024 * 1024)
+
+    def test_roundtrip_and_counters(self):
+        key = self.cache.make_key('abc', 'pdf', '3', 'easyocr-1.7')
+        before = self.cache.stats()
+        self.assertIsNone(self.cache.get(key))
+        self.cache.set(key, {'text': 'Python developer', 'strategy': 'text_layer', 'pages': []})
+        self.assertEqual(self.cache.get(key)['text'], 'Python developer')
+        after = self.cache.stats()
+        self.assertEqual(after['misses'], before['misses'] + 1)
+        self.assertEqual(after['hits'], before['hits'] + 1)
+
+    def test_versions_change_the_key(self):
+        self.assertNotEqual(
+            self.cache.make_key('abc', 'pdf', '3', 'easyocr-1.7'),
+            self.cache.make_key('abc', 'pdf', '4', 'easyocr-1.7'),
+        )
+
+    def test_least_recently_used_entry_is_evicted(self):
+        payload = {'text': os.urandom(4096).hex()}
+        self.cache.set('a' * 64, payload)
+        entry_size = os.path.getsize(self.cache._path('a' * 64))
+        self.cache.max_bytes = int(entry_size * 2.5)
+        self.cache.set('b' * 64, payload)
+        time.sleep(0.01)
+        self.cache.get('a' * 64)
+        self.cache.set('c' * 64, payload)
+        self.assertIsNotNone(self.cache.get('a' * 64))
+        self.assertIsNone(self.cache.get('b' * 64))
+
+    def test_directory_is_not_scanned_while_within_bounds(self):
+        payload = {'text': 'Python developer'}
+        self.cache.set('a' * 64, payload)
+        scans = []
+        original = self.cache._evict
+        self.cache._evict = lambda: (scans.append(1), original())
+        for key in 'bcd':
+            self.cache.set(key * 64, payload)
+        self.assertEqual(scans, [])
+
+    def test_full_cache_is_not_rescanned_on_the_next_write(self):
+        payload = {'text': os.urandom(4096).hex()}
+        self.cache.set('0' * 64, payload)
+        self.cache.max_bytes = int(os.path.getsize(self.cache._path('0' * 64)) * 10.5)
+        for i in range(1, 11):
+            self.cache.set(f"{i:064d}", payload)
+        scans = []
+        original = self.cache._evict
+        self.cache._evict = lambda: (scans.append(1), original())
+        self.cache.set('f' * 64, payload)
+        self.assertEqual(scans, [])
+
+if __name__ == '__main__':
+    unittest.main()
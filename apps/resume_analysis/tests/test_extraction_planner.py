@@ -0,0 +1,27 @@
+import unittest
+from ..services.extraction_planner import ExtractionPlanner
+
+class TestExtractionPlanner(unittest.TestCase):
+    def setUp(self):
+        self.planner = ExtractionPlanner(min_page_length=20, min_document_length=100, mode='per_page')
+        self.digital_page = "Senior Python developer with ten years of Django experience. " * 3
+
+    def test_digital_document_uses_text_layer(self):
+        plan = self.planner.plan([self.digital_page, self.digital_page])
+        self.assertEqual(plan, {'strategy': 'text_layer', 'ocr_pages': []})
+
+    def test_scanned_cover_letter_is_the_only_ocr_page(self):
+        plan = self.planner.plan(["", self.digital_page, self.digital_page])
+        self.assertEqual(plan, {'strategy': 'partial_ocr', 'ocr_pages': [0]})
+
+    def test_scanned_document_is_fully_ocred(self):
+        plan = self.planner.plan(["", "12", ""])
+        self.assertEqual(plan, {'strategy': 'full_ocr', 'ocr_pages': [0, 1, 2]})
+
+    def test_document_mode_never_ocrs_part_of_a_document(self):
+        planner = ExtractionPlanner(min_page_length=20, min_document_length=100, mode='document')
+        plan = planner.plan(["", self.digital_page])
+        self.assertEqual(plan, {'strategy': 'text_layer', 'ocr_pages': []})
+
+if __name__ == '__main__':
+    unittest.main()
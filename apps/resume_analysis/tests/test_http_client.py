@@ -0,0 +1,21 @@
+import unittest
+from ..services import http_client
+from ..services.http_client import close_http_sessions, get_http_session
+
+class TestHttpClient(unittest.TestCase):
+    def tearDown(self):
+        close_http_sessions()
+
+    def test_session_is_shared_per_api(self):
+        session = get_http_session('mistral')
+        self.assertIs(get_http_session('mistral'), session)
+        self.assertIsNot(get_http_session('other'), session)
+
+    def test_closed_sessions_are_recreated(self):
+        session = get_http_session('mistral')
+        close_http_sessions()
+        self.assertEqual(http_client._sessions, {})
+        self.assertIsNot(get_http_session('mistral'), session)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,172 @@
+import json
+import unittest
+from ..services.json_repair import repair_json, validate_features
+from ..services.llm_processor import FEATURE_SCHEMA, LLMProcessor
+
+ANSWER = {
+    "contact_info": {"name": "Jane Doe", "email": "jane@example.com", "phone": "", "location": "Tunis"},
+    "work_experience": [
+        {"company": "Acme", "title": "Engineer", "dates": "2015 - 2020", "responsibilities": ["Built APIs", "Led a team"]},
+        {"company": "Globex", "title": "Lead", "dates": "2020 - now", "responsibilities": ["Hiring"]}
+    ],
+    "skills": {"technical": ["Python", "Django"], "soft": ["Communication"]},
+    "languages": ["English"]
+}
+
+class TestRepairJson(unittest.TestCase):
+    def test_valid_json_is_untouched(self):
+        self.assertEqual(repair_json(json.dumps(ANSWER)), (ANSWER, False))
+
+    def test_every_truncation_point_is_repaired(self):
+        text = json.dumps(ANSWER)
+        for end in range(1, len(text)):
+            value, repaired = repair_json(text[:end])
+            self.assertTrue(repaired)
+            self.assertIsInstance(value, dict, text[:end])
+
+    def test_truncated_string_keeps_complete_entries(self):
+        text = json.dumps(ANSWER)
+        value, _ = repair_json(text[:text.index('Led a team') + 3])
+        self.assertEqual(value['work_experience'][0]['responsibilities'], ['Built APIs', 'Led'])
+        self.assertEqual(value['contact_info']['location'], 'Tunis')
+
+    def test_code_fences_are_stripped(self):
+        value, repaired = repair_json("```json\n" + json.dumps(ANSWER) + "\n```")
+        self.assertEqual(value, ANSWER)
+
+    def test_garbage_is_not_repaired(self):
+        self.assertEqual(repair_json("Sorry, I cannot help with that."), (None, True))
+
+    def test_fields_of_the_wrong_type_are_dropped(self):
+        features, problems = validate_features(
+            {"skills": ["Python"], "work_experience": [{"company": "Acme"}, "Globex"], "languages": []},
+            FEATURE_SCHEMA
+        )
+        self.assertEqual(features, {"work_experience": [{"company": "Acme"}], "languages": []})
+        self.assertEqual(len(problems), 2)
+
+class FakeResponse:
+    status_code = 200
+
+    def __init__(self, content, finish_reason):
+        self.body = {
+            "choices": [{"message": {"content": content}, "finish_reason": finish_reason}],
+            "usage": {"total_tokens": 1000},
+        }
+
+    def json(self):
+        return self.body
+
+class ContinuingSession:
+    """Answers a continuation request with the rest of the answer, repeating the prefix."""
+
+    def __init__(self, full_answer):
+        self.full_answer = full_answer
+        self.requests = []
+
+    def post(self, url, headers=None, json=None, timeout=None):
+        self.requests.append(json)
+        return FakeResponse(self.full_answer, "stop")
+
+class RecordingStats:
+    def __init__(self):
+        self.events = []
+
+    def record(self, event):
+        self.events.append(event)
+
+class NoLimit:
+    def __init__(self):
+        self.usage = []
+
+    def acquire(self, tokens):
+        pass
+
+    def pause(self, seconds):
+        pass
+
+    def record_usage(self, extra_tokens):
+        self.usage.append(extra_tokens)
+
+class FakeBreaker:
+    def __init__(self, open_=False):
+        self.open = open_
+
+    def allow_request(self):
+        return not self.open
+
+    def record_success(self):
+        pass
+
+    def record_failure(self):
+        pass
+
+class TestParseAnswer(unittest.TestCase):
+    def setUp(self):
+        self.full_answer = json.dumps(ANSWER)
+        self.processor = LLMProcessor.__new__(LLMProcessor)
+        self.processor.api_key = 'test-key'
+        self.processor.api_url = 'http://localhost/v1/chat/completions'
+        self.processor.session = ContinuingSession(self.full_answer)
+        self.processor.rate_limiter = NoLimit()
+        self.processor.circuit_breaker = FakeBreaker()
+        self.processor.chunker = type('Chunker', (), {'count_tokens': staticmethod(len)})()
+        self.processor.expected_output_tokens = 0
+        self.processor.output_stats = RecordingStats()
+        self.data = {"model": "m", "messages": [{"role": "user", "content": "resume"}], "response_format": {}}
+
+    def test_truncated_answer_is_continued(self):
+        self.processor.max_continuations = 1
+        truncated = self.full_answer[:100]
+        features, degraded = self.processor._parse_answer(truncated, 'length', self.data)
+        self.assertEqual(features, ANSWER)
+        self.assertFalse(degraded)
+        self.assertEqual(self.processor.output_stats.events, ['continued'])
+        last_message = self.processor.session.requests[0]['messages'][-1]
+        self.assertEqual(last_message, {"role": "assistant", "content": truncated, "prefix": True})
+
+    def test_continuation_records_token_usage(self):
+        self.processor.max_continuations = 1
+        self.processor._parse_answer(self.full_answer[:100], 'length', self.data)
+        self.assertEqual(len(self.processor.rate_limiter.usage), 1)
+
+    def test_continuation_is_not_sent_while_the_circuit_is_open(self):
+        self.processor.max_continuations = 1
+        self.processor.circuit_breaker = FakeBreaker(open_=True)
+        features, degraded = self.processor._parse_answer(self.full_answer[:150], 'length', self.data)
+        self.assertEqual(self.processor.session.requests, [])
+        self.assertEqual(features['contact_info']['name'], 'Jane Doe')
+        self.assertTrue(degraded)
+
+    def test_truncated_answer_is_repaired_without_continuations(self):
+        self.processor.max_continuations = 0
+        features, degraded = self.processor._parse_answer(self.full_answer[:150], 'length', self.data)
+        self.assertEqual(features['contact_info']['name'], 'Jane Doe')
+        self.assertTrue(degraded)
+        self.assertEqual(self.processor.session.requests, [])
+        self.assertEqual(self.processor.output_stats.events, ['repaired'])
+
+    def test_unrepairable_answer_is_an_error(self):
+        self.processor.max_continuations = 0
+        result, _ = self.processor._parse_answer("no JSON here", 'stop', self.data)
+        self.assertEqual(result['error'], 'Invalid JSON')
+        self.assertEqual(self.processor.output_stats.events, ['unrepairable'])
+
+    def test_repaired_answers_are_not_cached(self):
+        cached = {}
+        self.processor.model = 'm'
+        self.processor.max_continuations = 0
+        self.processor.response_cache = type('Cache', (), {
+            'make_key': staticmethod(lambda *parts: ':'.join(parts)),
+            'get': staticmethod(cached.get),
+            'set': staticmethod(cached.__setitem__),
+        })()
+        self.processor.session = type('Session', (), {
+            'post': lambda session, url, **kwargs: FakeResponse(self.full_answer[:150], 'length')
+        })()
+        features = self.processor._call_api("system", "resume")
+        self.assertEqual(features['contact_info']['name'], 'Jane Doe')
+        self.assertEqual(cached, {})
+
+if __name__ == '__main__':
+    unittest.main()
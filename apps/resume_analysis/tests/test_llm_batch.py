@@ -0,0 +1,52 @@
+import json
+import unittest
+from ..services.llm_batch import MistralBatchClient
+from ..services.llm_processor import LLMProcessor, empty_features
+from ..services.resume_chunker import ResumeChunker
+from ..utils.fake_batch_server import FakeBatchServer
+
+def echo_responder(body):
+    """Answer with the resume chunk as the only language, failing on chunks containing "fail"."""
+    chunk = body['messages'][1]['content'].split('\n\n', 1)[1]
+    if 'fail' in chunk:
+        raise ValueError('model error')
+    features = empty_features()
+    features['languages'] = [chunk]
+    return features
+
+class TestBatchExtraction(unittest.TestCase):
+    def setUp(self):
+        self.server = FakeBatchServer(responder=echo_responder, processing_seconds=0.2)
+        base_url = self.server.start()
+        self.processor = LLMProcessor.__new__(LLMProcessor)
+        self.processor.model = 'mistral-large-latest'
+        self.processor.local_extractor = None
+        self.processor.chunker = ResumeChunker(max_tokens=10, min_tokens=0, count_tokens=len)
+        self.processor.batch_client = MistralBatchClient('test-key', base_url=base_url)
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_submit_poll_and_fan_out(self):
+        texts = {'a': 'alpha', 'b': 'bravo12345charlie', 'c': 'fail'}
+        job, local_features = self.processor.submit_batch(texts.items())
+        self.assertEqual(local_features, {})
+
+        finished = self.processor.batch_client.wait(job['id'], poll_interval=0.05, timeout=5)
+        self.assertEqual(finished['status'], 'SUCCESS')
+        self.assertEqual(finished['total_requests'], 4)
+
+        features = self.processor.collect_batch(self.processor.batch_client.results(finished), texts)
+        self.assertEqual(features['a']['languages'], ['alpha'])
+        self.assertEqual(features['b']['languages'], ['bravo12345', 'charlie'])
+        self.assertIn('error', features['c'])
+
+    def test_request_lines_carry_document_and_chunk(self):
+        lines, _ = self.processor.build_batch_requests([('42', 'bravo12345charlie')])
+        self.assertEqual([line['custom_id'] for line in lines], ['42:0:2', '42:1:2'])
+        self.assertNotIn('model', lines[0]['body'])
+        json.dumps(lines)
+
+if __name__ == '__main__':
+    unittest.main()
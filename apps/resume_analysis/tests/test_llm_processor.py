@@ -0,0 +1,125 @@
+import re
+import threading
+import time
+import unittest
+from ..services.llm_processor import LLMProcessor, empty_features
+from ..services.resume_chunker import ResumeChunker
+
+class StubLLMProcessor(LLMProcessor):
+    """LLMProcessor with the API call replaced by a slow local stub."""
+
+    def __init__(self, max_concurrent_chunks=4):
+        self.chunker = ResumeChunker(max_tokens=8000, min_tokens=0, count_tokens=len)
+        self.local_extractor = None
+        self.max_concurrent_chunks = max_concurrent_chunks
+        self.max_attempts = 1
+        self.retry_backoff = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self._lock = threading.Lock()
+
+    def _process_chunk(self, text_chunk, chunk_idx, total_chunks, system_prompt=None):
+        with self._lock:
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        # Later chunks finish first to check that merging keeps chunk order
+        time.sleep(0.02 * (total_chunks - chunk_idx))
+        with self._lock:
+            self.in_flight -= 1
+        return {
+            'skills': {'technical': [text_chunk.strip()], 'soft': []},
+            'work_experience': [{'company': f'company-{chunk_idx}'}],
+        }
+
+class FlakyLLMProcessor(LLMProcessor):
+    """LLMProcessor whose second chunk fails once with a retryable error."""
+
+    def __init__(self):
+        self.chunker = ResumeChunker(max_tokens=8000, min_tokens=0, count_tokens=len)
+        self.local_extractor = None
+        self.max_concurrent_chunks = 4
+        self.max_attempts = 3
+        self.retry_backoff = 0
+        self.calls = []
+
+    def _process_chunk(self, text_chunk, chunk_idx, total_chunks, system_prompt=None):
+        self.calls.append(chunk_idx)
+        if chunk_idx == 1 and self.calls.count(1) == 1:
+            return {'error': 'API Error 503', 'status': 'failed', 'status_code': 503}
+        if chunk_idx == 2:
+            return {'error': 'API Error 401', 'status': 'failed', 'status_code': 401}
+        return {'languages': [f'language-{chunk_idx}']}
+
+class BulkLLMProcessor(LLMProcessor):
+    """LLMProcessor answering bulk requests locally, dropping the resumes marked "broken"."""
+
+    def __init__(self):
+        self.chunker = ResumeChunker(max_tokens=1000, min_tokens=0, count_tokens=len)
+        self.local_extractor = None
+        self.max_concurrent_chunks = 2
+        self.max_attempts = 1
+        self.retry_backoff = 0
+        self.expected_output_tokens = 0
+        self.bulk_max_tokens = 100
+        self.bulk_max_documents = 3
+        self.bulk_max_output_tokens = 1000
+        self.bulk_calls = []
+        self.single_calls = []
+
+    def _call_api(self, system_prompt, user_content, max_tokens=4000, expected_output_tokens=None):
+        documents = re.findall(r'<<<RESUME (\d+)>>>\n(.*?)\n<<<END \1>>>', user_content, re.S)
+        self.bulk_calls.append([text for _, text in documents])
+        resumes = {}
+        for number, text in documents:
+            if text != 'broken':
+                features = empty_features()
+                features['languages'] = [text]
+                resumes[number] = features
+        return {'resumes': resumes}
+
+    def _process_chunk(self, text_chunk, chunk_idx, total_chunks, system_prompt=None):
+        self.single_calls.append(text_chunk)
+        return {'languages': [text_chunk]}
+
+class TestLLMProcessor(unittest.TestCase):
+    def test_chunks_are_merged_in_chunk_order(self):
+        processor = StubLLMProcessor()
+        text = 'a' * 8000 + 'b' * 8000 + 'c' * 10
+        features = processor.extract_resume_features(text)
+        self.assertEqual(
+            [job['company'] for job in features['work_experience']],
+            ['company-0', 'company-1', 'company-2']
+        )
+        self.assertEqual(features['skills']['technical'], ['a' * 8000, 'b' * 8000, 'c' * 10])
+
+    def test_concurrency_is_capped_per_resume(self):
+        processor = StubLLMProcessor(max_concurrent_chunks=2)
+        processor.extract_resume_features('x' * 8000 * 5)
+        self.assertEqual(processor.peak_in_flight, 2)
+
+    def test_only_failed_retryable_chunks_are_retried(self):
+        processor = FlakyLLMProcessor()
+        features = processor.extract_resume_features('x' * 8000 * 3)
+        self.assertEqual(sorted(processor.calls), [0, 1, 1, 2])
+        self.assertEqual(features['languages'], ['language-0', 'language-1'])
+        self.assertEqual(features['extraction_incomplete']['failed_chunks'], 1)
+        self.assertEqual(features['extraction_incomplete']['total_chunks'], 3)
+
+    def test_complete_results_are_not_marked_incomplete(self):
+        features = StubLLMProcessor().extract_resume_features('a' * 8000 + 'b' * 10)
+        self.assertNotIn('extraction_incomplete', features)
+
+    def test_short_resumes_are_packed(self):
+        processor = BulkLLMProcessor()
+        long_text = 'x' * 2000
+        results = processor.extract_resume_features_bulk(['one', 'two', 'broken', 'four', long_text])
+        # 'four' is alone in its pack; 'broken' has no valid answer; long_text needs two chunks
+        self.assertEqual(processor.bulk_calls, [['one', 'two', 'broken']])
+        self.assertEqual(sorted(processor.single_calls), ['broken', 'four', 'x' * 1000, 'x' * 1000])
+        self.assertEqual(
+            [result['languages'] for result in results],
+            [['one'], ['two'], ['broken'], ['four'], ['x' * 1000, 'x' * 1000]]
+        )
+
+if __name__ == '__main__':
+    unittest.main()
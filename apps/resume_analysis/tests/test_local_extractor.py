@@ -0,0 +1,67 @@
+import unittest
+from ..services.llm_processor import LLMProcessor, build_system_prompt
+from ..services.local_extractor import LocalFeatureExtractor
+
+STRUCTURED_RESUME = """Jane Doe
+jane.doe@example.com | +216 98 765 432
+
+Skills
+Python, Django, PostgreSQL, Docker, React
+
+Languages
+English (fluent), French (native), Arabic
+"""
+
+class TestLocalFeatureExtractor(unittest.TestCase):
+    def setUp(self):
+        self.extractor = LocalFeatureExtractor()
+
+    def test_contact_skills_and_languages(self):
+        result = self.extractor.extract(STRUCTURED_RESUME)
+        features = result['features']
+        self.assertEqual(features['contact_info'], {
+            'name': 'Jane Doe', 'email': 'jane.doe@example.com', 'phone': '+216 98 765 432'
+        })
+        self.assertEqual(features['skills']['technical'], ['Python', 'Django', 'PostgreSQL', 'Docker', 'React'])
+        self.assertEqual(features['languages'], ['English', 'French', 'Arabic'])
+        self.assertTrue(result['complete'])
+
+    def test_unknown_skills_are_left_to_the_llm(self):
+        text = STRUCTURED_RESUME.replace("React", "Stakeholder management, Negotiation")
+        result = self.extractor.extract(text)
+        self.assertNotIn('skills.technical', result['resolved'])
+        self.assertFalse(result['complete'])
+
+    def test_experience_needs_the_llm(self):
+        text = STRUCTURED_RESUME + "\nExperience\nAcme Corp, Engineer, 2015 - 2020\n"
+        result = self.extractor.extract(text)
+        self.assertIn('contact_info.email', result['resolved'])
+        self.assertFalse(result['complete'])
+
+    def test_short_skills_need_exact_case(self):
+        self.assertEqual(self.extractor.match_skill('Go'), 'Go')
+        self.assertIsNone(self.extractor.match_skill('go'))
+        self.assertEqual(self.extractor.match_skill('node.js'), 'Node.js')
+
+    def test_prompt_leaves_out_resolved_fields(self):
+        prompt = build_system_prompt(['contact_info.email', 'skills.technical', 'languages'])
+        self.assertNotIn('"email"', prompt)
+        self.assertNotIn('"technical"', prompt)
+        self.assertNotIn('"languages"', prompt)
+        self.assertIn('"soft"', prompt)
+        self.assertIn('"work_experience"', prompt)
+
+class TestLocalExtractionSkipsLLM(unittest.TestCase):
+    def test_complete_resume_makes_no_api_call(self):
+        processor = LLMProcessor.__new__(LLMProcessor)
+        processor.max_attempts = 1
+        processor.chunker = None
+        processor.local_extractor = LocalFeatureExtractor()
+        processor._process_chunks = lambda *args: self.fail("the LLM was called")
+        features = processor.extract_resume_features(STRUCTURED_RESUME)
+        self.assertEqual(features['contact_info']['email'], 'jane.doe@example.com')
+        self.assertEqual(features['work_experience'], [])
+        self.assertEqual(features['contact_info']['location'], '')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,37 @@
+import unittest
+from ..services.model_registry import ModelRegistry
+
+class TestModelRegistry(unittest.TestCase):
+    def setUp(self):
+        self.registry = ModelRegistry()
+        self.loads = 0
+
+    def _loader(self):
+        self.loads += 1
+        return object()
+
+    def test_model_is_loaded_once(self):
+        first = self.registry.get('ocr', self._loader)
+        second = self.registry.get('ocr', self._loader)
+        self.assertIs(first, second)
+        self.assertEqual(self.loads, 1)
+
+    def test_stats_report_load_time(self):
+        self.assertFalse(self.registry.is_loaded('ocr'))
+        self.registry.get('ocr', self._loader)
+        stats = self.registry.stats()
+        self.assertIn('ocr', stats)
+        self.assertGreaterEqual(stats['ocr']['load_seconds'], 0)
+
+    def test_stats_report_call_latency(self):
+        self.registry.get('embedding', self._loader)
+        self.registry.record_call('embedding', 0.01, items=4)
+        self.registry.record_call('embedding', 0.03)
+        stats = self.registry.stats()['embedding']
+        self.assertEqual(stats['calls'], 2)
+        self.assertEqual(stats['items'], 5)
+        self.assertAlmostEqual(stats['avg_call_ms'], 20.0)
+        self.assertAlmostEqual(stats['max_call_ms'], 30.0)
+
+if __name__ == '__main__':
+    unittest.main()
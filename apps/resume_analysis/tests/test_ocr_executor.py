@@ -0,0 +1,60 @@
+import multiprocessing
+import unittest
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+from unittest import mock
+from ..services import ocr_executor
+from ..services.ocr_executor import OCRExecutor, shutdown_pool
+
+class TestOCRExecutor(unittest.TestCase):
+    def tearDown(self):
+        shutdown_pool()
+
+    def test_daemonic_processes_use_a_thread_pool(self):
+        with mock.patch.object(multiprocessing, 'current_process', return_value=mock.Mock(daemon=True)):
+            executor = OCRExecutor(max_workers=2)
+        self.assertEqual(executor.mode, 'thread')
+        self.assertTrue(executor.enabled)
+
+    def test_thread_pool_caps_torch_threads(self):
+        with mock.patch.object(ocr_executor, '_limit_torch_threads') as limit:
+            ocr_executor._get_pool(2, 'thread')
+        limit.assert_called_once_with(1)
+
+    def test_pages_are_rendered_by_the_caller_and_returned_in_order(self):
+        rendered = []
+
+        def render(page):
+            rendered.append(page)
+            return f"bitmap {page}"
+
+        with mock.patch.object(ocr_executor, '_read_page', lambda image: image.upper()):
+            pages = OCRExecutor(max_workers=3, max_in_flight=2, mode='thread').ocr_pages(
+                ['p0', 'p1', 'p2', 'p3'], [3, 0, 2], render
+            )
+        self.assertEqual(rendered, ['p3', 'p0', 'p2'])
+        self.assertEqual(list(pages), [3, 0, 2])
+        self.assertEqual(pages[2], 'BITMAP P2')
+
+    def test_pools_of_different_sizes_are_not_shared(self):
+        self.assertIsNot(ocr_executor._get_pool(2, 'thread'), ocr_executor._get_pool(3, 'thread'))
+
+    def test_broken_pool_is_replaced(self):
+        class BrokenPool:
+            def submit(self, fn, *args):
+                future = Future()
+                future.set_exception(BrokenProcessPool('worker died'))
+                return future
+
+            def shutdown(self, wait=True, cancel_futures=False):
+                pass
+
+        broken = BrokenPool()
+        ocr_executor._pools[('thread', 2)] = broken
+        with mock.patch.object(ocr_executor, '_read_page', lambda image: image):
+            pages = OCRExecutor(max_workers=2, mode='thread').ocr_pages(['p0', 'p1'], [0, 1], lambda page: page)
+        self.assertEqual(pages, {0: 'p0', 1: 'p1'})
+        self.assertIsNot(ocr_executor._pools[('thread', 2)], broken)
+
+if __name__ == '__main__':
+    unittest.main()
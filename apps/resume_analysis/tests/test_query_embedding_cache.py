@@ -0,0 +1,46 @@
+import unittest
+from django.core.cache import caches
+from ..services.query_embedding_cache import QueryEmbeddingCache, normalize_query
+
+class TestQueryEmbeddingCache(unittest.TestCase):
+    def setUp(self):
+        self.encoded = []
+
+    def _encode(self, text):
+        self.encoded.append(text)
+        return [float(len(text))]
+
+    def test_normalized_queries_share_an_entry(self):
+        cache = QueryEmbeddingCache(max_size=10, shared=False)
+        first = cache.get_or_encode('Python  Developer', self._encode)
+        second = cache.get_or_encode(' python developer ', self._encode)
+        self.assertEqual(first, second)
+        self.assertEqual(self.encoded, ['python developer'])
+        stats = cache.stats()
+        self.assertEqual((stats['local_hits'], stats['misses']), (1, 1))
+        self.assertEqual(stats['hit_rate'], 0.5)
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = QueryEmbeddingCache(max_size=2, shared=False)
+        cache.get_or_encode('python', self._encode)
+        cache.get_or_encode('java', self._encode)
+        cache.get_or_encode('python', self._encode)
+        cache.get_or_encode('golang', self._encode)
+        cache.get_or_encode('python', self._encode)
+        cache.get_or_encode('java', self._encode)
+        self.assertEqual(self.encoded, ['python', 'java', 'golang', 'java'])
+        self.assertEqual(cache.stats()['size'], 2)
+
+    def test_shared_cache_serves_other_processes(self):
+        caches['default'].clear()
+        QueryEmbeddingCache(shared=True, alias='default').get_or_encode('data scientist', self._encode)
+        other = QueryEmbeddingCache(shared=True, alias='default')
+        self.assertEqual(other.get_or_encode('Data Scientist', self._encode), [14.0])
+        self.assertEqual(len(self.encoded), 1)
+        self.assertEqual(other.stats()['shared_hits'], 1)
+
+    def test_normalize_query(self):
+        self.assertEqual(normalize_query('  Senior\tPYTHON\nDeveloper '), 'senior python developer')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+import sys
+import types
+import unittest
+from unittest import mock
+from ..services import rate_limiter
+from ..services.rate_limiter import (
+    CircuitBreaker, MistralRateLimiter, TokenBucket, get_redis_client, parse_retry_after
+)
+
+class TestTokenBucket(unittest.TestCase):
+    def setUp(self):
+        rate_limiter._local_state.clear()
+
+    def test_burst_then_wait(self):
+        bucket = TokenBucket('test:bucket', rate=10, capacity=2)
+        self.assertEqual(bucket.take(), 0.0)
+        self.assertEqual(bucket.take(), 0.0)
+        wait = bucket.take()
+        self.assertGreater(wait, 0.0)
+        self.assertLessEqual(wait, 0.1)
+
+    def test_amount_is_capped_at_capacity(self):
+        bucket = TokenBucket('test:capped', rate=1, capacity=5)
+        self.assertEqual(bucket.take(50), 0.0)
+
+class TestCircuitBreaker(unittest.TestCase):
+    def setUp(self):
+        rate_limiter._local_state.clear()
+        self.breaker = CircuitBreaker(name='test:circuit')
+        self.breaker.redis_url = None
+        self.breaker.failure_threshold = 3
+        self.breaker.window = 60
+        self.breaker.cooldown = 30
+
+    def test_opens_after_threshold(self):
+        for _ in range(2):
+            self.breaker.record_failure()
+        self.assertTrue(self.breaker.allow_request())
+        self.breaker.record_failure()
+        self.assertFalse(self.breaker.allow_request())
+
+    def test_success_resets_failures(self):
+        for _ in range(2):
+            self.breaker.record_failure()
+        self.breaker.record_success()
+        self.breaker.record_failure()
+        self.assertTrue(self.breaker.allow_request())
+
+    def test_trial_failure_reopens(self):
+        for _ in range(3):
+            self.breaker.record_failure()
+        self.breaker._state()['open_until'] = 0  # cooldown elapsed
+        self.assertTrue(self.breaker.allow_request())
+        self.breaker.record_failure()
+        self.assertFalse(self.breaker.allow_request())
+
+class TestGetRedisClient(unittest.TestCase):
+    URL = 'redis://test-host:6379/2'
+
+    def setUp(self):
+        rate_limiter._redis_clients.clear()
+        self.client = mock.Mock()
+        self.client.ping.side_effect = ConnectionError('down')
+        redis = types.SimpleNamespace(Redis=types.SimpleNamespace(from_url=lambda url, **kwargs: self.client))
+        patcher = mock.patch.dict(sys.modules, {'redis': redis})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(rate_limiter._redis_clients.clear)
+
+    def test_unavailable_redis_is_retried_after_the_backoff(self):
+        self.assertIsNone(get_redis_client(self.URL))
+        self.client.ping.side_effect = None
+        self.assertIsNone(get_redis_client(self.URL))
+        self.assertEqual(self.client.ping.call_count, 1)
+
+        with mock.patch.object(rate_limiter.time, 'monotonic', return_value=10 ** 9):
+            self.assertIs(get_redis_client(self.URL), self.client)
+        self.assertIs(get_redis_client(self.URL), self.client)
+        self.assertEqual(self.client.ping.call_count, 2)
+
+    def test_redis_lost_after_start_up_is_skipped_until_the_retry(self):
+        rate_limiter._local_state.clear()
+        self.client.ping.side_effect = None
+        self.client.get.side_effect = ConnectionError('down')
+        self.client.eval.side_effect = ConnectionError('down')
+        limits = mock.Mock(
+            LLM_RATE_LIMIT_URL=self.URL, LLM_REQUESTS_PER_SECOND=100,
+            LLM_TOKENS_PER_MINUTE=10 ** 6, LLM_RATE_LIMIT_MAX_WAIT=1
+        )
+        with mock.patch.object(rate_limiter, 'settings', limits):
+            limiter = MistralRateLimiter()
+        limiter.acquire(10)
+        self.assertEqual(self.client.get.call_count, 1)
+
+        self.client.reset_mock()
+        limiter.acquire(10)
+        self.assertEqual(self.client.method_calls, [])
+
+class TestParseRetryAfter(unittest.TestCase):
+    def test_seconds_and_invalid(self):
+        self.assertEqual(parse_retry_after('2.5'), 2.5)
+        self.assertIsNone(parse_retry_after(None))
+        self.assertIsNone(parse_retry_after('soon'))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import unittest
+from unittest import mock
+from ..services import resume_chunker
+from ..services.resume_chunker import ResumeChunker, get_token_counter, split_sections
+
+def make_resume():
+    jobs = "\n\n".join(
+        f"Company {i}\nSoftware Engineer, 2015 - 2020\n" + "Built data pipelines and services. " * 20
+        for i in range(6)
+    )
+    return (
+        "Jane Doe\njane@example.com\n\n"
+        f"EXPERIENCE\n{jobs}\n\n"
+        "Education\nBSc Computer Science, 2014\n\n"
+        "Skills:\nPython, Django, SQL\n"
+    )
+
+class TestResumeChunker(unittest.TestCase):
+    def test_short_text_is_one_chunk(self):
+        chunker = ResumeChunker(max_tokens=100, min_tokens=10, count_tokens=len)
+        self.assertEqual(chunker.chunk("Skills\nPython"), ["Skills\nPython"])
+
+    def test_sections_are_detected(self):
+        headings = [heading for heading, _ in split_sections(make_resume())]
+        self.assertEqual(headings, ['', 'EXPERIENCE', 'Education', 'Skills:'])
+
+    def test_chunks_respect_budget_and_keep_jobs_whole(self):
+        chunker = ResumeChunker(max_tokens=2000, min_tokens=300, count_tokens=len)
+        text = make_resume()
+        chunks = chunker.chunk(text)
+        self.assertGreater(len(chunks), 1)
+        for chunk in chunks:
+            self.assertLessEqual(len(chunk), 2000 + 300)
+            self.assertGreaterEqual(len(chunk), 300)
+        for i in range(6):
+            self.assertEqual(sum(f"Company {i}\n" in chunk for chunk in chunks), 1)
+            self.assertTrue(any(
+                f"Company {i}\nSoftware Engineer, 2015 - 2020\n" + "Built data pipelines and services. " * 20 in chunk
+                for chunk in chunks
+            ))
+        self.assertTrue(any(chunk.startswith("EXPERIENCE (continued)") for chunk in chunks))
+
+    def test_small_trailing_chunk_is_merged(self):
+        chunker = ResumeChunker(max_tokens=100, min_tokens=20, count_tokens=len)
+        chunks = chunker.chunk("x" * 95 + "\n\n" + "y" * 5)
+        self.assertEqual(len(chunks), 1)
+
+    def test_unbroken_text_is_cut_to_budget(self):
+        chunker = ResumeChunker(max_tokens=100, min_tokens=0, count_tokens=len)
+        self.assertEqual([len(chunk) for chunk in chunker.chunk("z" * 250)], [100, 100, 50])
+
+class TestGetTokenCounter(unittest.TestCase):
+    def tearDown(self):
+        resume_chunker._unavailable_tokenizers.clear()
+
+    def test_unavailable_tokenizer_falls_back_to_the_estimate_once(self):
+        registry = mock.Mock()
+        registry.get.side_effect = OSError('offline')
+        with mock.patch.object(resume_chunker, 'settings', mock.Mock(LLM_TOKENIZER='org/tokenizer')), \
+                mock.patch.object(resume_chunker, 'model_registry', registry):
+            first, second = get_token_counter(), get_token_counter()
+        self.assertIs(first, resume_chunker._estimate_token_count)
+        self.assertIs(second, resume_chunker._estimate_token_count)
+        self.assertEqual(registry.get.call_count, 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,35 @@
+import unittest
+from ..services.text_normalizer import PAGE_BREAK, TextNormalizer
+
+PAGE = """Jane Doe - Software Engineer
+Experience
+•   Built   data pipelines in Python,
+    improving through-
+put by 40%
+▪ Led a team of four
+
+
+Page {number} of 3"""
+
+class TestTextNormalizer(unittest.TestCase):
+    def setUp(self):
+        self.normalizer = TextNormalizer(count_tokens=len)
+
+    def test_page_furniture_is_removed_after_first_page(self):
+        text = PAGE_BREAK.join(PAGE.format(number=number) for number in (1, 2, 3))
+        result = self.normalizer.normalize(text)
+        self.assertEqual(result['text'].count('Jane Doe - Software Engineer'), 1)
+        self.assertNotIn('Page 2 of 3', result['text'])
+        self.assertGreater(result['stats']['saved_tokens'], 0)
+
+    def test_bullets_whitespace_and_hyphenation(self):
+        result = self.normalizer.normalize(PAGE.format(number=1))
+        self.assertIn("- Built data pipelines in Python,\nimproving throughput by 40%\n- Led a team of four", result['text'])
+        self.assertNotIn('\n\n\n', result['text'])
+
+    def test_boilerplate_and_invisible_characters(self):
+        result = self.normalizer.normalize("CURRICULUM VITAE\nJane Doe​\nReferences available upon request")
+        self.assertEqual(result['text'], "Jane Doe")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,135 @@
+import importlib.util
+import shutil
+import tempfile
+import threading
+import unittest
+import numpy as np
+from ..services.vector_store import LocalVectorStore, matches_filter
+
+HAS_HNSWLIB = importlib.util.find_spec('hnswlib') is not None
+
+class TestMatchesFilter(unittest.TestCase):
+    def test_pinecone_filter_semantics(self):
+        metadata = {'section_type': 'skills', 'skills': ['python', 'django'], 'years': 5}
+        self.assertTrue(matches_filter(metadata, {'section_type': 'skills'}))
+        self.assertTrue(matches_filter(metadata, {'skills': {'$in': ['java', 'python']}}))
+        self.assertFalse(matches_filter(metadata, {'skills': {'$nin': ['python']}}))
+        self.assertTrue(matches_filter(metadata, {'years': {'$gte': 3, '$lt': 10}}))
+        self.assertTrue(matches_filter(metadata, {'$or': [{'section_type': 'full_text'}, {'years': 5}]}))
+        self.assertFalse(matches_filter(metadata, {'$and': [{'section_type': 'skills'}, {'missing': {'$exists': True}}]}))
+
+
+class TestLocalVectorStore(unittest.TestCase):
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.rng = np.random.default_rng(0)
+
+    def tearDown(self):
+        shutil.rmtree(self.path, ignore_errors=True)
+
+    def _store(self, **kwargs):
+        return LocalVectorStore(self.path, hnsw_threshold=kwargs.pop('hnsw_threshold', 10 ** 9), **kwargs)
+
+    def _vectors(self, count, dimension=16):
+        return self.rng.normal(size=(count, dimension)).astype(np.float32)
+
+    def test_query_returns_nearest_vectors_with_filter(self):
+        store = self._store()
+        vectors = self._vectors(20)
+        store.upsert([
+            (f"r{i}-full_text", vectors[i].tolist(), {'section_type': 'full_text' if i % 2 == 0 else 'skills'})
+            for i in range(20)
+        ])
+        result = store.query(vector=vectors[4].tolist(), top_k=3, include_metadata=True)
+        self.assertEqual(result['matches'][0].id, 'r4-full_text')
+        self.assertAlmostEqual(result['matches'][0].score, 1.0, places=5)
+
+        filtered = store.query(vector=vectors[4].tolist(), top_k=50, filter={'section_type': 'skills'})
+        self.assertEqual(len(filtered['matches']), 10)
+        self.assertTrue(all(match.metadata['section_type'] == 'skills' for match in filtered['matches']))
+        scores = [match.score for match in filtered['matches']]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+
+    def test_upsert_replaces_and_delete_removes(self):
+        store = self._store()
+        vectors = self._vectors(3)
+        store.upsert([('a', vectors[0].tolist(), {'v': 1}), ('b', vectors[1].tolist(), {'v': 1})])
+        store.upsert([{'id': 'a', 'values': vectors[2].tolist(), 'metadata': {'v': 2}}])
+        self.assertEqual(store.count, 2)
+        match = store.query(vector=vectors[2].tolist(), top_k=1)['matches'][0]
+        self.assertEqual((match.id, match.metadata), ('a', {'v': 2}))
+
+        store.delete(ids=['a'])
+        self.assertEqual([m.id for m in store.query(vector=vectors[2].tolist(), top_k=5)['matches']], ['b'])
+        store.delete(filter={'v': 1})
+        self.assertEqual(store.query(vector=vectors[2].tolist(), top_k=5)['matches'], [])
+
+    def test_store_is_persisted_and_shared_between_instances(self):
+        writer, reader = self._store(), self._store()
+        vectors = self._vectors(5)
+        writer.upsert([(f"id{i}", vectors[i].tolist(), {}) for i in range(5)])
+        self.assertEqual(reader.query(vector=vectors[3].tolist(), top_k=1)['matches'][0].id, 'id3')
+        self.assertIsInstance(reader._vectors, np.memmap)
+
+        reader.delete(ids=['id3'])
+        self.assertNotIn('id3', [m.id for m in writer.query(vector=vectors[3].tolist(), top_k=5)['matches']])
+        self.assertEqual(self._store().count, 4)
+
+    def test_queries_run_while_another_instance_writes(self):
+        writer, reader = self._store(), self._store()
+        vectors = self._vectors(201)
+        writer.upsert([('anchor', vectors[0].tolist(), {})])
+        done = threading.Event()
+        errors = []
+
+        def write():
+            try:
+                for i in range(1, 201):
+                    writer.upsert([(f"id{i}", vectors[i].tolist(), {})])
+                    if i % 3 == 0:
+                        writer.delete(ids=[f"id{i - 1}"])
+            except Exception as e:
+                errors.append(e)
+            finally:
+                done.set()
+
+        thread = threading.Thread(target=write)
+        thread.start()
+        queries = 0
+        while not done.is_set() or queries == 0:
+            matches = reader.query(vector=vectors[0].tolist(), top_k=1)['matches']
+            self.assertEqual(matches[0].id, 'anchor')
+            queries += 1
+        thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(reader.count, writer.count)
+
+    def test_dimension_mismatch_is_rejected(self):
+        store = self._store()
+        store.upsert([('a', [1.0, 0.0], {})])
+        with self.assertRaises(ValueError):
+            store.upsert([('b', [1.0, 0.0, 0.0], {})])
+        self.assertEqual(store.count, 1)
+
+    @unittest.skipUnless(HAS_HNSWLIB, 'hnswlib is not installed')
+    def test_hnsw_search_matches_brute_force(self):
+        vectors = self._vectors(300, dimension=32)
+        store = self._store(hnsw_threshold=100, hnsw_ef_search=200)
+        store.upsert([(f"id{i}", vectors[i].tolist(), {'even': i % 2 == 0}) for i in range(300)])
+        self.assertIsNotNone(store._hnsw)
+
+        query = vectors[7].tolist()
+        hnsw_ids = [m.id for m in store.query(vector=query, top_k=5)['matches']]
+        rows, _ = store._search_brute_force(store._normalize(query)[0], 5, None)
+        self.assertEqual(hnsw_ids, [f"id{row}" for row in rows])
+
+        store.delete(ids=['id7'])
+        reopened = self._store(hnsw_threshold=100)
+        self.assertIsNotNone(reopened._hnsw)
+        ids = [m.id for m in reopened.query(vector=query, top_k=5, filter={'even': False})['matches']]
+        self.assertNotIn('id7', ids)
+        self.assertTrue(all(int(vector_id[2:]) % 2 == 1 for vector_id in ids))
+
+if __name__ == '__main__':
+    unittest.main()
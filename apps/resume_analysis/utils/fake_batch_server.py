@@ -0,0 +1,182 @@
+import json
+import re
+import threading
+import time
+import uuid
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def empty_answer(body):
+    """Default responder: the feature structure with every field empty."""
+    from ..services.llm_processor import empty_features
+    return empty_features()
+
+
+class FakeBatchHandler(BaseHTTPRequestHandler):
+    """Serves the subset of the Mistral files and batch jobs API used by MistralBatchClient."""
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_body(self):
+        return self.rfile.read(int(self.headers.get('Content-Length', 0)))
+
+    def do_POST(self):
+        if self.path == '/v1/files':
+            content_type = self.headers.get('Content-Type', '')
+            message = BytesParser(policy=HTTP).parsebytes(
+                f"Content-Type: {content_type}\r\n\r\n".encode('utf-8') + self._read_body()
+            )
+            content = b''
+            for part in message.iter_parts():
+                if part.get_param('name', header='content-disposition') == 'file':
+                    content = part.get_payload(decode=True)
+            self._send_json(200, self.server.add_file(content))
+        elif self.path == '/v1/batch/jobs':
+            self._send_json(200, self.server.create_job(json.loads(self._read_body())))
+        else:
+            self._send_json(404, {"message": f"Unknown path {self.path}"})
+
+    def do_GET(self):
+        file_match = re.fullmatch(r'/v1/files/([\w-]+)/content', self.path)
+        job_match = re.fullmatch(r'/v1/batch/jobs/([\w-]+)', self.path)
+        if file_match and file_match.group(1) in self.server.files:
+            content = self.server.files[file_match.group(1)]
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/octet-stream')
+            self.send_header('Content-Length', str(len(content)))
+            self.end_headers()
+            self.wfile.write(content)
+        elif job_match and job_match.group(1) in self.server.jobs:
+            self._send_json(200, self.server.poll_job(job_match.group(1)))
+        else:
+            self._send_json(404, {"message": f"Unknown path {self.path}"})
+
+
+class FakeBatchServer(ThreadingHTTPServer):
+    """A local stand-in for the Mistral batch API, to run batch extraction offline.
+
+    Jobs report RUNNING until processing_seconds have passed and then run
+    every request line through the responder, which gets the request body
+    and returns the JSON answer of the model. Exceptions raised by the
+    responder end up in the error file of the job.
+
+    Attributes:
+        files (dict): Uploaded and generated file contents keyed by file id.
+        jobs (dict): The batch jobs keyed by job id.
+    """
+
+    def __init__(self, address=('127.0.0.1', 0), responder=None, processing_seconds=0):
+        """Initialize the server; port 0 picks a free port."""
+        super().__init__(address, FakeBatchHandler)
+        self.responder = responder or empty_answer
+        self.processing_seconds = processing_seconds
+        self.files = {}
+        self.jobs = {}
+        self.lock = threading.Lock()
+
+    @property
+    def base_url(self):
+        """str: The API root to use as settings.LLM_BATCH_API_URL."""
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self):
+        """Serve requests from a daemon thread and return the base URL."""
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self.base_url
+
+    def add_file(self, content):
+        """Store an uploaded file and return its description."""
+        file_id = str(uuid.uuid4())
+        with self.lock:
+            self.files[file_id] = content
+        return {"id": file_id, "object": "file", "purpose": "batch", "bytes": len(content)}
+
+    def create_job(self, params):
+        """Create a queued batch job from the parameters of a POST /batch/jobs."""
+        job_id = str(uuid.uuid4())
+        job = {
+            "id": job_id,
+            "object": "batch",
+            "status": "QUEUED",
+            "input_files": params.get('input_files', []),
+            "model": params.get('model'),
+            "endpoint": params.get('endpoint'),
+            "metadata": params.get('metadata') or {},
+            "output_file": None,
+            "error_file": None,
+            "created_at": int(time.time()),
+            "_started": time.monotonic(),
+        }
+        with self.lock:
+            self.jobs[job_id] = job
+        return self._public(job)
+
+    def poll_job(self, job_id):
+        """Return a job, running it first once its processing time has passed."""
+        with self.lock:
+            job = self.jobs[job_id]
+            if job['status'] in ('QUEUED', 'RUNNING'):
+                if time.monotonic() - job['_started'] < self.processing_seconds:
+                    job['status'] = 'RUNNING'
+                else:
+                    self._run(job)
+            return self._public(job)
+
+    def _run(self, job):
+        """Answer every request line of a job and store the output and error files."""
+        outputs, errors = [], []
+        for file_id in job['input_files']:
+            for raw_line in self.files.get(file_id, b'').decode('utf-8').splitlines():
+                if not raw_line.strip():
+                    continue
+                request = json.loads(raw_line)
+                try:
+                    answer = self.responder(request['body'])
+                except Exception as e:
+                    errors.append({"id": str(uuid.uuid4()), "custom_id": request['custom_id'],
+                                   "response": None, "error": {"message": str(e)}})
+                    continue
+                outputs.append({
+                    "id": str(uuid.uuid4()),
+                    "custom_id": request['custom_id'],
+                    "response": {
+                        "status_code": 200,
+                        "body": {
+                            "object": "chat.completion",
+                            "model": job['model'],
+                            "choices": [{
+                                "index": 0,
+                                "message": {"role": "assistant", "content": json.dumps(answer)},
+                                "finish_reason": "stop"
+                            }],
+                        }
+                    },
+                    "error": None
+                })
+
+        for kind, lines in (('output_file', outputs), ('error_file', errors)):
+            if lines:
+                file_id = str(uuid.uuid4())
+                self.files[file_id] = "\n".join(json.dumps(line) for line in lines).encode('utf-8')
+                job[kind] = file_id
+        job.update({
+            "status": "SUCCESS",
+            "total_requests": len(outputs) + len(errors),
+            "succeeded_requests": len(outputs),
+            "failed_requests": len(errors),
+        })
+
+    def _public(self, job):
+        return {key: value for key, value in job.items() if not key.startswith('_')}
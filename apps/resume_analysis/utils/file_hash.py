@@ -0,0 +1,26 @@
+import hashlib
+
+
+def compute_file_hash(file_obj, chunk_size=65536):
+    """Compute the SHA-256 fingerprint of an uploaded file.
+
+    The file is read in chunks and rewound afterwards so it can still be
+    saved or extracted by the caller.
+
+    Args:
+        file_obj: A Django File or any binary file-like object.
+        chunk_size (int): The number of bytes read per step.
+
+    Returns:
+        str: The hex digest of the file contents.
+    """
+    digest = hashlib.sha256()
+    file_obj.seek(0)
+    if hasattr(file_obj, 'chunks'):
+        for chunk in file_obj.chunks(chunk_size):
+            digest.update(chunk)
+    else:
+        for chunk in iter(lambda: file_obj.read(chunk_size), b''):
+            digest.update(chunk)
+    file_obj.seek(0)
+    return digest.hexdigest()
@@ -1,4 +1,3 @@
-import datetime
 import logging
 import os
 from django.conf import settings
@@ -10,163 +9,57 @@ from django.shortcuts import get_object_or_404, render, redirect
 from django.urls import reverse
 from .models import Resume, ResumeContent
 from .services.document_processor import DocumentProcessor
+from .services.extraction_cache import ExtractionCache
 from .services.hybrid_rag_service import HybridRAGService
+from .services.model_registry import model_registry
 from .services.neo4j_service import Neo4jService
-from .services.ocr_processor import OCRProcessor
 from .services.pinecone_service import PineconeService
+from .services.query_embedding_cache import get_query_embedding_cache
 from .services.search_service import SearchService
-from .services.text_extractor import TextExtractor
+from .tasks import promote_duplicate, reuse_processed_resume, start_resume_pipeline
+from .utils.file_hash import compute_file_hash
 
 logger = logging.getLogger(__name__)
 
 def process_resume(file_obj, resume):
-    """Process the uploaded resume file.
+    """Save the uploaded resume file and queue it for processing.
+
+    Text extraction, feature extraction, vector creation and the graph write
+    run as a chain of Celery tasks (see tasks.start_resume_pipeline), so this
+    only costs the request a storage write.
+
+    A file whose SHA-256 fingerprint matches an already processed resume of
+    the same user reuses that resume's content, features and vectors instead
+    of being processed again.
 
     Args:
         file_obj: The uploaded file object.
         resume: The Resume instance associated with the uploaded file.
 
     Returns:
-        ResumeContent instance if processing is successful, None otherwise.
+        The Celery job id if the resume was queued (or the id of the job that
+        processed the original, for a duplicate), None otherwise.
     """
     try:
+        resume.content_hash = compute_file_hash(file_obj)
+
         # Save file
         file_path = os.path.join('resumes', str(resume.file_id), file_obj.name)
-        saved_path = default_storage.save(file_path, file_obj)
-        full_file_path = os.path.join(settings.MEDIA_ROOT, saved_path)
-
-        # Process document
-        text_extractor = TextExtractor()
-        
-        try:
-            extracted_text = text_extractor.extract(file_obj, file_obj.name)
-            
-            if not extracted_text or len(extracted_text.strip()) < 50:
-                logger.warning(f"Insufficient text extracted from {file_obj.name}, attempting OCR")
-                ocr_processor = OCRProcessor()
-                extracted_text = ocr_processor.process_pdf_with_ocr(full_file_path)
-
-            if not extracted_text or len(extracted_text.strip()) < 50:
-                raise ValueError("Could not extract sufficient text from the document")
-
-            # Create resume content
-            content = ResumeContent.objects.create(
-                resume=resume,
-                raw_text=extracted_text,
-                structured_data={},
-                upload_date=datetime.datetime.utcnow(),
-                uploaded_by=resume.user.username
-            )
+        resume.file_path = default_storage.save(file_path, file_obj)
+        resume.save(update_fields=['content_hash', 'file_path'])
 
-            # Extract features with retries
-            logger.info(f"Processing resume {resume.file_id} for hybrid search")
-            try:
-                # Extract features
-                extracted_data = content.extract_features()
-
-                if "error" in extracted_data:
-                    logger.warning(f"Partial feature extraction for {resume.file_id}: {extracted_data['error']}")
-                    # Continue with partial processing
-                    basic_features = {
-                        'skills': {'technical': [], 'soft': []},
-                        'work_experience': [],
-                        'education': []
-                    }
-                    extracted_data = basic_features
+        original = resume.find_processed_duplicate()
+        if original:
+            reuse_processed_resume(resume, original)
+            return resume.task_id or str(original.file_id)
 
-                # Create vectors for Pinecone
-                try:
-                    pinecone_service = PineconeService()
-                    vector_id = pinecone_service.create_vectors_for_resume(
-                        resume_id=str(resume.file_id)
-                    )
-                    logger.info(f"Vectors created successfully for resume: {resume.file_id}")
-                except Exception as vector_error:
-                    logger.error(f"Error creating vectors: {str(vector_error)}")
-                    vector_id = None
-
-                # Add to Neo4j graph database
-                try:
-                    neo4j_service = Neo4jService()
-                    
-                    # Process skills
-                    skills = []
-                    if extracted_data.get('skills'):
-                        # Process technical skills
-                        for skill in extracted_data['skills'].get('technical', []):
-                            if skill and isinstance(skill, str):
-                                skills.append({
-                                    'name': skill.lower().strip(),
-                                    'category': 'technical',
-                                    'confidence': 1.0
-                                })
-                        
-                        # Process soft skills
-                        for skill in extracted_data['skills'].get('soft', []):
-                            if skill and isinstance(skill, str):
-                                skills.append({
-                                    'name': skill.lower().strip(),
-                                    'category': 'soft',
-                                    'confidence': 1.0
-                                })
-
-                    # Prepare resume data
-                    resume_data = {
-                        'id': str(resume.file_id),
-                        'file_name': resume.original_filename,
-                        'vector_id': vector_id,
-                        'user_id': str(resume.user.id),
-                        'metadata': {
-                            'file_path': saved_path,
-                            'processed_date': datetime.datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S'),
-                            'status': resume.status,
-                            'uploaded_by': resume.user.username
-                        },
-                        'skills': skills
-                    }
-
-                    # Create or update in Neo4j
-                    neo4j_service.create_or_update_resume(resume_data)
-                    logger.info(f"Resume added to graph database: {resume.file_id}")
-
-                except Exception as graph_error:
-                    logger.error(f"Error adding to graph database: {str(graph_error)}")
-                    # Continue processing even if graph storage fails
-
-                # Update resume status
-                if vector_id or skills:
-                    resume.status = 'processed'
-                else:
-                    resume.status = 'partial'
-                resume.save()
-
-                return content
-
-            except Exception as feature_error:
-                logger.error(f"Error extracting features: {str(feature_error)}")
-                resume.status = 'failed'
-                resume.save()
-                return None
-
-        except Exception as processing_error:
-            logger.error(f"Error processing file {file_obj.name}: {str(processing_error)}")
-            resume.status = 'failed'
-            resume.save()
-            
-            content = ResumeContent.objects.create(
-                resume=resume,
-                raw_text="Error processing document. Please ensure the file contains readable text.",
-                structured_data={'error': str(processing_error)},
-                upload_date=datetime.datetime.utcnow(),
-                uploaded_by=resume.user.username
-            )
-            
-            return None
+        return start_resume_pipeline(resume)
 
     except Exception as e:
         logger.error(f"Error in process_resume: {str(e)}")
         if resume:
             resume.status = 'failed'
+            resume.processing_stage = 'failed'
             resume.save()
         return None
     
@@ -183,7 +76,7 @@ def upload_resumes(request):
         request: The HTTP request object.
 
     Returns:
-        JsonResponse indicating success or failure of the upload.
+        JsonResponse (202) with a job id and status URL per queued resume.
     """
     if request.method == 'POST':
         try:
@@ -191,7 +84,7 @@ def upload_resumes(request):
             if not files:
                 return JsonResponse({'success': False, 'error': 'No files provided'})
 
-            successful_uploads = []
+            queued_uploads = []
             failed_uploads = []
 
             for file in files:
@@ -203,11 +96,19 @@ def upload_resumes(request):
                         status='processing'
                     )
 
-                    # Process the resume
-                    content = process_resume(file, resume)
+                    # Save the file and queue the processing pipeline
+                    job_id = process_resume(file, resume)
                     
-                    if content:
-                        successful_uploads.append(file.name)
+                    if job_id:
+                        queued_uploads.append({
+                            'file_name': file.name,
+                            'resume_id': str(resume.file_id),
+                            'job_id': job_id,
+                            'duplicate_of': str(resume.duplicate_of_id) if resume.duplicate_of_id else None,
+                            'status_url': reverse(
+                                'resume_analysis:resume_status', args=[resume.file_id]
+                            )
+                        })
                     else:
                         failed_uploads.append(file.name)
                         
@@ -218,15 +119,16 @@ def upload_resumes(request):
 
             response_data = {
                 'success': True,
-                'message': f'Successfully processed {len(successful_uploads)} files',
-                'successful_uploads': successful_uploads,
+                'message': f'Queued {len(queued_uploads)} files for processing',
+                'jobs': queued_uploads,
+                'successful_uploads': [job['file_name'] for job in queued_uploads],
                 'failed_uploads': failed_uploads
             }
 
             if failed_uploads:
-                response_data['warning'] = f'Failed to process {len(failed_uploads)} files'
+                response_data['warning'] = f'Failed to queue {len(failed_uploads)} files'
 
-            return JsonResponse(response_data)
+            return JsonResponse(response_data, status=202)
 
         except Exception as e:
             logger.error(f"Error in batch upload: {str(e)}")
@@ -237,6 +139,46 @@ def upload_resumes(request):
 
     return JsonResponse({'success': False, 'error': 'Invalid request method'})
 
+@login_required
+def resume_status(request, file_id):
+    """Report the ingestion pipeline state of a resume.
+
+    Args:
+        request: The HTTP request object.
+        file_id: The ID of the resume to report on.
+
+    Returns:
+        JsonResponse with the status and current pipeline stage.
+    """
+    resume = get_object_or_404(Resume, file_id=file_id, user=request.user)
+    content = ResumeContent.objects.filter(resume=resume).first()
+
+    return JsonResponse({
+        'resume_id': str(resume.file_id),
+        'job_id': resume.task_id,
+        'status': resume.status,
+        'stage': resume.processing_stage,
+        'stage_updated_at': resume.stage_updated_at.isoformat() if resume.stage_updated_at else None,
+        'error': content.processing_error if content else None
+    })
+
+@login_required
+def model_stats(request):
+    """Report the models loaded in this process and the hit rates of the embedding and extraction caches.
+
+    Args:
+        request: The HTTP request object.
+
+    Returns:
+        JsonResponse with the statistics keyed by model name and the cache counters.
+    """
+    return JsonResponse({
+        'pid': os.getpid(),
+        'models': model_registry.stats(),
+        'query_embedding_cache': get_query_embedding_cache().stats(),
+        'extraction_cache': ExtractionCache().stats(),
+    })
+
 @login_required
 def view_resume(request, file_id):
     """View a specific resume and its content.
@@ -274,19 +216,25 @@ def delete_resume(request, file_id):
         resume = get_object_or_404(Resume, file_id=file_id, user=request.user)
         
         try:
-            # Delete vectors from Pinecone
-            pinecone_service = PineconeService()
-            pinecone_service.delete_resume_vectors(str(resume.file_id))
-            
-            # Delete from Neo4j
-            try:
-                neo4j_service = Neo4jService()
-                neo4j_service.delete_resume(str(resume.file_id))
-            except Exception as graph_error:
-                logger.error(f"Error deleting from Neo4j: {str(graph_error)}")
+            # Duplicates share the vectors and graph node of their original
+            if not resume.duplicate_of_id:
+                promote_duplicate(resume)
+
+                # Delete vectors from Pinecone
+                pinecone_service = PineconeService()
+                pinecone_service.delete_resume_vectors(str(resume.file_id))
+                
+                # Delete from Neo4j
+                try:
+                    neo4j_service = Neo4jService()
+                    neo4j_service.delete_resume(str(resume.file_id))
+                except Exception as graph_error:
+                    logger.error(f"Error deleting from Neo4j: {str(graph_error)}")
             
             # Delete file from storage
-            file_path = os.path.join('resumes', str(resume.file_id), resume.original_filename)
+            file_path = resume.file_path or os.path.join(
+                'resumes', str(resume.file_id), resume.original_filename
+            )
             if default_storage.exists(file_path):
                 default_storage.delete(file_path)
             
@@ -1,6 +1,7 @@
 from __future__ import absolute_import, unicode_literals
 import os
 from celery import Celery
+from celery.signals import worker_process_init, worker_process_shutdown
 
 # Set the default Django settings module for the 'celery' program.
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings.base')
@@ -13,3 +14,19 @@ app.config_from_object('django.conf:settings', namespace='CELERY')
 
 # Load task modules from all registered Django app configs.
 app.autodiscover_tasks()
+
+
+@worker_process_init.connect
+def warm_up_worker_models(**kwargs):
+    """Load the OCR and ML models once in each worker process before it takes tasks."""
+    from apps.resume_analysis.services.model_registry import warm_up_models
+    warm_up_models()
+
+
+@worker_process_shutdown.connect
+def stop_worker_ocr_pool(**kwargs):
+    """Stop the OCR pool and close the pooled HTTP connections of a worker process."""
+    from apps.resume_analysis.services.http_client import close_http_sessions
+    from apps.resume_analysis.services.ocr_executor import shutdown_pool
+    shutdown_pool()
+    close_http_sessions()
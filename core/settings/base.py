@@ -135,16 +135,126 @@ ALLOWED_RESUME_TYPES = [
 # Minimum text length to consider successful extraction
 MIN_EXTRACTED_TEXT_LENGTH = 100
 
+# PDF text extraction: 'per_page' OCRs only pages without a usable text layer,
+# 'document' OCRs the whole file when the document has too little text
+PDF_EXTRACTION_MODE = os.getenv('PDF_EXTRACTION_MODE', 'per_page')
+MIN_PAGE_TEXT_LENGTH = 20
+
 # Increase PDF processing timeout if needed
 PDF_PROCESSING_TIMEOUT = 300  # 5 minutes
 
+# OCR settings (the EasyOCR reader is loaded once per process)
+OCR_LANGUAGES = os.getenv('OCR_LANGUAGES', 'en').split(',')
+OCR_USE_GPU = os.getenv('OCR_USE_GPU', 'True') == 'True'
+WARM_UP_OCR_READER = os.getenv('WARM_UP_OCR_READER', 'True') == 'True'
+
+# Sentence embedding model (a hub name or a local path such as models/mpnet), loaded once per process
+EMBEDDING_MODEL = os.getenv('EMBEDDING_MODEL', 'sentence-transformers/all-mpnet-base-v2')
+WARM_UP_EMBEDDING_MODEL = os.getenv('WARM_UP_EMBEDDING_MODEL', 'True') == 'True'
+# 'torch' runs EMBEDDING_MODEL in PyTorch; 'onnx' runs the int8 model written by the
+# export_onnx_embedding_model command in ONNX Runtime (CPU only)
+EMBEDDING_BACKEND = os.getenv('EMBEDDING_BACKEND', 'torch')
+EMBEDDING_ONNX_MODEL_DIR = os.getenv('EMBEDDING_ONNX_MODEL_DIR', str(BASE_DIR / 'models' / 'mpnet-onnx'))
+EMBEDDING_ONNX_FILE = os.getenv('EMBEDDING_ONNX_FILE', 'onnx/model_qint8_avx2.onnx')
+# Intra-op threads of each process; 0 divides the physical cores by CELERY_WORKER_CONCURRENCY
+EMBEDDING_ONNX_THREADS = int(os.getenv('EMBEDDING_ONNX_THREADS', '1'))
+# Texts encoded per forward pass of the embedding model
+EMBEDDING_BATCH_SIZE = int(os.getenv('EMBEDDING_BATCH_SIZE', '32'))
+
+# Search query embeddings: in-process LRU, optionally shared through the 'llm' Redis cache
+QUERY_EMBEDDING_CACHE_SIZE = int(os.getenv('QUERY_EMBEDDING_CACHE_SIZE', '1024'))
+QUERY_EMBEDDING_CACHE_SHARED = os.getenv('QUERY_EMBEDDING_CACHE_SHARED', 'False') == 'True'
+QUERY_EMBEDDING_CACHE_TTL = int(os.getenv('QUERY_EMBEDDING_CACHE_TTL', str(7 * 24 * 3600)))  # 7 days
+
+# Parallel OCR of multi-page scans (0 or 1 processes OCR pages in-process).
+# OCR_POOL_MODE 'auto' uses threads sharing the process reader inside daemonic
+# processes (Celery prefork children cannot start child processes) and a process
+# pool elsewhere; each pool process loads its own reader, so budget memory per process.
+# Every page runs on OCR_POOL_TORCH_THREADS torch threads (process-wide in thread
+# mode), so keep workers x torch threads x worker concurrency near the core count.
+# A process pool with a reader per process needs a non-daemonic worker, e.g. a
+# dedicated OCR worker started with --pool=threads or --pool=solo.
+OCR_POOL_WORKERS = int(os.getenv('OCR_POOL_WORKERS', '2'))
+OCR_POOL_MODE = os.getenv('OCR_POOL_MODE', 'auto')
+OCR_MAX_PAGES_IN_FLIGHT = int(os.getenv('OCR_MAX_PAGES_IN_FLIGHT', '0')) or None
+OCR_POOL_TORCH_THREADS = int(os.getenv('OCR_POOL_TORCH_THREADS', '1'))
+OCR_POOL_START_METHOD = 'spawn'
+
+# Page rasterisation for OCR: DPI is chosen per page from the estimated glyph
+# size, capped by the native scan resolution and the per-page pixel budget
+OCR_MIN_DPI = int(os.getenv('OCR_MIN_DPI', '150'))
+OCR_MAX_DPI = int(os.getenv('OCR_MAX_DPI', '300'))
+OCR_TARGET_GLYPH_PX = 28
+OCR_DEFAULT_FONT_SIZE = 10
+OCR_MAX_PAGE_PIXELS = int(os.getenv('OCR_MAX_PAGE_PIXELS', '8000000'))
+OCR_GRAYSCALE = os.getenv('OCR_GRAYSCALE', 'True') == 'True'
+
+# Disk cache of extracted text, keyed by file hash + extractor/OCR versions (LRU bounded)
+EXTRACTION_CACHE_ENABLED = os.getenv('EXTRACTION_CACHE_ENABLED', 'True') == 'True'
+EXTRACTION_CACHE_DIR = os.getenv('EXTRACTION_CACHE_DIR', str(BASE_DIR / 'cache' / 'extraction'))
+EXTRACTION_CACHE_MAX_BYTES = int(os.getenv('EXTRACTION_CACHE_MAX_BYTES', str(512 * 1024 * 1024)))
+
 # Add Mistral API settings
 MISTRAL_API_KEY = os.getenv('MISTRAL_API_KEY')
 LLM_PROCESSING_TIMEOUT = 60  # seconds
+# Keep-alive connections to the Mistral API kept per process and shared by every caller
+MISTRAL_HTTP_POOL_SIZE = int(os.getenv('MISTRAL_HTTP_POOL_SIZE', '10'))
+# Chunks of one resume sent to the API at the same time
+LLM_MAX_CONCURRENT_CHUNKS = int(os.getenv('LLM_MAX_CONCURRENT_CHUNKS', '4'))
+# The single retry budget of the API: attempts per chunk and exponential backoff base
+LLM_MAX_ATTEMPTS = int(os.getenv('LLM_MAX_ATTEMPTS', '3'))
+LLM_RETRY_BACKOFF_SECONDS = 1
+# Continuation requests for an answer truncated by max_tokens before it is repaired locally
+LLM_MAX_CONTINUATIONS = 1
+# Resume chunks sent to the LLM: token budget, smallest chunk worth its own call,
+# and the Hugging Face tokenizer (tokenizer.json path or hub id) used to count tokens.
+# The default is the tokenizer of mistral-large-latest, a gated repository: set HF_TOKEN
+# or point LLM_TOKENIZER at a downloaded tokenizer.json. Empty: estimate from words and characters
+LLM_CHUNK_MAX_TOKENS = int(os.getenv('LLM_CHUNK_MAX_TOKENS', '4000'))
+LLM_CHUNK_MIN_TOKENS = int(os.getenv('LLM_CHUNK_MIN_TOKENS', '500'))
+LLM_TOKENIZER = os.getenv('LLM_TOKENIZER', 'mistralai/Mistral-Large-Instruct-2411')
+# Contact details, known skills and languages extracted locally and left out of the prompt
+LLM_LOCAL_EXTRACTION_ENABLED = os.getenv('LLM_LOCAL_EXTRACTION_ENABLED', 'True') == 'True'
+SKILLS_GAZETTEER_PATH = BASE_DIR / 'apps' / 'resume_analysis' / 'data' / 'skills.txt'
+LOCAL_SKILLS_MIN_COVERAGE = 0.9  # share of a skills section that must be known skills
+# Bulk extraction (backfill_resume_features): short resumes packed into one request
+LLM_BULK_MAX_TOKENS = int(os.getenv('LLM_BULK_MAX_TOKENS', '24000'))
+LLM_BULK_MAX_DOCUMENTS = int(os.getenv('LLM_BULK_MAX_DOCUMENTS', '8'))
+LLM_BULK_MAX_OUTPUT_TOKENS = 16000
+# Batch API (batch_resume_features); point the URL to run_fake_batch_server to work offline
+LLM_BATCH_API_URL = os.getenv('LLM_BATCH_API_URL', 'https://api.mistral.ai/v1')
+LLM_BATCH_POLL_SECONDS = 30
+LLM_BATCH_TIMEOUT_HOURS = 24
+# Cache of parsed LLM responses, keyed by model, prompt version and chunk hash
+LLM_CACHE_ENABLED = os.getenv('LLM_CACHE_ENABLED', 'True') == 'True'
+LLM_CACHE_ALIAS = 'llm'
+LLM_CACHE_TTL = int(os.getenv('LLM_CACHE_TTL', str(30 * 24 * 3600)))  # 30 days
+# Mistral quota shared by every worker through Redis (in-process if Redis is down)
+LLM_RATE_LIMIT_URL = os.getenv('LLM_RATE_LIMIT_URL', 'redis://localhost:6379/2')
+LLM_REQUESTS_PER_SECOND = float(os.getenv('LLM_REQUESTS_PER_SECOND', '1'))
+LLM_TOKENS_PER_MINUTE = int(os.getenv('LLM_TOKENS_PER_MINUTE', '500000'))
+LLM_EXPECTED_OUTPUT_TOKENS = 1000  # reserved per call on top of the prompt estimate
+LLM_RATE_LIMIT_MAX_WAIT = 120  # seconds
+# Stop calling the API for a cooldown after repeated 5xx, timeouts or connection errors
+LLM_CIRCUIT_FAILURE_THRESHOLD = 5
+LLM_CIRCUIT_WINDOW_SECONDS = 60
+LLM_CIRCUIT_COOLDOWN_SECONDS = 30
 
 PINECONE_API_KEY = os.getenv('PINECONE_API_KEY')
 PINECONE_ENVIRONMENT = os.getenv('PINECONE_ENVIRONMENT')
 PINECONE_INDEX = os.getenv('PINECONE_INDEX')
+# Vectors per upsert request, and upsert requests sent in parallel
+PINECONE_UPSERT_BATCH_SIZE = int(os.getenv('PINECONE_UPSERT_BATCH_SIZE', '100'))
+PINECONE_UPSERT_WORKERS = int(os.getenv('PINECONE_UPSERT_WORKERS', '4'))
+
+# Vector index: 'pinecone' (hosted) or 'local' (in-process, memory-mapped files in
+# LOCAL_VECTOR_STORE_DIR; brute force below the HNSW threshold, hnswlib above it)
+VECTOR_STORE_BACKEND = os.getenv('VECTOR_STORE_BACKEND', 'pinecone')
+LOCAL_VECTOR_STORE_DIR = os.getenv('LOCAL_VECTOR_STORE_DIR', str(BASE_DIR / 'vector_store'))
+LOCAL_VECTOR_STORE_HNSW_THRESHOLD = int(os.getenv('LOCAL_VECTOR_STORE_HNSW_THRESHOLD', '20000'))
+LOCAL_VECTOR_STORE_HNSW_M = 16
+LOCAL_VECTOR_STORE_HNSW_EF_CONSTRUCTION = 200
+LOCAL_VECTOR_STORE_HNSW_EF_SEARCH = int(os.getenv('LOCAL_VECTOR_STORE_HNSW_EF_SEARCH', '64'))
 
 # Neo4j settings
 NEO4J_URI = os.getenv('NEO4J_URI')
@@ -178,4 +288,18 @@ GOOGLE_OAUTH_SCOPES = [
 ]
 GOOGLE_OAUTH_REDIRECT_URI = "http://localhost:8000/accounts/gmail/callback/"
 
-CELERY_BROKER_URL = 'redis://localhost:6379/0'
\ No newline at end of file
+REDIS_URL = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
+CELERY_BROKER_URL = REDIS_URL
+
+# The 'llm' cache holds LLM responses; run its Redis with
+# maxmemory-policy allkeys-lru so old entries are evicted under memory pressure
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'llm': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.getenv('LLM_CACHE_URL', 'redis://localhost:6379/1'),
+        'TIMEOUT': LLM_CACHE_TTL,
+    },
+}
\ No newline at end of file